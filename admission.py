@@ -0,0 +1,158 @@
+"""
+Admission control for Financial Advisor AI Copilot
+
+Tools are grouped into classes (``config.admission``): heavy estimation
+and backtests, market data reads, and everything else. Each class admits a
+limited number of concurrent calls. A burst of backtests therefore queues
+behind its own limit instead of saturating the CPU pool, and cheap calls
+such as ``create_client_profile`` keep their latency.
+
+Calls beyond the limit wait in a bounded queue. Waiting calls are served
+round-robin across MCP sessions, so one client submitting hundreds of
+backtests cannot starve another client's single call. When the queue is
+full the call is rejected at once with an error that carries
+``retry_after_seconds``, estimated from recent service times and the
+queue length.
+
+Waiting counts toward the call's deadline. A call cancelled while queued
+simply leaves the queue. Queue waits and rejections are exported as
+``mcp_admission_wait_seconds`` and ``mcp_admission_rejections_total``.
+
+Gates live on the event loop and are per process.
+"""
+
+import asyncio
+import functools
+import inspect
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+from config import ToolClassConfig, config
+from metrics import registry
+
+
+class AdmissionRejected(Exception):
+    """The tool class is at its concurrency limit and its queue is full"""
+
+    def __init__(self, tool_class: str, retry_after_seconds: float):
+        super().__init__(f"Server busy: too many {tool_class} calls queued, retry after {retry_after_seconds:g} s")
+        self.tool_class = tool_class
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionGate:
+    """Concurrency limit with a bounded queue served round-robin across sessions"""
+
+    def __init__(self, name: str, settings: ToolClassConfig):
+        self.name = name
+        self.max_concurrent = settings.max_concurrent
+        self.max_queue = settings.max_queue
+        self.min_retry_after = settings.retry_after_seconds
+        self.active = 0
+        self.queued = 0
+        self._queues: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        self._service_seconds = 0.0  # moving average of how long calls hold a slot
+
+    def retry_after(self) -> float:
+        """Rough time until a newly queued call would be admitted"""
+        estimate = self._service_seconds * (self.queued + 1) / self.max_concurrent
+        return max(self.min_retry_after, math.ceil(estimate * 10) / 10)
+
+    async def acquire(self, session: Hashable) -> None:
+        """Wait for a slot; raise ``AdmissionRejected`` if the queue is full"""
+        if self.active < self.max_concurrent and not self.queued:
+            self.active += 1
+            return
+        if self.queued >= self.max_queue:
+            raise AdmissionRejected(self.name, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(session, deque()).append(waiter)
+        self.queued += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                self._remove(session, waiter)
+            else:
+                self.release()  # the slot was handed over just as the call was cancelled
+            raise
+
+    def _remove(self, session: Hashable, waiter: asyncio.Future) -> None:
+        waiters = self._queues.get(session)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            self.queued -= 1
+            if not waiters:
+                del self._queues[session]
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        """Free a slot, handing it to the next session in turn if any call is waiting"""
+        if held_seconds is not None:
+            self._service_seconds += 0.2 * (held_seconds - self._service_seconds)
+        while self._queues:
+            session, waiters = next(iter(self._queues.items()))
+            waiter = waiters.popleft()
+            self.queued -= 1
+            if waiters:
+                self._queues.move_to_end(session)  # this session's next call goes to the back
+            else:
+                del self._queues[session]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+_gates: Dict[str, AdmissionGate] = {}
+
+
+def tool_class(tool: str) -> str:
+    return config.admission.tool_classes.get(tool, config.admission.default_class)
+
+
+def gate(name: str) -> AdmissionGate:
+    """Admission gate of the tool class ``name``, created from config on first use"""
+    if name not in _gates:
+        _gates[name] = AdmissionGate(name, config.admission.classes[name])
+    return _gates[name]
+
+
+def _session() -> Hashable:
+    """Identity of the calling MCP session, for fair queueing"""
+    from mcp.server.lowlevel.server import request_ctx
+
+    request = request_ctx.get(None)
+    return id(request.session) if request is not None else None
+
+
+def admitted(fn: Callable) -> Callable:
+    """Run an async tool handler only once its class admits it"""
+    tool_name = fn.__name__
+    class_name = tool_class(tool_name)
+    labels = {"class": class_name, "tool": tool_name}
+    returns_text = inspect.signature(fn).return_annotation is str
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if not config.admission.enabled:
+            return await fn(*args, **kwargs)
+        tool_gate = gate(class_name)
+        queued = time.perf_counter()
+        try:
+            await tool_gate.acquire(_session())
+        except AdmissionRejected as e:
+            registry.inc("mcp_admission_rejections_total", labels)
+            if returns_text:
+                return f"Error: {e}"
+            return {"status": "error", "message": str(e), "retry_after_seconds": e.retry_after_seconds}
+        started = time.perf_counter()
+        registry.observe("mcp_admission_wait_seconds", started - queued, labels)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            tool_gate.release(time.perf_counter() - started)
+
+    return wrapper
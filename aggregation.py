@@ -0,0 +1,276 @@
+"""
+Household and multi-account exposure aggregation for Financial Advisor AI Copilot
+
+Holdings are kept as a sparse account x asset matrix of market values and
+rolled up into a sparse household x asset matrix with one sparse product.
+Household weights, concentration and risk are then computed with sparse
+matrix operations, so firm-wide rollups over tens of thousands of accounts
+stay well under a second.
+
+Account updates are buffered and applied as sparse deltas to both matrices,
+so changing one account never triggers a rebuild of the whole book.
+"""
+
+import functools
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from cancellation import checkpoint
+
+ZERO_TOLERANCE = 1e-6  # market values this small are left over from subtracting deltas, not holdings
+
+
+def _locked(method: Callable) -> Callable:
+    """Serialize access to the aggregator from tool worker threads"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _pruned(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """``matrix`` without entries within ``ZERO_TOLERANCE`` of zero"""
+    matrix.data[np.abs(matrix.data) < ZERO_TOLERANCE] = 0.0
+    matrix.eliminate_zeros()
+    return matrix
+
+
+class ExposureAggregator:
+    """Sparse account x asset holdings with incremental household rollups"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.assets: List[str] = []
+        self.accounts: List[str] = []
+        self.households: List[str] = []
+        self._asset_index: Dict[str, int] = {}
+        self._account_index: Dict[str, int] = {}
+        self._household_index: Dict[str, int] = {}
+        self._account_household = np.zeros(0, dtype=np.int64)
+        self._holdings = sparse.csr_matrix((0, 0))
+        self._household_totals = sparse.csr_matrix((0, 0))
+        # account index -> (new household index, new holdings {asset index: value})
+        self._pending: Dict[int, Tuple[int, Dict[int, float]]] = {}
+
+    def _intern(self, index: Dict[str, int], names: List[str], name: str) -> int:
+        position = index.get(name)
+        if position is None:
+            position = len(names)
+            index[name] = position
+            names.append(name)
+        return position
+
+    @_locked
+    def load(
+        self,
+        accounts: Dict[str, Dict[str, float]],
+        households: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Replace the book with ``accounts`` (account -> {asset: market value})
+
+        ``households`` maps account to household; unmapped accounts form
+        their own household.
+        """
+        households = households or {}
+        self._reset()
+
+        rows: List[int] = []
+        cols: List[int] = []
+        values: List[float] = []
+        account_household: List[int] = []
+        for account, holdings in accounts.items():
+            row = self._intern(self._account_index, self.accounts, account)
+            account_household.append(
+                self._intern(self._household_index, self.households, households.get(account, account))
+            )
+            for asset, value in holdings.items():
+                rows.append(row)
+                cols.append(self._intern(self._asset_index, self.assets, asset))
+                values.append(value)
+
+        self._account_household = np.array(account_household, dtype=np.int64)
+        self._holdings = sparse.csr_matrix(
+            (np.array(values, dtype=float), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+            shape=(len(self.accounts), len(self.assets))
+        )
+        self._household_totals = (self._membership() @ self._holdings).tocsr()
+
+    def _membership(self) -> sparse.csr_matrix:
+        """Sparse household x account indicator matrix"""
+        n_accounts = len(self._account_household)
+        return sparse.csr_matrix(
+            (np.ones(n_accounts), (self._account_household, np.arange(n_accounts))),
+            shape=(len(self.households), n_accounts)
+        )
+
+    @_locked
+    def update_account(
+        self,
+        account: str,
+        holdings: Dict[str, float],
+        household: Optional[str] = None
+    ) -> None:
+        """Replace one account's holdings (and optionally move it to another household)"""
+        row = self._account_index.get(account)
+        if household is None:
+            if row is not None:
+                household_row = int(self._account_household[row])
+            else:
+                household_row = self._intern(self._household_index, self.households, account)
+        else:
+            household_row = self._intern(self._household_index, self.households, household)
+
+        if row is None:
+            row = self._intern(self._account_index, self.accounts, account)
+            self._account_household = np.append(self._account_household, household_row)
+
+        self._pending[row] = (
+            household_row,
+            {self._intern(self._asset_index, self.assets, asset): value for asset, value in holdings.items()}
+        )
+
+    @_locked
+    def remove_account(self, account: str) -> None:
+        """Drop an account's holdings from every rollup"""
+        row = self._account_index.get(account)
+        if row is not None:
+            self._pending[row] = (int(self._account_household[row]), {})
+
+    def _flush(self) -> None:
+        """Apply buffered account updates as sparse deltas"""
+        shape = (len(self.accounts), len(self.assets))
+        if self._holdings.shape != shape:
+            self._holdings.resize(shape)
+        household_shape = (len(self.households), len(self.assets))
+        if self._household_totals.shape != household_shape:
+            self._household_totals.resize(household_shape)
+        if not self._pending:
+            return
+
+        n_existing = self._holdings.indptr.size - 1
+        account_rows, account_cols, account_values = [], [], []
+        household_rows, household_cols, household_values = [], [], []
+        for row, (household_row, holdings) in self._pending.items():
+            if row < n_existing:
+                start, end = self._holdings.indptr[row], self._holdings.indptr[row + 1]
+                old_cols = self._holdings.indices[start:end]
+                old_values = self._holdings.data[start:end]
+                old_household = int(self._account_household[row])
+                account_rows.extend([row] * len(old_cols))
+                account_cols.extend(old_cols)
+                account_values.extend(-old_values)
+                household_rows.extend([old_household] * len(old_cols))
+                household_cols.extend(old_cols)
+                household_values.extend(-old_values)
+            for col, value in holdings.items():
+                account_rows.append(row)
+                account_cols.append(col)
+                account_values.append(value)
+                household_rows.append(household_row)
+                household_cols.append(col)
+                household_values.append(value)
+            self._account_household[row] = household_row
+        self._pending.clear()
+
+        account_delta = sparse.csr_matrix((account_values, (account_rows, account_cols)), shape=shape)
+        household_delta = sparse.csr_matrix(
+            (household_values, (household_rows, household_cols)), shape=household_shape
+        )
+        self._holdings = _pruned((self._holdings + account_delta).tocsr())
+        self._household_totals = _pruned((self._household_totals + household_delta).tocsr())
+
+    def _weights(self, totals: sparse.csr_matrix) -> Tuple[np.ndarray, sparse.csr_matrix]:
+        values = np.asarray(totals.sum(axis=1)).ravel()
+        inverse = np.divide(1.0, values, out=np.zeros_like(values), where=values != 0)
+        return values, (sparse.diags(inverse) @ totals).tocsr()
+
+    def _row_max(self, matrix: sparse.csr_matrix) -> Tuple[np.ndarray, np.ndarray]:
+        """Largest stored value per row and its column, -1 for empty rows"""
+        n_rows = matrix.shape[0]
+        top_value = np.zeros(n_rows)
+        top_column = np.full(n_rows, -1, dtype=np.int64)
+        counts = np.diff(matrix.indptr)
+        filled = np.flatnonzero(counts)
+        if filled.size == 0:
+            return top_value, top_column
+
+        top_value[filled] = np.maximum.reduceat(matrix.data, matrix.indptr[filled])
+        row_of_entry = np.repeat(np.arange(n_rows), counts)
+        is_top = matrix.data == top_value[row_of_entry]
+        rows, first = np.unique(row_of_entry[is_top], return_index=True)
+        top_column[rows] = matrix.indices[np.flatnonzero(is_top)[first]]
+        return top_value, top_column
+
+    @_locked
+    def rollup(self) -> Dict[str, Any]:
+        """Household-level market value, concentration and top holding as arrays"""
+        self._flush()
+        values, weights = self._weights(self._household_totals)
+        hhi = np.asarray(weights.multiply(weights).sum(axis=1)).ravel()
+        top_weight, top_column = self._row_max(weights)
+        return {
+            "households": self.households,
+            "market_value": values,
+            "hhi": hhi,
+            "effective_holdings": np.divide(1.0, hhi, out=np.zeros_like(hhi), where=hhi > 0),
+            "top_weight": top_weight,
+            "top_asset": [self.assets[i] if i >= 0 else None for i in top_column]
+        }
+
+    @_locked
+    def household_weights(self, household: str) -> Dict[str, float]:
+        """Combined asset weights across all of a household's accounts"""
+        self._flush()
+        row = self._household_index[household]
+        totals = self._household_totals.getrow(row)
+        total = totals.sum()
+        if total == 0:
+            return {}
+        return {self.assets[col]: float(value / total) for col, value in zip(totals.indices, totals.data)}
+
+    @_locked
+    def firm_exposure(self) -> Dict[str, float]:
+        """Firm-wide asset weights across every account"""
+        self._flush()
+        totals = np.asarray(self._household_totals.sum(axis=0)).ravel()
+        total = totals.sum()
+        if total == 0:
+            return {}
+        nonzero = np.flatnonzero(totals)
+        return {self.assets[col]: float(totals[col] / total) for col in nonzero}
+
+    @_locked
+    def household_risk(
+        self,
+        cov: np.ndarray,
+        cov_assets: Iterable[str],
+        chunk_size: int = 4096
+    ) -> np.ndarray:
+        """Annualized volatility per household from an asset covariance matrix
+
+        Holdings in assets missing from ``cov_assets`` are ignored. Rows are
+        processed in chunks so the dense W @ cov block stays bounded.
+        """
+        self._flush()
+        _, weights = self._weights(self._household_totals)
+        positions = [(self._asset_index[asset], i) for i, asset in enumerate(cov_assets) if asset in self._asset_index]
+        if not positions:
+            return np.zeros(weights.shape[0])
+        columns = [column for column, _ in positions]
+        cov_rows = [i for _, i in positions]
+        cov = np.asarray(cov)[np.ix_(cov_rows, cov_rows)]
+        weights = weights[:, columns].tocsr()
+
+        variance = np.empty(weights.shape[0])
+        for start in range(0, weights.shape[0], chunk_size):
+            checkpoint()
+            block = weights[start:start + chunk_size]
+            variance[start:start + chunk_size] = np.asarray(block.multiply(block @ cov).sum(axis=1)).ravel()
+        return np.sqrt(np.maximum(variance, 0.0))
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for Financial Advisor AI Copilot
+
+Times the internal kernels and the MCP tools across universe sizes and
+history lengths using deterministic synthetic prices (synthetic_data.py), so it needs no
+network access and gives the same inputs on every run. Results are written
+as JSON; compared with a stored baseline, any case whose median slows down
+by more than the threshold is reported as a regression and the run exits
+with status 1.
+
+Tools are timed with the price and result caches disabled, and with the
+in-process model caches cleared before each call, so every call includes
+generating its price panel and estimating from it, the same work a live
+fetch stands in for. They run against an empty scratch database, swapped
+in for the server's stores and swapped back afterwards, so a benchmark
+never writes clients, lots or holdings into the real book.
+
+Without ``--save-baseline`` the run is a regression gate: a missing
+baseline fails it, like a regression does.
+
+Usage:
+    python benchmark.py [--quick] [--output results.json]
+                        [--baseline baseline.json] [--save-baseline] [--threshold 0.25]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple
+
+from config import DataProviderConfig, config
+from synthetic_data import SyntheticProvider
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ASSET_COUNTS = (5, 50, 500, 2000)
+HISTORY_YEARS = (1, 5, 10, 30)
+QUICK_ASSET_COUNTS = (5, 50)
+QUICK_HISTORY_YEARS = (1, 5)
+
+AS_OF = "2025-12-31"  # fixed end date so every run sees the same prices
+PROVIDER = "benchmark"
+CLIENT = "Benchmark Client"
+
+
+@contextmanager
+def offline() -> Iterator[SyntheticProvider]:
+    """Route market data to a seeded synthetic provider and bypass the price and result caches"""
+    import market_data
+
+    provider = SyntheticProvider(seed=7, as_of=AS_OF)
+    market_data.register_provider(PROVIDER, provider)
+    saved_enabled = {name: settings.enabled for name, settings in config.data_providers.items()}
+    saved_cache = config.price_cache.enabled
+    saved_results = config.result_cache.enabled
+    for settings in config.data_providers.values():
+        settings.enabled = False
+    config.data_providers[PROVIDER] = DataProviderConfig(name=PROVIDER, enabled=True)
+    config.price_cache.enabled = False
+    config.result_cache.enabled = False
+    try:
+        yield provider
+    finally:
+        del config.data_providers[PROVIDER]
+        for name, enabled in saved_enabled.items():
+            config.data_providers[name].enabled = enabled
+        config.price_cache.enabled = saved_cache
+        config.result_cache.enabled = saved_results
+
+
+# Stores main serves from, and in-memory state it loaded from them
+_STORE_STATE = (
+    "client_profiles", "tax_lots", "account_holdings",
+    "_drift_monitor", "_drift_monitor_version", "_household_exposure", "_household_exposure_version"
+)
+
+
+@contextmanager
+def scratch_stores(directory: str) -> Iterator[None]:
+    """Serve the tools from an empty database under ``directory``, then put the real stores back"""
+    import main
+
+    saved = {name: getattr(main, name) for name in _STORE_STATE}
+    saved_path = config.storage.client_db_path
+    path = os.path.join(directory, "clients.db")
+    busy_timeout_ms = config.storage.busy_timeout_ms
+    config.storage.client_db_path = path
+    main.client_profiles = main.ClientStore(path, main.ClientProfile, busy_timeout_ms=busy_timeout_ms)
+    main.tax_lots = main.LotStore(path, busy_timeout_ms=busy_timeout_ms)
+    main.account_holdings = main.HoldingStore(path, busy_timeout_ms=busy_timeout_ms)
+    for name in _STORE_STATE[3:]:
+        setattr(main, name, None)  # reloaded from the scratch stores on first use
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(main, name, value)
+        config.storage.client_db_path = saved_path
+
+
+def symbols_for(n_assets: int) -> List[str]:
+    return [f"SYN{i:04d}" for i in range(n_assets)]
+
+
+def window_for(years: int) -> Tuple[str, str]:
+    start = f"{int(AS_OF[:4]) - years}{AS_OF[4:]}"
+    return start, AS_OF
+
+
+def _stats(samples: List[float]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    return {
+        "median_ms": ordered[len(ordered) // 2] * 1000,
+        "min_ms": ordered[0] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "repeats": len(ordered)
+    }
+
+
+def time_call(fn: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    """Time ``fn`` after one untimed warm-up call"""
+    fn()
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return _stats(samples)
+
+
+def _panel(provider: SyntheticProvider, symbols: List[str], years: int) -> "pd.DataFrame":
+    start, end = window_for(years)
+    return provider.download(symbols, start=start, end=end)
+
+
+def bench_kernels(
+    provider: SyntheticProvider,
+    asset_counts: Tuple[int, ...],
+    history_years: Tuple[int, ...],
+    repeats: int
+) -> List[Dict[str, Any]]:
+    """Time the estimation, backtest and risk kernels on in-memory panels"""
+    import main
+
+    results = []
+    for n_assets in asset_counts:
+        symbols = symbols_for(n_assets)
+        portfolio = {symbol: 1.0 / n_assets for symbol in symbols}
+        for years in history_years:
+            data = _panel(provider, symbols, years)
+            params = {"assets": n_assets, "years": years}
+            cases = {
+                "kernel.history": lambda: _panel(provider, symbols, years),
+                "kernel.portfolio_metrics": lambda: main._portfolio_metrics("moderate", symbols, data),
+                "kernel.backtest_metrics": lambda: main._backtest_metrics(data, portfolio),
+                "kernel.market_stats": lambda: main._market_stats(data)
+            }
+            for name, fn in cases.items():
+                results.append({"name": name, "params": params, **time_call(fn, repeats)})
+    return results
+
+
+def bench_tools(
+    asset_counts: Tuple[int, ...],
+    history_years: Tuple[int, ...],
+    repeats: int
+) -> List[Dict[str, Any]]:
+    """Time each tool end to end through the MCP server"""
+    import main
+
+    loop = asyncio.new_event_loop()
+
+    def call(name: str, arguments: Dict[str, Any]) -> Callable[[], Any]:
+        def run():
+            _, structured = loop.run_until_complete(main.mcp.call_tool(name, arguments))
+            result = structured.get("result")
+            if isinstance(result, dict) and result.get("status") == "error":
+                raise RuntimeError(f"{name} failed: {result.get('message')}")
+            return result
+        return run
+
+    def cold(fn: Callable[[], Any], clear: Callable[[], None]) -> Callable[[], Any]:
+        """``fn`` after ``clear`` empties the model cache that would otherwise answer it"""
+        def run():
+            clear()
+            return fn()
+        return run
+
+    def alternate(*fns: Callable[[], Any]) -> Callable[[], Any]:
+        """Each of ``fns`` in turn, so repeated calls keep changing state"""
+        turns = itertools.cycle(fns)
+        return lambda: next(turns)()
+
+    workdir = tempfile.mkdtemp(prefix="benchmark-")
+    saved_fundamentals, saved_files = config.fundamentals.path, config.storage.files_directory
+    config.fundamentals.path = os.path.join(workdir, "fundamentals.npz")  # keep the shared table untouched
+    config.storage.files_directory = workdir
+    try:
+        with scratch_stores(workdir):
+            profiles_path = "clients.jsonl"  # file tools resolve paths inside the files directory
+            profile = {
+                "name": CLIENT, "age": 45, "risk_tolerance": "moderate",
+                "investment_horizon": 15, "capital": 1_000_000.0
+            }
+            results = [
+                {"name": "tool.create_client_profile", "params": {},
+                 **time_call(call("create_client_profile", profile), repeats)},
+                {"name": "tool.list_clients", "params": {},
+                 **time_call(call("list_clients", {"limit": 100}), repeats)},
+                {"name": "tool.adjust_portfolio", "params": {},
+                 **time_call(call("adjust_portfolio", {
+                     "client_name": CLIENT,
+                     "current_portfolio": {"VTI": 0.5, "BND": 0.3, "VEA": 0.2},
+                     "adjustments": "more conservative"
+                 }), repeats)},
+                {"name": "tool.export_client_profiles", "params": {},
+                 **time_call(call("export_client_profiles", {"path": profiles_path}), repeats)},
+                {"name": "tool.import_client_profiles", "params": {},
+                 **time_call(call("import_client_profiles", {"path": profiles_path}), repeats)}
+            ]
+            for n_assets in asset_counts:
+                symbols = symbols_for(n_assets)
+                portfolio = {symbol: 1.0 / n_assets for symbol in symbols}
+                holdings = {symbol: 10_000.0 for symbol in symbols}
+                params = {"assets": n_assets}
+                account = f"benchmark-{n_assets}"
+                lots = [
+                    {"symbol": symbol, "quantity": 10.0, "cost_basis": cost, "acquired": acquired}
+                    for symbol in symbols
+                    for cost, acquired in ((50.0, "2020-01-02"), (100.0, "2023-06-01"), (150.0, "2025-03-03"), (200.0, "2025-11-03"))
+                ]
+                tilt = {symbol: (i % 3 + 1) / (2 * n_assets) for i, symbol in enumerate(symbols)}
+                cases = {
+                    "tool.get_market_data": call("get_market_data", {"symbols": symbols}),
+                    "tool.build_portfolio": call("build_portfolio", {"client_name": CLIENT, "asset_universe": symbols}),
+                    "tool.generate_investment_report": call(
+                        "generate_investment_report", {"client_name": CLIENT, "portfolio": portfolio}
+                    ),
+                    "tool.generate_book_reports": call("generate_book_reports", {
+                        "output_dir": "reports", "portfolios": {CLIENT: portfolio}, "include_metrics": True
+                    }),
+                    "tool.update_account_holdings": call(
+                        "update_account_holdings", {"account_id": account, "holdings": holdings, "household": account}
+                    ),
+                    "tool.get_household_exposure": call(
+                        "get_household_exposure", {"household": account, "include_risk": True}
+                    ),
+                    "tool.calculate_var": call("calculate_var", {"portfolio": portfolio}),
+                    "tool.analyze_correlation": cold(
+                        call("analyze_correlation", {"symbols": symbols}), main._correlation_cache().clear
+                    ),
+                    "tool.run_stress_test": cold(call("run_stress_test", {"portfolio": portfolio}), main._beta_cache().clear),
+                    "tool.record_tax_lots": call("record_tax_lots", {"client_name": CLIENT, "lots": lots, "replace": True}),
+                    "tool.rebalance_tax_aware": call("rebalance_tax_aware", {"client_name": CLIENT, "target_portfolio": tilt}),
+                    "tool.set_target_allocation": call(
+                        "set_target_allocation", {"client_name": CLIENT, "target_portfolio": tilt}
+                    ),
+                    "tool.update_market_prices": alternate(
+                        call("update_market_prices", {"prices": {symbol: 100.0 for symbol in symbols}}),
+                        call("update_market_prices", {"prices": {symbol: 100.0 + i % 7 for i, symbol in enumerate(symbols)}})
+                    ),
+                    "tool.get_drift_breaches": call("get_drift_breaches", {}),
+                    "tool.refresh_fundamentals": call("refresh_fundamentals", {"symbols": symbols}),
+                    "tool.screen_securities": call("screen_securities", {"max_pe_ratio": 25.0, "min_market_cap": 1e9})
+                }
+                for name, fn in cases.items():
+                    results.append({"name": name, "params": params, **time_call(fn, repeats)})
+                for years in history_years:
+                    start, end = window_for(years)
+                    fn = call("backtest_portfolio", {"portfolio": portfolio, "start_date": start, "end_date": end})
+                    results.append({
+                        "name": "tool.backtest_portfolio",
+                        "params": {"assets": n_assets, "years": years},
+                        **time_call(fn, repeats)
+                    })
+    finally:
+        loop.close()
+        config.fundamentals.path = saved_fundamentals
+        config.storage.files_directory = saved_files
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def run_suite(
+    asset_counts: Tuple[int, ...] = ASSET_COUNTS,
+    history_years: Tuple[int, ...] = HISTORY_YEARS,
+    repeats: int = 3,
+    kernels: bool = True,
+    tools: bool = True
+) -> Dict[str, Any]:
+    """Run the benchmarks and return machine-readable results"""
+    import numpy as np
+    import pandas as pd
+
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    with offline() as provider:
+        if kernels:
+            results += bench_kernels(provider, asset_counts, history_years, repeats)
+        if tools:
+            results += bench_tools(asset_counts, history_years, repeats)
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count()
+        },
+        "elapsed_seconds": time.perf_counter() - started,
+        "results": results
+    }
+
+
+def _case_key(result: Dict[str, Any]) -> str:
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.25,
+    min_delta_ms: float = 1.0
+) -> List[Dict[str, Any]]:
+    """Cases whose median is more than ``threshold`` (and ``min_delta_ms``) slower than the baseline"""
+    previous = {_case_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get(_case_key(result))
+        if before is None:
+            continue
+        delta = result["median_ms"] - before["median_ms"]
+        if delta > min_delta_ms and result["median_ms"] > before["median_ms"] * (1 + threshold):
+            regressions.append({
+                "name": result["name"],
+                "params": result["params"],
+                "baseline_ms": before["median_ms"],
+                "median_ms": result["median_ms"],
+                "slowdown": result["median_ms"] / before["median_ms"] - 1
+            })
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline benchmarks on synthetic prices")
+    parser.add_argument("--quick", action="store_true", help=f"only {QUICK_ASSET_COUNTS} assets and {QUICK_HISTORY_YEARS} years")
+    parser.add_argument("--repeats", type=int, default=3, help="timed repetitions per case")
+    parser.add_argument("--kernels-only", action="store_true", help="skip the end-to-end tool benchmarks")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write results")
+    parser.add_argument("--baseline", default="benchmark_baseline.json", help="baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    report = run_suite(
+        QUICK_ASSET_COUNTS if args.quick else ASSET_COUNTS,
+        QUICK_HISTORY_YEARS if args.quick else HISTORY_YEARS,
+        repeats=args.repeats,
+        tools=not args.kernels_only
+    )
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+
+    print(f"⏱️  {len(report['results'])} cases in {report['elapsed_seconds']:.1f} s")
+    print("-" * 70)
+    for result in report["results"]:
+        params = " ".join(f"{key}={value}" for key, value in result["params"].items())
+        print(f"{result['name']:<34} {params:<22} {result['median_ms']:>10.2f} ms")
+    print("-" * 70)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"❌ No baseline at {args.baseline}; run with --save-baseline on this machine to create one")
+        sys.exit(1)
+
+    with open(args.baseline, "r", encoding="utf-8") as handle:
+        regressions = compare(report, json.load(handle), args.threshold)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression['name']} {regression['params']}: "
+                  f"{regression['baseline_ms']:.2f} -> {regression['median_ms']:.2f} ms "
+                  f"(+{regression['slowdown']:.0%})")
+        sys.exit(1)
+    print("✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
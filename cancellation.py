@@ -0,0 +1,131 @@
+"""
+Per-tool deadlines and cooperative cancellation for Financial Advisor AI Copilot
+
+Every tool call gets a ``CancelToken``, carried in a context variable and so
+also visible to work it hands to the I/O and CPU pools. The token is
+cancelled when
+- the call runs past its deadline (``config.deadlines``), in which case the
+  tool returns an error instead of its result;
+- the client cancels the request or disconnects, in which case the handler
+  is cancelled and nothing is returned;
+- the handler finishes while some of its pool work is still running, e.g.
+  after one of several concurrent fetches failed.
+
+The event loop side stops immediately, and queued pool jobs of the call
+never start. Python threads cannot be interrupted, so work already
+running on a pool thread stops at its next ``checkpoint()``: between
+symbols, between estimation and optimization, between backtest stages.
+Network fetches also get their timeouts capped by the time the call has
+left (see ``remaining()``).
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from typing import Callable, Optional
+
+from config import config
+from metrics import registry
+
+
+class CallCancelled(Exception):
+    """The tool call was cancelled or ran past its deadline"""
+
+
+class CancelToken:
+    """Cancellation state shared by a tool call and its pool work"""
+
+    def __init__(self, tool: str, deadline_seconds: Optional[float] = None):
+        self.tool = tool
+        self.deadline_seconds = deadline_seconds
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds is not None else None
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str) -> None:
+        if self.reason is None:
+            self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or (self.deadline is not None and time.monotonic() > self.deadline)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline, or None without one"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def message(self) -> str:
+        if self.reason == "deadline":
+            return f"{self.tool} exceeded its {self.deadline_seconds:g} s deadline"
+        return f"{self.tool} was {self.reason}"
+
+    def check(self) -> None:
+        """Raise ``CallCancelled`` once the call is cancelled or past its deadline"""
+        if not self._event.is_set():
+            if self.deadline is None or time.monotonic() <= self.deadline:
+                return
+            self.cancel("deadline")
+        raise CallCancelled(self.message())
+
+
+_token: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar("cancel_token", default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    return _token.get()
+
+
+def checkpoint() -> None:
+    """Stop the current tool call's work here if it was cancelled"""
+    token = _token.get()
+    if token is not None:
+        token.check()
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """Seconds the current tool call has left, capped at ``default`` when given"""
+    token = _token.get()
+    left = token.remaining() if token is not None else None
+    if left is None:
+        return default
+    return left if default is None else min(default, left)
+
+
+def deadline_for(tool: str) -> Optional[float]:
+    """Configured deadline for ``tool`` in seconds, None for no deadline"""
+    return config.deadlines.tools.get(tool, config.deadlines.default_seconds)
+
+
+def with_deadline(fn: Callable, seconds: Optional[float] = None) -> Callable:
+    """Run an async tool handler under a cancel token and an optional deadline"""
+    tool_name = fn.__name__
+    returns_text = inspect.signature(fn).return_annotation is str
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = CancelToken(tool_name, seconds)
+        reset = _token.set(token)
+        try:
+            async with asyncio.timeout(seconds):
+                result = await fn(*args, **kwargs)
+        except TimeoutError:
+            token.cancel("deadline")
+            result = f"Error: {token.message()}" if returns_text else {"status": "error", "message": token.message()}
+        except asyncio.CancelledError:
+            token.cancel("cancelled")
+            registry.inc("mcp_tool_cancellations_total", {"tool": tool_name, "reason": "cancelled"})
+            raise
+        finally:
+            token.cancel("completed")  # stop any pool work the call left behind
+            _token.reset(reset)
+        if token.reason == "deadline":
+            registry.inc("mcp_tool_cancellations_total", {"tool": tool_name, "reason": "deadline"})
+        return result
+
+    return wrapper
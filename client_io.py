@@ -0,0 +1,185 @@
+"""
+Streaming bulk import and export of client profiles for Financial Advisor AI Copilot
+
+Files are read and written one row at a time, so memory stays flat no matter
+how large the book is. Imported rows are validated against the profile model
+in batches and each valid batch is written in its own transaction; invalid
+rows are reported with their line number and never abort the load.
+"""
+
+import csv
+import json
+import os
+import typing
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from store import ClientStore
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+
+# CSV cells holding list fields are joined with this separator
+LIST_SEPARATOR = ";"
+# and cells holding mapping fields carry a JSON object
+
+
+def detect_format(path: str, file_format: Optional[str] = None) -> str:
+    """Resolve the file format from an explicit value or the file extension"""
+    if file_format is None:
+        extension = os.path.splitext(path)[1].lower().lstrip(".")
+        file_format = "jsonl" if extension in ("jsonl", "ndjson") else extension
+    file_format = file_format.lower()
+    if file_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported file format '{file_format}', expected one of {SUPPORTED_FORMATS}")
+    return file_format
+
+
+def _list_fields(model: Type[BaseModel]) -> List[str]:
+    return [
+        name for name, field in model.model_fields.items()
+        if typing.get_origin(field.annotation) is list
+    ]
+
+
+def _dict_fields(model: Type[BaseModel]) -> List[str]:
+    return [
+        name for name, field in model.model_fields.items()
+        if typing.get_origin(field.annotation) is dict
+    ]
+
+
+def iter_rows(path: str, file_format: str, model: Type[BaseModel]) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, raw row) pairs without loading the file"""
+    with open(path, "r", encoding="utf-8", newline="") as handle:
+        if file_format == "jsonl":
+            for line_no, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, e
+        else:
+            list_fields = _list_fields(model)
+            dict_fields = _dict_fields(model)
+            reader = csv.DictReader(handle)
+            for row in reader:
+                # Empty cells fall back to the model defaults
+                row = {key: value for key, value in row.items() if key and value != ""}
+                for name in list_fields:
+                    if name in row:
+                        row[name] = [item.strip() for item in row[name].split(LIST_SEPARATOR) if item.strip()]
+                try:
+                    for name in dict_fields:
+                        if name in row:
+                            row[name] = json.loads(row[name])
+                except json.JSONDecodeError as e:
+                    yield reader.line_num, e
+                    continue
+                yield reader.line_num, row
+
+
+def _format_errors(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def import_profiles(
+    store: ClientStore,
+    path: str,
+    file_format: Optional[str] = None,
+    batch_size: int = 1000,
+    max_reported_errors: int = 100
+) -> Dict[str, Any]:
+    """Stream profiles from a CSV or JSONL file into the store
+
+    Returns counts of imported and rejected rows plus the first
+    ``max_reported_errors`` per-row errors.
+    """
+    file_format = detect_format(path, file_format)
+    model = store.model
+    batch_adapter = TypeAdapter(List[model])
+
+    imported = 0
+    rejected = 0
+    errors: List[Dict[str, Any]] = []
+
+    def reject(line_no: int, message: str) -> None:
+        nonlocal rejected
+        rejected += 1
+        if len(errors) < max_reported_errors:
+            errors.append({"line": line_no, "error": message})
+
+    def flush(lines: List[int], rows: List[Any]) -> None:
+        nonlocal imported
+        try:
+            # Fast path: the whole batch validates in one call
+            profiles = batch_adapter.validate_python(rows)
+        except ValidationError:
+            profiles = []
+            for line_no, row in zip(lines, rows):
+                try:
+                    profiles.append(model.model_validate(row))
+                except ValidationError as e:
+                    reject(line_no, _format_errors(e))
+        imported += store.put_many(profiles)
+
+    lines: List[int] = []
+    rows: List[Any] = []
+    for line_no, row in iter_rows(path, file_format, model):
+        if isinstance(row, Exception):
+            reject(line_no, f"invalid JSON: {row}")
+            continue
+        lines.append(line_no)
+        rows.append(row)
+        if len(rows) >= batch_size:
+            flush(lines, rows)
+            lines, rows = [], []
+    if rows:
+        flush(lines, rows)
+
+    return {
+        "imported": imported,
+        "rejected": rejected,
+        "errors": errors,
+        "errors_truncated": rejected > len(errors)
+    }
+
+
+def export_profiles(
+    store: ClientStore,
+    path: str,
+    file_format: Optional[str] = None,
+    **filters: Any
+) -> Dict[str, Any]:
+    """Stream profiles matching the store query filters to a CSV or JSONL file"""
+    file_format = detect_format(path, file_format)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    exported = 0
+    list_fields = set(_list_fields(store.model))
+    dict_fields = set(_dict_fields(store.model))
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        writer = None
+        if file_format == "csv":
+            writer = csv.DictWriter(handle, fieldnames=list(store.model.model_fields))
+            writer.writeheader()
+        for profile in store.iter_query(**filters):
+            if writer is None:
+                handle.write(profile.model_dump_json())
+                handle.write("\n")
+            else:
+                row = profile.model_dump()
+                for name in list_fields:
+                    row[name] = LIST_SEPARATOR.join(row[name])
+                for name in dict_fields:
+                    row[name] = json.dumps(row[name]) if row[name] else ""
+                writer.writerow(row)
+            exported += 1
+
+    return {"exported": exported, "path": path, "format": file_format}
@@ -2,6 +2,8 @@
 Configuration settings for Financial Advisor AI Copilot MCP Service
 """
 
+import os
+
 from pydantic import BaseModel
 from typing import Dict, List, Optional
 
@@ -26,6 +28,190 @@ class BacktestConfig(BaseModel):
     benchmark: str = "SPY"  # S&P 500 as default benchmark
     transaction_cost: float = 0.001  # 0.1% transaction cost
 
+class RiskConfig(BaseModel):
+    """VaR and CVaR defaults (risk.py)"""
+    confidence_levels: List[float] = [0.95, 0.99]
+    horizons: List[int] = [1, 10]  # trading days
+    methods: List[str] = ["historical", "parametric", "monte_carlo"]
+    simulations: int = 10000  # Monte Carlo paths per call
+    seed: Optional[int] = 7  # fixed so repeated calls on the same prices agree; None draws fresh paths
+
+class CorrelationConfig(BaseModel):
+    """Correlation and clustering analysis (correlation.py)"""
+    top_k: int = 20  # most correlated pairs returned by default
+    cluster_threshold: float = 0.9  # pairs at least this correlated are the same bet
+    min_overlap: int = 60  # fewest days both symbols need returns on for a pair's correlation
+    block_size: int = 512  # symbols per row block when scanning the upper triangle
+    max_matrix_symbols: int = 250  # largest matrix returned; larger universes name matrix_symbols
+    cache_entries: int = 8  # standardized universes kept between calls
+
+class FactorConfig(BaseModel):
+    """A market factor and the traded proxy its shocks move"""
+    proxy: str
+    return_per_unit: float = 1.0  # proxy return for one unit of shock
+
+class ScenarioConfig(BaseModel):
+    """Factor-shock stress tests (scenarios.py)"""
+    factors: Dict[str, FactorConfig] = {
+        "equities": FactorConfig(proxy="SPY"),  # shocks are returns: -0.20 is a 20% fall
+        "rates": FactorConfig(proxy="IEF", return_per_unit=-0.00075),  # shocks in bp; 7-10y Treasuries, ~7.5y duration
+        "usd": FactorConfig(proxy="UUP"),
+        "commodities": FactorConfig(proxy="DBC")
+    }
+    library: Dict[str, Dict[str, float]] = {
+        "rates_up_200bp": {"rates": 200},
+        "rates_down_100bp": {"rates": -100},
+        "equities_down_20": {"equities": -0.20},
+        "equities_down_35": {"equities": -0.35},
+        "usd_up_10": {"usd": 0.10},
+        "commodities_up_30": {"commodities": 0.30},
+        "stagflation": {"rates": 150, "equities": -0.15, "commodities": 0.25},
+        "risk_off": {"equities": -0.25, "rates": -75, "usd": 0.05}
+    }
+    betas_max_age_seconds: float = 24 * 3600  # betas are re-estimated from price history after this
+
+class TaxConfig(BaseModel):
+    """Tax-lot-aware rebalancing (rebalancing.py)"""
+    short_term_rate: float = 0.37  # marginal rate on gains held up to long_term_days
+    long_term_rate: float = 0.20
+    long_term_days: int = 365
+    wash_sale_days: int = 30  # no loss sales after a buy, or buys after a loss sale, within this window
+    max_turnover: float = 0.25  # share of the account one rebalance may sell
+    min_trade_value: float = 100.0  # smaller trades are skipped
+
+class DriftConfig(BaseModel):
+    """Incremental drift monitoring (drift.py)"""
+    band: float = 0.05  # clients whose holdings would need this share traded to reach target are flagged
+    max_breaches: int = 50  # flagged clients listed per response
+
+class FundamentalsConfig(BaseModel):
+    """Local fundamentals table for screening (fundamentals.py)"""
+    path: str = "data/fundamentals.npz"  # columnar table shared by every server process on the host
+    refresh_parallelism: int = 16  # concurrent provider snapshots while refreshing
+    max_results: int = 20  # default number of rows a screen returns
+
+class StorageConfig(BaseModel):
+    """Persistent storage configuration"""
+    client_db_path: str = "data/clients.db"  # SQLite database shared by all server processes
+    busy_timeout_ms: int = 5000  # how long writers wait on a locked database
+    files_directory: str = "data/files"  # import/export files and book reports; tool paths cannot leave it
+
+class PriceCacheConfig(BaseModel):
+    """Shared on-disk price cache configuration"""
+    enabled: bool = True
+    directory: str = "data/price_cache"  # shared by every server process on the host
+    max_age_seconds: float = 6 * 3600  # windows that include today
+    closed_max_age_seconds: float = 7 * 86400  # windows that ended before they were cached
+    lock_timeout_seconds: float = 60.0  # how long a worker waits for another's download
+
+class ServerConfig(BaseModel):
+    """Server transport configuration"""
+    transport: str = "sse"  # sse, stdio or streamable-http
+    host: str = "127.0.0.1"
+    port: int = 8000
+    workers: int = 1  # more than one serves stateless streamable HTTP from several processes
+
+class ExecutionConfig(BaseModel):
+    """Worker pool configuration for tool execution"""
+    io_workers: int = 32  # concurrent network fetches and database calls
+    cpu_workers: int = max(2, os.cpu_count() or 2)  # concurrent estimation/optimization/backtest jobs
+
+class WarmupConfig(BaseModel):
+    """Startup warm-up and scheduled prefetch of the configured asset universes"""
+    enabled: bool = True
+    interval_seconds: Optional[float] = 3600.0  # refresh schedule; None warms once at startup
+    retry_seconds: float = 60.0  # next attempt after a failed warm-up
+    estimates_max_age_seconds: float = 6 * 3600  # how long build_portfolio trusts precomputed estimates
+    ready_when_warm: bool = False  # report ready (and finish startup) only after the first warm-up
+    startup_timeout_seconds: float = 120.0  # longest startup waits for it
+
+class EodConfig(BaseModel):
+    """End-of-day batch pipeline (eod.py)"""
+    schedule_in_server: bool = False  # run it from the server; with several workers a lock file picks one
+    run_at: str = "17:30"  # local time, Monday to Friday, after the close
+    directory: str = "data/eod"  # per-run checkpoints and state carried between runs
+    parallelism: int = 8  # concurrent jobs within a stage
+
+class ToolClassConfig(BaseModel):
+    """Admission limits for one class of tools"""
+    max_concurrent: int  # calls of the class running at once
+    max_queue: int  # calls waiting for a slot before new ones are rejected
+    retry_after_seconds: float = 1.0  # smallest retry hint given with a rejection
+
+class AdmissionConfig(BaseModel):
+    """Per-class concurrency limits and fair queueing across sessions"""
+    enabled: bool = True
+    classes: Dict[str, ToolClassConfig] = {
+        # Estimation, optimization and backtests: bounded by the CPU pool
+        "heavy": ToolClassConfig(max_concurrent=max(2, os.cpu_count() or 2), max_queue=32, retry_after_seconds=2.0),
+        # Market data and book-wide reads: bounded by the I/O pool
+        "data": ToolClassConfig(max_concurrent=16, max_queue=64),
+        "light": ToolClassConfig(max_concurrent=64, max_queue=256, retry_after_seconds=0.5)
+    }
+    tool_classes: Dict[str, str] = {
+        "build_portfolio": "heavy",
+        "backtest_portfolio": "heavy",
+        "calculate_var": "heavy",
+        "analyze_correlation": "heavy",
+        "run_stress_test": "heavy",
+        "rebalance_tax_aware": "heavy",
+        "generate_book_reports": "heavy",
+        "get_market_data": "data",
+        "get_household_exposure": "data",
+        "refresh_fundamentals": "data",
+        "import_client_profiles": "data",
+        "export_client_profiles": "data"
+    }
+    default_class: str = "light"
+
+class DeadlineConfig(BaseModel):
+    """Per-tool deadlines; calls past theirs are cancelled and return an error"""
+    default_seconds: Optional[float] = 300.0  # None disables the deadline
+    tools: Dict[str, Optional[float]] = {
+        "get_market_data": 60.0,
+        "build_portfolio": 120.0,
+        "backtest_portfolio": 180.0,
+        "generate_book_reports": 3600.0,
+        "import_client_profiles": None,  # bounded by the file size, not by the client's patience
+        "refresh_fundamentals": None,
+        "export_client_profiles": None
+    }
+
+class ResultCacheConfig(BaseModel):
+    """Memoized results of build_portfolio, backtest_portfolio and get_market_data"""
+    enabled: bool = True
+    max_entries: int = 1024
+    max_bytes: int = 64 * 1024 * 1024  # serialized size of all cached results, per process
+    live_refresh_seconds: float = 900.0  # how long live prices are assumed unchanged
+
+class MetricsConfig(BaseModel):
+    """Tool metrics endpoint configuration"""
+    enabled: bool = True
+    path: str = "/metrics"  # Prometheus text endpoint served next to the MCP transport
+    shared_directory: str = "data/metrics"  # per-worker snapshots merged on scrape when workers > 1
+    flush_interval_seconds: float = 5.0  # how stale another worker's numbers may be
+
+class ProfilingConfig(BaseModel):
+    """Opt-in per-call profiling configuration"""
+    enabled: bool = False  # when False tools are registered without the profiling wrapper
+    sample_rate: float = 0.0  # fraction of calls to profile at random
+    tools: List[str] = []  # tools whose every call is profiled
+    interval_seconds: float = 0.005  # stack sampling interval
+    output_directory: str = "data/profiles"  # collapsed-stack files for flame graphs
+
+class SyntheticDataConfig(BaseModel):
+    """Synthetic market data used when the "synthetic" provider is enabled"""
+    seed: int = 42
+    origin: str = "1990-01-01"  # first generated trading day
+    as_of: Optional[str] = None  # last generated day (default: today)
+    factors: int = 3  # shared market factors driving cross-asset correlation
+    fat_tail_df: Optional[float] = 5.0  # Student-t degrees of freedom, None for normal shocks
+    regimes: bool = True  # switch between calm and stressed markets
+    stress_entry_probability: float = 0.01  # daily chance of entering a stressed regime
+    stress_exit_probability: float = 0.05  # daily chance of leaving it
+    stress_volatility_multiplier: float = 2.5
+    dividends: bool = True  # quarterly dividends; Adj Close is back-adjusted
+
 class AppConfig(BaseModel):
     """Main application configuration"""
     service_name: str = "Financial Advisor AI Copilot"
@@ -33,6 +219,8 @@ class AppConfig(BaseModel):
     
     # Data providers
     data_providers: Dict[str, DataProviderConfig] = {
+        # Offline generated prices for load testing; takes precedence when enabled
+        "synthetic": DataProviderConfig(name="synthetic", enabled=False),
         "yfinance": DataProviderConfig(name="yfinance", enabled=True),
         "alpha_vantage": DataProviderConfig(
             name="alpha_vantage", 
@@ -52,6 +240,60 @@ class AppConfig(BaseModel):
     # Backtesting settings
     backtest: BacktestConfig = BacktestConfig()
     
+    # VaR and CVaR settings
+    risk: RiskConfig = RiskConfig()
+    
+    # Correlation analysis settings
+    correlation: CorrelationConfig = CorrelationConfig()
+    
+    # Stress scenario settings
+    scenarios: ScenarioConfig = ScenarioConfig()
+    
+    # Tax-lot rebalancing settings
+    tax: TaxConfig = TaxConfig()
+    
+    # Drift monitoring settings
+    drift: DriftConfig = DriftConfig()
+    
+    # Fundamentals screening settings
+    fundamentals: FundamentalsConfig = FundamentalsConfig()
+    
+    # Storage settings
+    storage: StorageConfig = StorageConfig()
+    
+    # Tool execution settings
+    execution: ExecutionConfig = ExecutionConfig()
+    
+    # Shared price cache settings
+    price_cache: PriceCacheConfig = PriceCacheConfig()
+    
+    # Server settings
+    server: ServerConfig = ServerConfig()
+    
+    # Tool result cache settings
+    result_cache: ResultCacheConfig = ResultCacheConfig()
+    
+    # Warm-up settings
+    warmup: WarmupConfig = WarmupConfig()
+    
+    # End-of-day pipeline settings
+    eod: EodConfig = EodConfig()
+    
+    # Admission control settings
+    admission: AdmissionConfig = AdmissionConfig()
+    
+    # Deadline settings
+    deadlines: DeadlineConfig = DeadlineConfig()
+    
+    # Metrics settings
+    metrics: MetricsConfig = MetricsConfig()
+    
+    # Profiling settings
+    profiling: ProfilingConfig = ProfilingConfig()
+    
+    # Synthetic market data settings
+    synthetic_data: SyntheticDataConfig = SyntheticDataConfig()
+    
     # Asset universe definitions
     asset_universes: Dict[str, List[str]] = {
         "conservative": ["BND", "VTI", "VEA", "VTEB"],
@@ -61,4 +303,13 @@ class AppConfig(BaseModel):
     }
 
 # Global configuration instance
-config = AppConfig()
\ No newline at end of file
+config = AppConfig()
+def relocate_data(directory: str) -> None:
+    """Keep the client database, caches and batch output under ``directory`` instead of ``data/``"""
+    config.storage.client_db_path = os.path.join(directory, "clients.db")
+    config.storage.files_directory = os.path.join(directory, "files")
+    config.price_cache.directory = os.path.join(directory, "price_cache")
+    config.fundamentals.path = os.path.join(directory, "fundamentals.npz")
+    config.eod.directory = os.path.join(directory, "eod")
+    config.metrics.shared_directory = os.path.join(directory, "metrics")
+    config.profiling.output_directory = os.path.join(directory, "profiles")
@@ -0,0 +1,29 @@
+"""
+Shared pytest setup: keep every test's files out of the real data directory
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from config import config as app_config, relocate_data
+
+_DATA_DIRECTORY = tempfile.mkdtemp(prefix="advisor-tests-")
+
+
+def pytest_configure(config):
+    # Runs before test modules are collected, so before any of them imports main
+    relocate_data(_DATA_DIRECTORY)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_DATA_DIRECTORY, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def data_directory():
+    """Temporary directory holding this run's client database, price cache and batch output"""
+    assert os.path.dirname(app_config.storage.client_db_path) == _DATA_DIRECTORY
+    return _DATA_DIRECTORY
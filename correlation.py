@@ -0,0 +1,194 @@
+"""
+Correlation and redundancy analysis for Financial Advisor AI Copilot
+
+A ``CorrelationModel`` produces any block of a universe's correlation
+matrix on demand, without forming the whole n x n matrix:
+
+- from returns: columns are standardized once, and a block is one
+  product of the standardized columns it needs. When histories have gaps
+  (a later listing, a missing bar), each pair is correlated over the days
+  both have returns instead: a block is then a few products of the
+  columns and their observation masks. Pairs sharing fewer than
+  ``min_overlap`` days have no correlation (NaN) and are never reported.
+- from a covariance estimate (the precomputed universe estimates, see
+  warmup.py): a block is the covariance block scaled by the volatilities.
+  Symbols without variance are left out, as they are from returns.
+
+Top-k pairs and clusters walk the upper triangle one row block at a time.
+``np.argpartition`` keeps only each block's k best pairs before they are
+merged, so nothing sorts all n² pairs. Clusters are the connected
+components of the sparse graph of pairs correlated above a threshold:
+holdings that are, transitively, the same bet.
+
+Models are kept in a small LRU keyed by universe and data version, so
+repeat questions about the same universe skip the standardization.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from cancellation import checkpoint
+
+
+class CorrelationModel:
+    """Correlation blocks of one universe, from standardized returns or a covariance matrix"""
+
+    def __init__(self, symbols: Sequence[str], standardized: Optional[np.ndarray] = None,
+                 covariance: Optional[np.ndarray] = None, observed: Optional[np.ndarray] = None,
+                 min_overlap: int = 2):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._standardized = standardized
+        self._covariance = covariance
+        self._observed = observed
+        self.min_overlap = min_overlap
+        self._positions = np.arange(len(self.symbols))
+        if covariance is not None:
+            self._volatility = np.sqrt(np.diag(covariance))
+
+    @classmethod
+    def from_returns(cls, symbols: Sequence[str], returns: np.ndarray, min_overlap: int = 2) -> "CorrelationModel":
+        """Model over a T x N returns panel, NaN where a symbol has no return; constant columns must already be removed"""
+        observed = ~np.isnan(returns)
+        if observed.all():
+            centered = returns - returns.mean(axis=0)
+            scale = np.sqrt((centered ** 2).sum(axis=0))
+            return cls(symbols, standardized=centered / scale)
+        # Centering on each column's own mean keeps the pairwise sums well conditioned
+        centered = np.where(observed, returns - np.nanmean(returns, axis=0), 0.0)
+        return cls(symbols, standardized=centered, observed=observed.astype(float), min_overlap=min_overlap)
+
+    @classmethod
+    def from_covariance(cls, symbols: Sequence[str], covariance: np.ndarray) -> "CorrelationModel":
+        """Model from a covariance matrix, leaving out symbols without variance"""
+        covariance = np.asarray(covariance, dtype=float)
+        usable = np.diag(covariance) > 0
+        return cls(
+            [symbol for symbol, keep in zip(symbols, usable) if keep],
+            covariance=covariance[np.ix_(usable, usable)]
+        )
+
+    @property
+    def source(self) -> str:
+        return "returns" if self._standardized is not None else "covariance"
+
+    def _pairwise_block(self, rows: Any, columns: Any) -> np.ndarray:
+        """Pearson correlation of each pair over the days both symbols have returns"""
+        x, y = self._standardized[:, rows], self._standardized[:, columns]
+        mx, my = self._observed[:, rows], self._observed[:, columns]
+        count = mx.T @ my
+        sum_x, sum_y = x.T @ my, mx.T @ y
+        covariance = count * (x.T @ y) - sum_x * sum_y
+        variance_x = count * ((x ** 2).T @ my) - sum_x ** 2
+        variance_y = count * (mx.T @ (y ** 2)) - sum_y ** 2
+        usable = (count >= self.min_overlap) & (variance_x > 0) & (variance_y > 0)
+        block = np.full(count.shape, np.nan)
+        block[usable] = covariance[usable] / np.sqrt(variance_x[usable] * variance_y[usable])
+        return block
+
+    def block(self, rows: Any, columns: Any) -> np.ndarray:
+        """Correlations of the ``rows`` symbols (by position) with the ``columns`` symbols; NaN without enough overlap"""
+        if self._observed is not None:
+            block = self._pairwise_block(rows, columns)
+        elif self._standardized is not None:
+            block = self._standardized[:, rows].T @ self._standardized[:, columns]
+        else:
+            rows, columns = self._positions[rows], self._positions[columns]
+            block = self._covariance[np.ix_(rows, columns)] / np.outer(self._volatility[rows], self._volatility[columns])
+        return np.clip(block, -1.0, 1.0)
+
+    def matrix(self, symbols: Sequence[str]) -> np.ndarray:
+        positions = [self.index[symbol] for symbol in symbols]
+        return self.block(positions, positions)
+
+    def _upper_blocks(self, block_size: int):
+        """(row offset, block of rows x all later columns) with the diagonal and below masked out"""
+        n = len(self.symbols)
+        for start in range(0, n - 1, block_size):
+            checkpoint()
+            stop = min(start + block_size, n)
+            block = self.block(slice(start, stop), slice(start, n))
+            # Column j of the block is symbol start + j; keep only pairs above the diagonal
+            below = np.arange(stop - start)[:, None] >= np.arange(n - start)[None, :]
+            yield start, np.where(below | np.isnan(block), -np.inf, block)
+
+    def top_pairs(self, k: int, block_size: int = 512) -> List[Tuple[str, str, float]]:
+        """The ``k`` most correlated distinct pairs, highest first"""
+        best_values = np.empty(0)
+        best_pairs = np.empty((0, 2), dtype=np.int64)
+        for start, block in self._upper_blocks(block_size):
+            flat = block.ravel()
+            keep = min(k, flat.size)
+            candidates = np.argpartition(flat, flat.size - keep)[flat.size - keep:]
+            candidates = candidates[np.isfinite(flat[candidates])]
+            rows, columns = np.divmod(candidates, block.shape[1])
+            best_values = np.concatenate([best_values, flat[candidates]])
+            best_pairs = np.vstack([best_pairs, np.column_stack([rows + start, columns + start])])
+            if best_values.size > k:
+                kept = np.argpartition(best_values, best_values.size - k)[best_values.size - k:]
+                best_values, best_pairs = best_values[kept], best_pairs[kept]
+        order = np.argsort(-best_values, kind="stable")
+        return [
+            (self.symbols[i], self.symbols[j], float(value))
+            for (i, j), value in zip(best_pairs[order], best_values[order])
+        ]
+
+    def clusters(self, threshold: float, block_size: int = 512) -> List[Dict[str, Any]]:
+        """Groups of symbols linked by chains of pairs correlated at least ``threshold``, largest first"""
+        n = len(self.symbols)
+        rows, columns = [], []
+        for start, block in self._upper_blocks(block_size):
+            i, j = np.nonzero(block >= threshold)
+            rows.append(i + start)
+            columns.append(j + start)
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        columns = np.concatenate(columns) if columns else np.empty(0, dtype=np.int64)
+        graph = sparse.coo_matrix((np.ones(rows.size), (rows, columns)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+
+        members = np.argsort(labels, kind="stable")
+        groups = np.split(members, np.flatnonzero(np.diff(labels[members])) + 1)
+        result = []
+        for group in groups:
+            if len(group) < 2:
+                continue
+            block = self.block(group, group)
+            np.fill_diagonal(block, np.nan)
+            result.append({
+                "symbols": [self.symbols[i] for i in group],
+                "mean_correlation": float(np.nanmean(block))  # linked members always share some pairs
+            })
+        result.sort(key=lambda cluster: (-len(cluster["symbols"]), -cluster["mean_correlation"]))
+        return result
+
+
+class ModelCache:
+    """Least recently used correlation models"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._models: "OrderedDict[Hashable, CorrelationModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CorrelationModel]:
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+            return model
+
+    def put(self, key: Hashable, model: CorrelationModel) -> None:
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
@@ -0,0 +1,239 @@
+"""
+Incremental drift monitoring for Financial Advisor AI Copilot
+
+Every client's share quantities and target weights are kept as sparse
+client x symbol matrices. Drift is the share of the portfolio that would
+have to trade to get back to target, ``0.5 * sum(|weight - target|)``.
+
+A price update only moves the weights of clients holding the repriced
+symbols. The column-major copy of the quantity matrix is an inverted
+index from each symbol to the clients holding it, so an update finds those
+clients with one slice per repriced symbol. Their weights and drift are
+then recomputed together as sparse row operations. Clients who hold none
+of the repriced symbols are not touched.
+
+Client changes are buffered, like account updates in aggregation.py, and
+applied as one row replacement at the next price update or query.
+"""
+
+import threading
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from aggregation import _locked
+
+
+class DriftMonitor:
+    """Client drift from target weights, recomputed only for clients whose holdings were repriced"""
+
+    def __init__(self, band: float):
+        self.band = band
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.clients: List[str] = []
+        self.symbols: List[str] = []
+        self._client_index: Dict[str, int] = {}
+        self._symbol_index: Dict[str, int] = {}
+        self._quantities = sparse.csr_matrix((0, 0))
+        self._targets = sparse.csr_matrix((0, 0))
+        self._holders = sparse.csc_matrix((0, 0))  # symbol -> clients holding it
+        self._prices = np.zeros(0)
+        self._drift = np.zeros(0)
+        self._bands = np.zeros(0)
+        self._breached = np.zeros(0, dtype=bool)
+        # client row -> (target {symbol column: weight}, quantities {symbol column: shares}, band)
+        self._pending: Dict[int, Tuple[Dict[int, float], Dict[int, float], float]] = {}
+
+    def _intern_symbol(self, symbol: str) -> int:
+        column = self._symbol_index.get(symbol)
+        if column is None:
+            column = len(self.symbols)
+            self._symbol_index[symbol] = column
+            self.symbols.append(symbol)
+        return column
+
+    def _intern_client(self, client: str) -> int:
+        row = self._client_index.get(client)
+        if row is None:
+            row = len(self.clients)
+            self._client_index[client] = row
+            self.clients.append(client)
+        return row
+
+    def _grow(self) -> None:
+        """Extend the per-symbol and per-client arrays to newly interned names"""
+        n_symbols, n_clients = len(self.symbols), len(self.clients)
+        if self._prices.size < n_symbols:
+            self._prices = np.concatenate([self._prices, np.full(n_symbols - self._prices.size, np.nan)])
+        if self._drift.size < n_clients:
+            added = n_clients - self._drift.size
+            self._drift = np.concatenate([self._drift, np.full(added, np.nan)])
+            self._bands = np.concatenate([self._bands, np.full(added, self.band)])
+            self._breached = np.concatenate([self._breached, np.zeros(added, dtype=bool)])
+
+    @_locked
+    def load(self, clients: Mapping[str, Tuple[Mapping[str, float], Mapping[str, float]]]) -> None:
+        """Replace every client with ``clients`` (client -> (target weights, share quantities))"""
+        self._reset()
+        for client, (target, quantities) in clients.items():
+            self.set_client(client, target, quantities)
+
+    @_locked
+    def set_client(
+        self,
+        client: str,
+        target: Mapping[str, float],
+        quantities: Mapping[str, float],
+        band: Optional[float] = None
+    ) -> None:
+        """Replace one client's target weights and share quantities"""
+        total = sum(target.values())
+        if total <= 0:
+            raise ValueError(f"Target weights for {client} must add up to more than zero")
+        row = self._intern_client(client)
+        self._pending[row] = (
+            {self._intern_symbol(symbol): weight / total for symbol, weight in target.items()},
+            {self._intern_symbol(symbol): quantity for symbol, quantity in quantities.items() if quantity},
+            self.band if band is None else band
+        )
+
+    @_locked
+    def remove_client(self, client: str) -> None:
+        """Stop monitoring a client; it stays listed but holds nothing and is never flagged"""
+        row = self._client_index.get(client)
+        if row is not None:
+            self._pending[row] = ({}, {}, self._bands[row])
+
+    def _replace_rows(self, matrix: sparse.csr_matrix, rows: np.ndarray, entries: Iterable[Dict[int, float]]) -> sparse.csr_matrix:
+        shape = (len(self.clients), len(self.symbols))
+        if matrix.shape != shape:
+            matrix = matrix.copy()
+            matrix.resize(shape)
+        keep = np.ones(shape[0])
+        keep[rows] = 0.0
+        entries = list(entries)
+        counts = [len(entry) for entry in entries]
+        new_columns = np.fromiter(chain.from_iterable(entries), dtype=np.int64, count=sum(counts))
+        new_values = np.fromiter(chain.from_iterable(entry.values() for entry in entries), dtype=float, count=sum(counts))
+        replaced = sparse.csr_matrix((new_values, (np.repeat(rows, counts), new_columns)), shape=shape)
+        matrix = (sparse.diags(keep) @ matrix + replaced).tocsr()
+        matrix.eliminate_zeros()
+        return matrix
+
+    def _flush(self) -> np.ndarray:
+        """Apply buffered client changes; returns the changed client rows"""
+        self._grow()
+        rows = np.fromiter(self._pending, dtype=np.int64, count=len(self._pending))
+        if rows.size == 0 and self._quantities.shape == (len(self.clients), len(self.symbols)):
+            return rows
+        changes = [self._pending[row] for row in rows]
+        self._targets = self._replace_rows(self._targets, rows, [target for target, _, _ in changes])
+        self._quantities = self._replace_rows(self._quantities, rows, [quantities for _, quantities, _ in changes])
+        self._holders = self._quantities.tocsc()
+        if rows.size:
+            self._bands[rows] = [band for _, _, band in changes]
+        self._pending.clear()
+        return rows
+
+    def _recompute(self, rows: np.ndarray) -> Dict[str, List[str]]:
+        """Drift of ``rows``, and which of them started or stopped breaching their band"""
+        if rows.size == 0:
+            return {"breached": [], "cleared": []}
+        quantities = self._quantities[rows]
+        values = sparse.csr_matrix(
+            (quantities.data * self._prices[quantities.indices], quantities.indices, quantities.indptr),
+            shape=quantities.shape
+        )
+        totals = np.asarray(values.sum(axis=1)).ravel()
+        # Empty or partly unpriced holdings have no weights yet: their drift stays NaN and never breaches
+        inverse = np.divide(1.0, totals, out=np.full_like(totals, np.nan), where=totals > 0)
+        gap = sparse.diags(inverse) @ values - self._targets[rows]
+        drift = 0.5 * np.asarray(abs(gap).sum(axis=1)).ravel()
+        drift[~np.isfinite(inverse)] = np.nan
+        self._drift[rows] = drift
+
+        was_breached = self._breached[rows]
+        breached = drift > self._bands[rows]
+        self._breached[rows] = breached
+        return {
+            "breached": [self.clients[row] for row in rows[breached & ~was_breached]],
+            "cleared": [self.clients[row] for row in rows[was_breached & ~breached]]
+        }
+
+    @_locked
+    def update_prices(self, prices: Mapping[str, float]) -> Dict[str, Any]:
+        """Reprice symbols and recompute drift for the clients holding any of them
+
+        Clients changed since the last update are recomputed too. Returns
+        the counts and the clients that started or stopped breaching.
+        """
+        changed = []
+        for symbol, price in prices.items():
+            if not price > 0:
+                raise ValueError(f"Price of {symbol} must be positive")
+            column = self._intern_symbol(symbol)
+            self._grow()
+            if self._prices[column] != price:
+                self._prices[column] = price
+                changed.append(column)
+        pending = self._flush()
+
+        indptr, indices = self._holders.indptr, self._holders.indices
+        holders = [indices[indptr[column]:indptr[column + 1]] for column in changed]
+        rows = np.unique(np.concatenate(holders + [pending])).astype(np.int64)
+        flags = self._recompute(rows)
+        return {
+            "symbols_changed": len(changed),
+            "clients_recomputed": int(rows.size),
+            "clients_monitored": len(self.clients),
+            **flags
+        }
+
+    @_locked
+    def unpriced(self, symbols: Optional[Iterable[str]] = None) -> List[str]:
+        """Symbols (all monitored symbols by default) that have no price yet"""
+        self._grow()
+        if symbols is None:
+            symbols = self.symbols
+        return [
+            symbol for symbol in symbols
+            if symbol not in self._symbol_index or np.isnan(self._prices[self._symbol_index[symbol]])
+        ]
+
+    @_locked
+    def breaches(self, band: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Clients over their band (or over ``band`` when given), most drifted first"""
+        self._recompute(self._flush())
+        flagged = self._breached if band is None else self._drift > band
+        rows = np.flatnonzero(flagged)
+        rows = rows[np.argsort(-self._drift[rows], kind="stable")]
+        return [(self.clients[row], float(self._drift[row])) for row in rows]
+
+    @_locked
+    def client_drift(self, client: str) -> Dict[str, Any]:
+        """One client's drift, band, current weights and target weights"""
+        self._recompute(self._flush())
+        row = self._client_index[client]
+        quantities, target = self._quantities.getrow(row), self._targets.getrow(row)
+        values = quantities.data * self._prices[quantities.indices]
+        total = values.sum()
+        return {
+            "client": client,
+            "drift": float(self._drift[row]) if np.isfinite(self._drift[row]) else None,
+            "band": float(self._bands[row]),
+            "breached": bool(self._breached[row]),
+            "market_value": float(total),
+            "weights": {self.symbols[column]: float(value / total) for column, value in zip(quantities.indices, values)} if total > 0 else {},
+            "target": {self.symbols[column]: float(weight) for column, weight in zip(target.indices, target.data)}
+        }
+
+    def __contains__(self, client: str) -> bool:
+        return client in self._client_index
+
+    def __len__(self) -> int:
+        return len(self.clients)
@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+End-of-day batch pipeline for Financial Advisor AI Copilot
+
+After the close, the pipeline runs these stages as a dependency graph
+(see pipeline.py):
+
+    book ──> prices ──┬──> estimates ──┐
+      │               │                ├──> client_risk ──> report
+      ├───────────────┼──> backtests ──┘                      ^
+      └───────────────┴──> var ───────────────────────────────┘
+
+- book: client profiles, their target portfolios (the stored target
+  weights, else the default risk-based allocation, as the drift monitor
+  uses), their tax-lot share quantities, and household holdings when the
+  server has any. It also stamps the market data version before prices
+  are fetched; the estimates carry that stamp, so bars landing during
+  the run leave them stale rather than passing for current.
+- prices: refreshes the price history of every held symbol, every warm
+  universe and the benchmark, bypassing cached windows.
+- estimates: updates the return and covariance estimators of the warm
+  universes incrementally. Each estimator keeps running sums over its
+  window, adds the days that arrived and drops the days that left, then
+  replaces the warm-up estimates (see warmup.py).
+- backtests: rolls each distinct target portfolio's stored backtest
+  forward over the new days. The backtest buys and holds between
+  rebalances at ``config.portfolio.rebalancing_frequency``.
+- var: VaR and CVaR of every client's portfolio and of the firm as a
+  whole, weighted by client capital (see risk.py), for the morning's
+  compliance report.
+- client_risk: computes expected return, volatility and drift for every
+  client. Drift is measured the way the drift monitor (see drift.py)
+  measures it: tax lots valued at the day's closes when the client has
+  lots, otherwise household holdings, otherwise the backtest's weights
+  since its last rebalance.
+- report: writes ``report.json`` for the run.
+
+Each stage fans its work out over ``config.eod.parallelism`` jobs.
+Finished stages are checkpointed under ``config.eod.directory/<date>``, so
+running the same date again after a failure resumes where it stopped.
+Estimators and backtests are carried between runs in
+``config.eod.directory/state``.
+
+Run it from the command line, or set ``config.eod.schedule_in_server`` to
+have the server run it at ``config.eod.run_at`` on weekdays. With several
+server workers, each one wakes at that time but only the one holding the
+lock on ``config.eod.directory/scheduler.lock`` runs the pipeline; the
+lock is released when that process exits, and another worker takes it at
+the next run.
+
+Usage:
+    python eod.py [--as-of 2025-06-30] [--fresh] [--no-refresh] [--synthetic]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from config import config
+from executor import run_cpu, run_io
+from market_data import adj_close, data_version
+from pipeline import Pipeline, StageFailed, fan_out
+from warmup import warmer
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+REBUILD_EVERY = 20  # incremental updates before an estimator is recomputed from scratch
+RISK_LEVELS = ("conservative", "moderate", "aggressive")
+
+
+def _daily_returns(prices: "pd.DataFrame", symbols: Sequence[str]) -> "pd.DataFrame":
+    """Daily returns of ``symbols`` over their own dates, as ``_estimate_returns`` computes them"""
+    return prices[list(symbols)].dropna(how="all").pct_change().dropna()
+
+
+class RollingMoments:
+    """Running sums of daily returns and their outer products over a window of days"""
+
+    def __init__(self, symbols: Sequence[str]):
+        import numpy as np
+
+        self.symbols = list(symbols)
+        self.dates = np.array([], dtype="datetime64[D]")
+        self.returns = np.empty((0, len(self.symbols)))
+        self.sum = np.zeros(len(self.symbols))
+        self.outer = np.zeros((len(self.symbols), len(self.symbols)))
+        self.updates = 0
+        self.rebuilds = 0
+
+    def _rebuild(self, dates: "np.ndarray", returns: "np.ndarray") -> None:
+        self.dates, self.returns = dates, returns
+        self.sum = returns.sum(axis=0)
+        self.outer = returns.T @ returns
+        self.updates = 0
+        self.rebuilds += 1
+
+    def update(self, dates: "np.ndarray", returns: "np.ndarray") -> int:
+        """Move the window to exactly ``dates``; return how many days were added"""
+        import numpy as np
+
+        if (
+            not len(self.dates) or not len(dates) or self.updates >= REBUILD_EVERY
+            or dates[0] < self.dates[0] or dates[0] > self.dates[-1]
+        ):
+            self._rebuild(dates, returns)
+            return len(dates)
+        expired = self.dates < dates[0]
+        added = dates > self.dates[-1]
+        if not np.array_equal(self.dates[~expired], dates[~added]):
+            self._rebuild(dates, returns)  # gaps or restated history: start over
+            return len(dates)
+        old, new = self.returns[expired], returns[added]
+        self.sum += new.sum(axis=0) - old.sum(axis=0)
+        self.outer += new.T @ new - old.T @ old
+        self.dates = dates
+        self.returns = np.vstack([self.returns[~expired], new])
+        self.updates += 1
+        return int(added.sum())
+
+    def estimates(self) -> Tuple["pd.Series", "pd.DataFrame"]:
+        """Mean daily returns and annualized covariance, in ``_estimate_returns`` form"""
+        import numpy as np
+        import pandas as pd
+
+        n = len(self.dates)
+        mean = self.sum / n
+        covariance = (self.outer - np.outer(self.sum, self.sum) / n) / (n - 1) * 252
+        return (
+            pd.Series(mean, index=self.symbols),
+            pd.DataFrame(covariance, index=self.symbols, columns=self.symbols)
+        )
+
+
+def _rebalance_period(day: "np.datetime64") -> int:
+    months = int(day.astype("datetime64[M]").astype(int))
+    frequency = config.portfolio.rebalancing_frequency
+    return months if frequency == "monthly" else months // 12 if frequency == "annually" else months // 3
+
+
+class RolledBacktest:
+    """Backtest of one target portfolio, rolled forward a day at a time"""
+
+    def __init__(self, portfolio: Dict[str, float]):
+        import numpy as np
+
+        self.symbols = list(portfolio)
+        self.weights = np.array(list(portfolio.values()), dtype=float)
+        self.values = self.weights.copy()  # holdings value per symbol; their sum is the NAV
+        self.nav = float(self.values.sum())
+        self.peak = self.nav
+        self.max_drawdown = 0.0
+        self.days = 0
+        self.return_sum = 0.0
+        self.return_sumsq = 0.0
+        self.start: Optional[str] = None
+        self.as_of: Optional["np.datetime64"] = None
+        self.period: Optional[int] = None
+
+    def roll_forward(self, dates: "np.ndarray", returns: "np.ndarray") -> int:
+        """Apply the daily returns dated after ``as_of``; return how many days were applied"""
+        mask = dates > self.as_of if self.as_of is not None else slice(None)
+        new_dates, new_returns = dates[mask], returns[mask]
+        for day, day_returns in zip(new_dates, new_returns):
+            period = _rebalance_period(day)
+            if self.period is not None and period != self.period:
+                self.values = self.nav * self.weights
+            self.period = period
+            self.values = self.values * (1 + day_returns)
+            nav = float(self.values.sum())
+            daily = nav / self.nav - 1
+            self.nav = nav
+            self.peak = max(self.peak, nav)
+            self.max_drawdown = min(self.max_drawdown, nav / self.peak - 1)
+            self.days += 1
+            self.return_sum += daily
+            self.return_sumsq += daily * daily
+        if len(new_dates):
+            self.start = self.start or str(new_dates[0])
+            self.as_of = new_dates[-1]
+        return len(new_dates)
+
+    def drifted_weights(self) -> Dict[str, float]:
+        return {symbol: float(value / self.nav) for symbol, value in zip(self.symbols, self.values)}
+
+    def metrics(self) -> Dict[str, Any]:
+        import numpy as np
+
+        n = self.days
+        variance = (self.return_sumsq - self.return_sum ** 2 / n) / (n - 1) if n > 1 else 0.0
+        volatility = float(np.sqrt(max(variance, 0.0) * 252))
+        cagr = float(self.nav ** (252 / n) - 1) if n else 0.0
+        drifted = self.drifted_weights()
+        return {
+            "start": self.start,
+            "as_of": str(self.as_of) if self.as_of is not None else None,
+            "total_return": self.nav - 1,
+            "cagr": cagr,
+            "volatility": volatility,
+            "sharpe_ratio": cagr / volatility if volatility > 0 else 0.0,
+            "max_drawdown": self.max_drawdown,
+            "drift": _drift(drifted, dict(zip(self.symbols, self.weights.tolist())))
+        }
+
+
+def _drift(actual: Dict[str, float], target: Dict[str, float]) -> float:
+    """Share of the portfolio that would have to trade to get back to target"""
+    symbols = set(actual) | set(target)
+    return 0.5 * sum(abs(actual.get(symbol, 0.0) - target.get(symbol, 0.0)) for symbol in symbols)
+
+
+def _portfolio_key(portfolio: Dict[str, float]) -> Tuple[Tuple[str, float], ...]:
+    return tuple(portfolio.items())
+
+
+def _load_state(path: str) -> Dict[Any, Any]:
+    try:
+        with open(path, "rb") as handle:
+            return pickle.load(handle)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return {}  # state is only a head start; estimators and backtests rebuild from prices
+
+
+def _save_state(path: str, state: Dict[Any, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        pickle.dump(state, handle, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _lot_quantities(clients: Set[str]) -> Dict[str, Dict[str, float]]:
+    """Shares held per symbol of each of ``clients`` with tax lots"""
+    import main
+
+    return {client: main._lot_quantities(lots) for client, lots in main.tax_lots.iter_lots() if client in clients}
+
+
+def _lot_weights(quantities: Optional[Dict[str, float]], closes: Optional["pd.Series"]) -> Optional[Dict[str, float]]:
+    """Weights of lot holdings at the closes; None when any holding has no close, like an unpriced client in drift.py"""
+    if not quantities or closes is None:
+        return None
+    values = {}
+    for symbol, quantity in quantities.items():
+        price = closes.get(symbol)
+        if price is None or not price > 0:
+            return None
+        values[symbol] = quantity * float(price)
+    total = sum(values.values())
+    return {symbol: value / total for symbol, value in values.items()} if total > 0 else None
+
+
+def _household_holdings(clients: Sequence[str]) -> Dict[str, Dict[str, float]]:
+    """Holdings weights of the households named after clients"""
+    import main
+
+    engine = main._exposure_engine()
+    households = set(engine.households)
+    return {name: engine.household_weights(name) for name in clients if name in households}
+
+
+def _update_estimator(moments: RollingMoments, prices: "pd.DataFrame") -> Tuple[int, Tuple["pd.Series", "pd.DataFrame"]]:
+    returns = _daily_returns(prices, moments.symbols)
+    added = moments.update(returns.index.values.astype("datetime64[D]"), returns.to_numpy())
+    return added, moments.estimates()
+
+
+def _roll_backtest(backtest: RolledBacktest, prices: "pd.DataFrame") -> Dict[str, Any]:
+    returns = prices[backtest.symbols].dropna().pct_change().dropna()
+    backtest.roll_forward(returns.index.values.astype("datetime64[D]"), returns.to_numpy())
+    return backtest.metrics()
+
+
+def _portfolio_risk(
+    portfolio: Dict[str, float],
+    estimates: Tuple["pd.Series", "pd.DataFrame"]
+) -> Dict[str, float]:
+    """Expected annual return and volatility of a portfolio from universe estimates"""
+    import numpy as np
+
+    mean_returns, covariance = estimates
+    symbols = list(portfolio)
+    weights = np.array(list(portfolio.values()))
+    mean = mean_returns[symbols].to_numpy()
+    cov = covariance.loc[symbols, symbols].to_numpy()
+    return {
+        "expected_return": float(mean @ weights * 252),
+        "volatility": float(np.sqrt(max(weights @ cov @ weights, 0.0)))
+    }
+
+
+def build_pipeline(run_dir: str, state_dir: str, refresh: bool = True) -> Pipeline:
+    """The end-of-day stages; ``run_dir`` receives the report"""
+    import main
+
+    pipeline = Pipeline("eod")
+    parallelism = config.eod.parallelism
+
+    @pipeline.stage()
+    async def book() -> Dict[str, Any]:
+        version = data_version()  # before the fetch, never after
+        profiles = await run_io(
+            lambda: {name: profile.model_dump() for name, profile in main.client_profiles.items()}
+        )
+        targets = await run_io(main.tax_lots.targets, list(profiles))
+        portfolios = await run_cpu(main._book_portfolios, profiles, targets)
+        lots = await run_io(_lot_quantities, set(profiles))
+        holdings = await run_cpu(_household_holdings, list(profiles))
+        return {
+            "data_version": version,
+            "risk_tolerance": {name: profile["risk_tolerance"] for name, profile in profiles.items()},
+            "capital": {name: profile["capital"] for name, profile in profiles.items()},
+            "portfolios": portfolios,
+            "lots": lots,
+            "holdings": holdings
+        }
+
+    @pipeline.stage(depends_on=["book"])
+    async def prices(book: Dict[str, Any]) -> "pd.DataFrame":
+        symbols = {symbol for portfolio in book["portfolios"].values() for symbol in portfolio}
+        symbols |= {symbol for quantities in book["lots"].values() for symbol in quantities}
+        symbols |= {symbol for weights in book["holdings"].values() for symbol in weights}
+        symbols |= {symbol for universe in main._warm_universes().values() for symbol in universe}
+        symbols.add(config.backtest.benchmark)
+        return await adj_close(sorted(symbols), period=main.PORTFOLIO_HISTORY, refresh=refresh)
+
+    @pipeline.stage(depends_on=["book", "prices"])
+    async def estimates(book: Dict[str, Any], prices: "pd.DataFrame") -> Dict[str, Any]:
+        path = os.path.join(state_dir, "estimators.pkl")
+        saved = await run_io(_load_state, path)
+        universes = {
+            tuple(universe) for universe in main._warm_universes().values()
+            if all(symbol in prices.columns for symbol in universe)
+        }
+        estimators = {universe: saved.get(universe) or RollingMoments(universe) for universe in universes}
+        updated = await fan_out(
+            list(estimators.items()),
+            lambda item: run_cpu(_update_estimator, item[1], prices),
+            parallelism
+        )
+        await run_io(_save_state, path, estimators)
+        return {
+            "data_version": book["data_version"],
+            "estimates": {universe: result for universe, (_, result) in zip(estimators, updated)},
+            "days_added": {",".join(universe): added for universe, (added, _) in zip(estimators, updated)}
+        }
+
+    @pipeline.stage(depends_on=["book", "prices"])
+    async def backtests(book: Dict[str, Any], prices: "pd.DataFrame") -> Dict[Any, Dict[str, Any]]:
+        path = os.path.join(state_dir, "backtests.pkl")
+        saved = await run_io(_load_state, path)
+        targets = {_portfolio_key(portfolio): portfolio for portfolio in book["portfolios"].values()}
+        runnable = {
+            key: saved.get(key) or RolledBacktest(portfolio) for key, portfolio in targets.items()
+            if all(symbol in prices.columns for symbol in portfolio)
+        }
+        metrics = await fan_out(
+            list(runnable.values()),
+            lambda backtest: run_cpu(_roll_backtest, backtest, prices),
+            parallelism
+        )
+        await run_io(_save_state, path, runnable)  # portfolios no client holds any more are dropped
+        return dict(zip(runnable, metrics))
+
+    @pipeline.stage(depends_on=["book", "prices"])
+    async def var(book: Dict[str, Any], prices: "pd.DataFrame") -> Optional[Dict[str, Any]]:
+        if not book["portfolios"]:
+            return None
+        settings = config.risk
+        return await run_cpu(
+            main._var_report, prices, book["portfolios"],
+            settings.methods, settings.confidence_levels, settings.horizons, book["capital"]
+        )
+
+    @pipeline.stage(depends_on=["book", "prices", "estimates", "backtests"])
+    async def client_risk(
+        book: Dict[str, Any],
+        prices: "pd.DataFrame",
+        estimates: Dict[str, Any],
+        backtests: Dict[Any, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        targets = {_portfolio_key(portfolio): portfolio for portfolio in book["portfolios"].values()}
+
+        async def risk(item) -> Optional[Dict[str, float]]:
+            key, portfolio = item
+            universe_estimates = estimates["estimates"].get(tuple(portfolio))
+            if universe_estimates is None:
+                if not all(symbol in prices.columns for symbol in portfolio):
+                    return None
+                universe_estimates = await run_cpu(main._estimate_returns, list(portfolio), prices[list(portfolio)].dropna(how="all"))
+            return await run_cpu(_portfolio_risk, portfolio, universe_estimates)
+
+        risks = dict(zip(targets, await fan_out(list(targets.items()), risk, parallelism)))
+        closes = prices.ffill().iloc[-1] if len(prices) else None
+        rows = []
+        for name, portfolio in book["portfolios"].items():
+            key = _portfolio_key(portfolio)
+            backtest = backtests.get(key)
+            row = {"client": name, "risk_tolerance": book["risk_tolerance"][name], **(risks[key] or {})}
+            lot_weights = _lot_weights(book["lots"].get(name), closes)
+            if lot_weights:
+                row["drift"] = _drift(lot_weights, portfolio)
+                row["drift_source"] = "lots"
+            elif name in book["holdings"]:
+                row["drift"] = _drift(book["holdings"][name], portfolio)
+                row["drift_source"] = "holdings"
+            elif backtest is not None:
+                row["drift"] = backtest["drift"]
+                row["drift_source"] = "backtest"
+            if backtest is not None:
+                row["backtest"] = {k: v for k, v in backtest.items() if k != "drift"}
+            rows.append(row)
+        return rows
+
+    @pipeline.stage(depends_on=["prices", "estimates", "var", "client_risk"])
+    async def report(
+        prices: "pd.DataFrame",
+        estimates: Dict[str, Any],
+        var: Optional[Dict[str, Any]],
+        client_risk: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        drifts = sorted((row for row in client_risk if "drift" in row), key=lambda row: row["drift"], reverse=True)
+        summary = {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "prices_through": str(prices.index.max().date()) if len(prices) else None,
+            "symbols": int(prices.shape[1]),
+            "clients": len(client_risk),
+            "estimators": len(estimates["estimates"]),
+            "firm_var": var.get("firm") if var else None,
+            "most_drifted": [
+                {"client": row["client"], "drift": row["drift"], "drift_source": row["drift_source"]}
+                for row in drifts[:10]
+            ]
+        }
+
+        def write() -> None:
+            with open(os.path.join(run_dir, "report.json"), "w", encoding="utf-8") as handle:
+                json.dump({
+                    **summary,
+                    "rows": client_risk,
+                    "var": var["portfolios"] if var else {}
+                }, handle, indent=2, default=str)
+
+        await run_io(write)
+        return summary
+
+    return pipeline
+
+
+async def run_eod(as_of: Optional[str] = None, resume: bool = True, refresh: bool = True) -> Dict[str, Any]:
+    """Run (or resume) the pipeline for ``as_of`` (default today) and publish its estimates"""
+    as_of = as_of or date.today().isoformat()
+    run_dir = os.path.join(config.eod.directory, as_of)
+    state_dir = os.path.join(config.eod.directory, "state")
+    results = await build_pipeline(run_dir, state_dir, refresh).run(run_dir, resume=resume)
+    estimates = results["estimates"]
+    warmer.store_estimates(estimates.get("data_version"), estimates["estimates"])
+    return {"as_of": as_of, "run_dir": run_dir, **results["report"]}
+
+
+def next_run(now: datetime) -> datetime:
+    """Next weekday at ``config.eod.run_at`` after ``now``"""
+    hour, minute = (int(part) for part in config.eod.run_at.split(":"))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+class EodScheduler:
+    """Runs the pipeline inside the server at ``config.eod.run_at`` on weekdays, in one process"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._lock_file = None
+        self.last_summary: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+    def holds_lock(self) -> bool:
+        """Whether this process runs the schedule, taking the lock if no live process holds it"""
+        if self._lock_file is not None:
+            return True
+        import fcntl
+
+        os.makedirs(config.eod.directory, exist_ok=True)
+        handle = open(os.path.join(config.eod.directory, "scheduler.lock"), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._lock_file = handle  # kept open: the lock lasts as long as this process
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            now = datetime.now()
+            await asyncio.sleep((next_run(now) - now).total_seconds())
+            if not self.holds_lock():
+                continue
+            try:
+                self.last_summary = await run_eod()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def start(self) -> None:
+        """Start the schedule on the running loop, once, when ``config.eod.schedule_in_server`` is set"""
+        if not config.eod.schedule_in_server:
+            return
+        if self._task is not None and not self._task.done() and self._task.get_loop() is asyncio.get_running_loop():
+            return
+        self._task = asyncio.create_task(self._loop(), name="eod")
+
+
+scheduler = EodScheduler()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-of-day batch pipeline")
+    parser.add_argument("--as-of", default=None, help="run date, names the checkpoint directory (default: today)")
+    parser.add_argument("--fresh", action="store_true", help="ignore checkpoints of an earlier run for this date")
+    parser.add_argument("--no-refresh", action="store_true", help="use cached prices instead of refreshing them")
+    parser.add_argument("--synthetic", action="store_true", help="use synthetic prices instead of live market data")
+    args = parser.parse_args()
+
+    import main as server
+    from eod import run_eod  # pickle stored state under eod.*, not __main__.*, so the server can load it
+
+    if args.synthetic:
+        server.use_synthetic_data()
+
+    started = time.perf_counter()
+    try:
+        summary = asyncio.run(run_eod(args.as_of, resume=not args.fresh, refresh=not args.no_refresh))
+    except StageFailed as e:
+        print(f"❌ {e}")
+        print("Run the same command again to resume from the last finished stage")
+        sys.exit(1)
+
+    with open(os.path.join(summary["run_dir"], "manifest.json"), "r", encoding="utf-8") as handle:
+        stages = json.load(handle)["stages"]
+    print(f"🌙 End-of-day run {summary['as_of']} in {time.perf_counter() - started:.1f} s")
+    print("-" * 50)
+    for name, status in stages.items():
+        timing = "resumed" if status.get("resumed") else f"{status.get('seconds', 0):.2f} s"
+        print(f"{name:<14} {status['status']:<8} {timing:>12}")
+    print("-" * 50)
+    print(f"{summary['clients']} clients, {summary['symbols']} symbols, prices through {summary['prices_through']}")
+    if summary["firm_var"]:
+        firm = summary["firm_var"]
+        for row in firm["risk"]:
+            if row["method"] == "historical":
+                print(f"Firm VaR {row['confidence']:.0%} {row['horizon_days']}d: "
+                      f"{row['var_amount']:,.0f} (CVaR {row['cvar_amount']:,.0f}) of {firm['market_value']:,.0f}")
+    for row in summary["most_drifted"][:5]:
+        print(f"  {row['client']:<30} drift {row['drift']:.2%} ({row['drift_source']})")
+    print(f"Report written to {os.path.join(summary['run_dir'], 'report.json')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Bounded worker pools for tool execution in Financial Advisor AI Copilot
+
+Tool handlers are coroutines that hand blocking work to one of two pools:
+the I/O pool for network and database access, and the CPU pool for
+estimation, optimization and backtests. Both pools are bounded and kept
+apart so a burst of heavy computations cannot starve data fetches, and
+neither can block the event loop serving other sessions.
+
+A job whose tool call was cancelled before a thread picked it up does not
+run (see cancellation.py).
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from cancellation import checkpoint
+from config import config
+from profiling import current_profile
+
+T = TypeVar("T")
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(kind: str) -> ThreadPoolExecutor:
+    """Return the shared pool for ``kind`` ("io" or "cpu"), creating it on first use"""
+    pool = _pools.get(kind)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(kind)
+            if pool is None:
+                if kind == "io":
+                    max_workers = config.execution.io_workers
+                elif kind == "cpu":
+                    max_workers = config.execution.cpu_workers
+                else:
+                    raise ValueError(f"Unknown pool: {kind}")
+                pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{kind}-worker")
+                _pools[kind] = pool
+    return pool
+
+
+def _checked(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    checkpoint()  # the call may have been cancelled while this job was queued
+    return fn(*args, **kwargs)
+
+
+async def run_in_pool(kind: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn`` on the named pool, carrying the caller's context variables along"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    profile = current_profile()
+    if profile is not None:
+        fn = profile.bind(fn)  # sample this pool thread while it works for a profiled call
+    call = functools.partial(context.run, _checked, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_pool(kind), call)
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking I/O (network fetches, database access) off the event loop"""
+    return await run_in_pool("io", fn, *args, **kwargs)
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run CPU-bound work (estimation, optimization, backtests) off the event loop"""
+    return await run_in_pool("cpu", fn, *args, **kwargs)
+
+
+def shutdown(wait: bool = True) -> None:
+    """Shut down every pool created so far"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait, cancel_futures=True)
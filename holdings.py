@@ -0,0 +1,70 @@
+"""
+Persistent account holdings for Financial Advisor AI Copilot
+
+Each account's market value per asset, and the household it belongs to,
+are kept in the same SQLite database as the client profiles (see
+store.py), so they survive restarts and every server process sees the
+same book. The in-memory ``ExposureAggregator`` (aggregation.py) is built
+from this store and rebuilt when the ``accounts`` or ``clients`` version
+shows another process has written since it was loaded.
+"""
+
+from typing import Dict, Mapping, Optional, Tuple
+
+from store import SQLiteStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account TEXT PRIMARY KEY,
+    household TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS account_holdings (
+    account TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (account, asset)
+);
+"""
+
+
+class HoldingStore(SQLiteStore):
+    """Market value per asset and household of every account"""
+
+    schema = _SCHEMA
+
+    def put_account(
+        self,
+        account: str,
+        holdings: Mapping[str, float],
+        household: Optional[str] = None
+    ) -> Tuple[str, int]:
+        """Replace one account's holdings, keeping its household unless one is given
+
+        A new account without a household forms its own. Returns the
+        account's household and the new ``accounts`` version.
+        """
+        with self._transaction() as conn:
+            if household is None:
+                row = conn.execute("SELECT household FROM accounts WHERE account = ?", (account,)).fetchone()
+                household = account if row is None else row[0]
+            conn.execute("INSERT OR REPLACE INTO accounts (account, household) VALUES (?, ?)", (account, household))
+            conn.execute("DELETE FROM account_holdings WHERE account = ?", (account,))
+            conn.executemany(
+                "INSERT INTO account_holdings (account, asset, value) VALUES (?, ?, ?)",
+                [(account, asset, float(value)) for asset, value in holdings.items() if value]
+            )
+            version = self._bump(conn, "accounts")
+        return household, version
+
+    def load(self) -> Tuple[Dict[str, Dict[str, float]], Dict[str, str]]:
+        """Every account's holdings and household, read in one snapshot"""
+        conn = self._connection()
+        conn.execute("BEGIN")  # both queries see the same commit
+        try:
+            households = dict(conn.execute("SELECT account, household FROM accounts"))
+            accounts: Dict[str, Dict[str, float]] = {account: {} for account in households}
+            for account, asset, value in conn.execute("SELECT account, asset, value FROM account_holdings"):
+                accounts[account][asset] = value
+        finally:
+            conn.execute("COMMIT")
+        return accounts, households
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Load generator for Financial Advisor AI Copilot
+
+Opens N concurrent MCP sessions against a running server (SSE or
+streamable HTTP) or against server processes it starts itself (stdio, one
+per session), and replays the advisor workflow
+
+    create_client_profile -> build_portfolio -> backtest_portfolio -> generate_investment_report
+
+at a target rate. Workflow start times follow a fixed open-loop schedule
+shared by all sessions, so when the server falls behind, the delay shows
+up as schedule lag instead of quietly lowering the offered load. Reports
+throughput, errors and latency percentiles per tool.
+
+Start the server with ``--synthetic`` to load-test without market data
+access. Every workflow creates a new client profile named ``loadgen-...``.
+
+Usage:
+    python loadgen.py --transport sse --url http://127.0.0.1:8000/sse --sessions 20 --rate 5 --duration 60
+    python loadgen.py --transport stdio --sessions 4 --workflows 40
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from mcp import ClientSession
+
+WORKFLOW = ("create_client_profile", "build_portfolio", "backtest_portfolio", "generate_investment_report")
+RISK_LEVELS = ("conservative", "moderate", "aggressive")
+
+
+class LoadStats:
+    """Per-tool latencies and errors collected across sessions"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.error_samples: List[str] = []
+        self.workflows_completed = 0
+        self.workflows_failed = 0
+        self.schedule_lag: List[float] = []
+
+    def record(self, tool: str, latency: float, error: Optional[str]) -> None:
+        self.latencies[tool].append(latency)
+        if error is not None:
+            self.errors[tool] += 1
+            if len(self.error_samples) < 10:
+                self.error_samples.append(f"{tool}: {error}")
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        import numpy as np
+
+        tools = {}
+        for tool, latencies in self.latencies.items():
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+            tools[tool] = {
+                "calls": len(latencies),
+                "errors": self.errors.get(tool, 0),
+                "calls_per_second": len(latencies) / elapsed if elapsed > 0 else 0.0,
+                "latency_ms": {
+                    "p50": float(p50),
+                    "p90": float(p90),
+                    "p99": float(p99),
+                    "max": float(max(latencies) * 1000)
+                }
+            }
+        calls = sum(len(latencies) for latencies in self.latencies.values())
+        lag = sorted(self.schedule_lag) or [0.0]
+        return {
+            "elapsed_seconds": elapsed,
+            "workflows_completed": self.workflows_completed,
+            "workflows_failed": self.workflows_failed,
+            "workflows_per_second": self.workflows_completed / elapsed if elapsed > 0 else 0.0,
+            "calls": calls,
+            "calls_per_second": calls / elapsed if elapsed > 0 else 0.0,
+            "schedule_lag_ms": {"p50": lag[len(lag) // 2] * 1000, "max": lag[-1] * 1000},
+            "tools": tools,
+            "error_samples": self.error_samples
+        }
+
+
+@asynccontextmanager
+async def open_session(transport: str, url: str, server_command: List[str]) -> AsyncIterator[ClientSession]:
+    """An initialized MCP client session over the chosen transport"""
+    if transport == "sse":
+        from mcp.client.sse import sse_client
+
+        streams = sse_client(url)
+    elif transport == "streamable-http":
+        from mcp.client.streamable_http import streamablehttp_client
+
+        streams = streamablehttp_client(url)
+    elif transport == "stdio":
+        from mcp import StdioServerParameters
+        from mcp.client.stdio import stdio_client
+
+        streams = stdio_client(StdioServerParameters(
+            command=server_command[0],
+            args=server_command[1:],
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ))
+    else:
+        raise ValueError(f"Unknown transport: {transport}")
+
+    async with streams as (read, write, *_):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+
+
+async def _call(session: ClientSession, stats: LoadStats, tool: str, arguments: Dict[str, Any]) -> Any:
+    """Call one tool, recording its latency and whether it failed"""
+    started = time.perf_counter()
+    error = None
+    result = None
+    try:
+        response = await session.call_tool(tool, arguments)
+        if response.structuredContent is not None and "result" in response.structuredContent:
+            result = response.structuredContent["result"]
+        elif response.content:
+            text = response.content[0].text
+            try:
+                result = json.loads(text)
+            except ValueError:
+                result = text
+        if response.isError:
+            error = str(result)
+        elif isinstance(result, dict) and result.get("status") == "error":
+            error = result.get("message", "error")
+        elif isinstance(result, str) and result.startswith("Error:"):
+            error = result
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    stats.record(tool, time.perf_counter() - started, error)
+    if error is not None:
+        raise RuntimeError(error)
+    return result
+
+
+async def run_workflow(session: ClientSession, stats: LoadStats, rng: random.Random, run_id: str) -> None:
+    """Onboard a client, build and backtest their portfolio, and render the report"""
+    name = f"loadgen-{run_id}-{uuid.uuid4().hex[:8]}"
+    await _call(session, stats, "create_client_profile", {
+        "name": name,
+        "age": rng.randint(25, 75),
+        "risk_tolerance": rng.choice(RISK_LEVELS),
+        "investment_horizon": rng.randint(3, 30),
+        "capital": float(rng.randrange(10_000, 5_000_000, 1_000))
+    })
+    built = await _call(session, stats, "build_portfolio", {"client_name": name})
+    weights = built["portfolio"]["assets"]
+    await _call(session, stats, "backtest_portfolio", {
+        "portfolio": weights,
+        "start_date": f"{rng.randint(2010, 2022)}-01-01"
+    })
+    await _call(session, stats, "generate_investment_report", {"client_name": name, "portfolio": weights})
+
+
+async def run_load(
+    transport: str = "sse",
+    url: str = "http://127.0.0.1:8000/sse",
+    sessions: int = 10,
+    rate: float = 1.0,
+    duration: Optional[float] = 60.0,
+    workflows: Optional[int] = None,
+    server_command: Optional[List[str]] = None,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """Replay workflows from ``sessions`` concurrent sessions at ``rate`` workflows per second"""
+    server_command = server_command or [sys.executable, "main.py", "--transport", "stdio"]
+    stats = LoadStats()
+    run_id = uuid.uuid4().hex[:6]
+    next_slot = 0
+    started = time.perf_counter()
+    ready = asyncio.Event()
+    settled = 0
+
+    def claim_slot() -> Optional[float]:
+        """Scheduled start time of the next workflow, or None when the run is over"""
+        nonlocal next_slot
+        if workflows is not None and next_slot >= workflows:
+            return None
+        scheduled = started + next_slot / rate
+        if duration is not None and scheduled - started >= duration:
+            return None
+        next_slot += 1
+        return scheduled
+
+    def settle() -> None:
+        """Mark one session connected (or failed); the schedule starts when all have settled"""
+        nonlocal settled, started
+        settled += 1
+        if settled == sessions:
+            started = time.perf_counter()
+            ready.set()
+
+    async def session_loop(index: int) -> None:
+        rng = random.Random(seed * 100_003 + index)
+        connected = False
+        try:
+            async with open_session(transport, url, server_command) as session:
+                connected = True
+                settle()
+                await ready.wait()
+                while True:
+                    scheduled = claim_slot()
+                    if scheduled is None:
+                        return
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    stats.schedule_lag.append(max(0.0, -delay))
+                    try:
+                        await run_workflow(session, stats, rng, run_id)
+                        stats.workflows_completed += 1
+                    except RuntimeError:
+                        stats.workflows_failed += 1
+        finally:
+            if not connected:
+                settle()
+
+    results = await asyncio.gather(*(session_loop(i) for i in range(sessions)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    failures = [result for result in results if isinstance(result, BaseException)]
+    summary = stats.summary(elapsed)
+    summary.update({
+        "transport": transport,
+        "sessions": sessions,
+        "target_rate": rate,
+        "session_failures": [f"{type(e).__name__}: {e}" for e in failures[:10]]
+    })
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent MCP load generator")
+    parser.add_argument("--transport", choices=["sse", "streamable-http", "stdio"], default="sse")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/sse", help="server URL for sse/streamable-http")
+    parser.add_argument("--server-command", default=None,
+                        help="server command for stdio (default: python main.py --transport stdio)")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent MCP sessions")
+    parser.add_argument("--rate", type=float, default=1.0, help="target workflows per second across all sessions")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of scheduled load")
+    parser.add_argument("--workflows", type=int, default=None, help="stop after this many workflows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the JSON summary here")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_load(
+        transport=args.transport,
+        url=args.url,
+        sessions=args.sessions,
+        rate=args.rate,
+        duration=args.duration,
+        workflows=args.workflows,
+        server_command=args.server_command.split() if args.server_command else None,
+        seed=args.seed
+    ))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2)
+
+    print(f"🚦 {summary['sessions']} sessions over {summary['transport']}, "
+          f"target {summary['target_rate']:.2f} workflows/s")
+    print(f"Completed {summary['workflows_completed']} workflows ({summary['workflows_failed']} failed) "
+          f"in {summary['elapsed_seconds']:.1f} s: {summary['workflows_per_second']:.2f} workflows/s, "
+          f"{summary['calls_per_second']:.1f} calls/s")
+    print(f"Schedule lag: p50 {summary['schedule_lag_ms']['p50']:.0f} ms, max {summary['schedule_lag_ms']['max']:.0f} ms")
+    print("-" * 78)
+    print(f"{'tool':<28} {'calls':>6} {'errors':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for tool in WORKFLOW:
+        entry = summary["tools"].get(tool)
+        if entry is None:
+            continue
+        latency = entry["latency_ms"]
+        print(f"{tool:<28} {entry['calls']:>6} {entry['errors']:>6} {latency['p50']:>9.1f} "
+              f"{latency['p90']:>9.1f} {latency['p99']:>9.1f} {latency['max']:>9.1f}")
+    for sample in summary["error_samples"] + summary["session_failures"]:
+        print(f"❌ {sample}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Persistent tax lots for Financial Advisor AI Copilot
+
+Each client's holdings are kept as tax lots (symbol, quantity, cost basis
+per share and acquisition date) in the same SQLite database as the client
+profiles (see store.py). Sales are recorded with their realized gain, so
+the rebalancing engine can tell when buying a symbol back would be a wash
+sale. Each client's target weights, once set or rebalanced to, are kept
+alongside so drift is measured against the allocation actually chosen.
+
+Every change to lots or targets advances the ``lots`` version, and the
+latest prices given to the drift monitor are kept here too under the
+``prices`` version, so each server process can tell when its in-memory
+drift monitor (see drift.py) has fallen behind another's writes.
+"""
+
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from store import SQLiteStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tax_lots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    cost_basis REAL NOT NULL,
+    acquired TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tax_lots_client ON tax_lots (client);
+CREATE TABLE IF NOT EXISTS lot_sales (
+    client TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    proceeds REAL NOT NULL,
+    gain REAL NOT NULL,
+    sold TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lot_sales_client ON lot_sales (client, sold);
+CREATE TABLE IF NOT EXISTS target_weights (
+    client TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    weight REAL NOT NULL,
+    PRIMARY KEY (client, symbol)
+);
+CREATE TABLE IF NOT EXISTS latest_prices (
+    symbol TEXT PRIMARY KEY,
+    price REAL NOT NULL
+);
+"""
+
+# (id, symbol, quantity, cost basis per share, acquired as YYYY-MM-DD)
+Lot = Tuple[int, str, float, float, str]
+
+
+class LotStore(SQLiteStore):
+    """Tax lots, realized sales and target weights per client"""
+
+    schema = _SCHEMA
+
+    def _lot_rows(self, client: str, lots: Iterable[Dict[str, Any]]) -> List[Tuple[str, str, float, float, str]]:
+        rows = []
+        for lot in lots:
+            if lot["quantity"] <= 0 or lot["cost_basis"] < 0:
+                raise ValueError(f"Lot of {lot['symbol']} needs a positive quantity and a non-negative cost basis")
+            rows.append((client, lot["symbol"], float(lot["quantity"]), float(lot["cost_basis"]), str(lot["acquired"])))
+        return rows
+
+    def add_lots(self, client: str, lots: Iterable[Dict[str, Any]], replace: bool = False) -> int:
+        """Add lots (``symbol``, ``quantity``, ``cost_basis`` per share, ``acquired``), optionally replacing the client's"""
+        rows = self._lot_rows(client, lots)
+        with self._transaction() as conn:
+            if replace:
+                conn.execute("DELETE FROM tax_lots WHERE client = ?", (client,))
+            conn.executemany(
+                "INSERT INTO tax_lots (client, symbol, quantity, cost_basis, acquired) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._bump(conn, "lots")
+        return len(rows)
+
+    def lots(self, client: str) -> List[Lot]:
+        return self._connection().execute(
+            "SELECT id, symbol, quantity, cost_basis, acquired FROM tax_lots WHERE client = ? ORDER BY id",
+            (client,)
+        ).fetchall()
+
+    def iter_lots(self) -> Iterator[Tuple[str, List[Lot]]]:
+        """Every client's lots, one client at a time, with a single query"""
+        cursor = self._connection().execute(
+            "SELECT client, id, symbol, quantity, cost_basis, acquired FROM tax_lots ORDER BY client, id"
+        )
+        client, lots = None, []
+        for row in cursor:
+            if row[0] != client:
+                if lots:
+                    yield client, lots
+                client, lots = row[0], []
+            lots.append(row[1:])
+        if lots:
+            yield client, lots
+
+    def loss_sales_since(self, client: str, since: str) -> Set[str]:
+        """Symbols the client sold at a loss on or after ``since``"""
+        cursor = self._connection().execute(
+            "SELECT DISTINCT symbol FROM lot_sales WHERE client = ? AND sold >= ? AND gain < 0",
+            (client, since)
+        )
+        return {symbol for (symbol,) in cursor}
+
+    def apply_trades(
+        self,
+        client: str,
+        sells: Sequence[Tuple[int, float, float, float]],
+        buys: Sequence[Tuple[str, float, float]],
+        date: str,
+        target: Optional[Mapping[str, float]] = None
+    ) -> None:
+        """Reduce sold lots, record the sales, open lots for buys and store ``target``, in one transaction
+
+        ``sells`` are (lot id, quantity, proceeds, gain); ``buys`` are
+        (symbol, quantity, price).
+        """
+        if target is not None:
+            target = self._normalized(client, target)
+        with self._transaction() as conn:
+            for lot_id, quantity, proceeds, gain in sells:
+                row = conn.execute(
+                    "SELECT symbol, quantity FROM tax_lots WHERE id = ? AND client = ?", (lot_id, client)
+                ).fetchone()
+                if row is None:
+                    raise ValueError(f"Tax lot {lot_id} of {client} no longer exists")
+                symbol, held = row
+                if quantity >= held - 1e-9:
+                    conn.execute("DELETE FROM tax_lots WHERE id = ?", (lot_id,))
+                else:
+                    conn.execute("UPDATE tax_lots SET quantity = ? WHERE id = ?", (held - quantity, lot_id))
+                conn.execute(
+                    "INSERT INTO lot_sales (client, symbol, quantity, proceeds, gain, sold) VALUES (?, ?, ?, ?, ?, ?)",
+                    (client, symbol, quantity, proceeds, gain, date)
+                )
+            conn.executemany(
+                "INSERT INTO tax_lots (client, symbol, quantity, cost_basis, acquired) VALUES (?, ?, ?, ?, ?)",
+                [(client, symbol, quantity, price, date) for symbol, quantity, price in buys]
+            )
+            if target is not None:
+                self._store_target(conn, client, target)
+            self._bump(conn, "lots")
+
+    def _normalized(self, client: str, weights: Mapping[str, float]) -> Dict[str, float]:
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError(f"Target weights for {client} must not be negative")
+        total = sum(weights.values())
+        if total <= 0:
+            raise ValueError(f"Target weights for {client} must add up to more than zero")
+        return {symbol: weight / total for symbol, weight in weights.items() if weight > 0}
+
+    def _store_target(self, conn: sqlite3.Connection, client: str, target: Mapping[str, float]) -> None:
+        conn.execute("DELETE FROM target_weights WHERE client = ?", (client,))
+        conn.executemany(
+            "INSERT INTO target_weights (client, symbol, weight) VALUES (?, ?, ?)",
+            [(client, symbol, weight) for symbol, weight in target.items()]
+        )
+
+    def set_target(self, client: str, weights: Mapping[str, float]) -> Dict[str, float]:
+        """Replace a client's target weights, normalized to sum to one; returns them"""
+        target = self._normalized(client, weights)
+        with self._transaction() as conn:
+            self._store_target(conn, client, target)
+            self._bump(conn, "lots")
+        return target
+
+    def targets(self, clients: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, float]]:
+        """Stored target weights by client (every client with one by default)"""
+        conn = self._connection()
+        if clients is None:
+            rows = conn.execute("SELECT client, symbol, weight FROM target_weights").fetchall()
+        else:
+            clients, rows = list(clients), []
+            for start in range(0, len(clients), 500):  # within SQLite's bound-parameter limit
+                batch = clients[start:start + 500]
+                rows += conn.execute(
+                    f"SELECT client, symbol, weight FROM target_weights WHERE client IN ({', '.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+        targets: Dict[str, Dict[str, float]] = {}
+        for client, symbol, weight in rows:
+            targets.setdefault(client, {})[symbol] = weight
+        return targets
+
+    def put_prices(self, prices: Mapping[str, float]) -> int:
+        """Store the latest price of each symbol; returns the new ``prices`` version"""
+        for symbol, price in prices.items():
+            if not price > 0:
+                raise ValueError(f"Price of {symbol} must be positive")
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO latest_prices (symbol, price) VALUES (?, ?)",
+                [(symbol, float(price)) for symbol, price in prices.items()]
+            )
+            version = self._bump(conn, "prices")
+        return version
+
+    def prices(self) -> Dict[str, float]:
+        """Latest stored price of every symbol"""
+        return dict(self._connection().execute("SELECT symbol, price FROM latest_prices"))
@@ -2,19 +2,95 @@
 Financial Advisor AI Copilot MCP Service
 
 A comprehensive MCP service for financial analysts providing intelligent investment advisory capabilities.
+
+numpy, pandas, scipy and yfinance are imported inside the code paths that
+use them, so the server starts and lists its tools without loading them.
+Run ``python startup.py`` for a per-module breakdown of import cost.
 """
 
-from mcp.server.fastmcp import FastMCP
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
-import yfinance as yf
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Any
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
 import json
 
-# Create MCP server
-mcp = FastMCP("Financial Advisor AI Copilot")
+from admission import admitted
+from cancellation import CallCancelled, checkpoint, deadline_for, with_deadline
+from client_io import export_profiles, import_profiles
+from config import config, relocate_data
+from executor import run_cpu, run_io
+from holdings import HoldingStore
+from lots import LotStore
+from market_data import adj_close, symbol_snapshot
+from metrics import instrument, registry, stage
+from profiling import profiled
+from progress import advance, partial_result, track
+from reporting import generate_reports, render_investment_report
+from responses import check_format, compact, mapping_columns, page, record_columns, round_floats
+from result_cache import MemoizedFastMCP
+from store import ClientStore
+from warmup import warmer
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from aggregation import ExposureAggregator
+    from correlation import CorrelationModel, ModelCache
+    from drift import DriftMonitor
+    from fundamentals import FundamentalsTable
+    from scenarios import BetaCache
+
+# Create MCP server; sessions start the background warm-up (see warmup.py)
+@asynccontextmanager
+async def _serving(*_: Any):
+    """Server lifespan: warm-up, and the end-of-day schedule when enabled"""
+    from eod import scheduler
+    
+    scheduler.start()
+    async with warmer.serving():
+        yield {}
+
+mcp = MemoizedFastMCP("Financial Advisor AI Copilot", lifespan=_serving)
+
+PORTFOLIO_HISTORY = "2y"  # price window portfolio construction estimates from
+
+def tool(memoize: bool = False, depends_on=None):
+    """Register an async tool with call, error and latency metrics, admission control, its deadline, and profiling when enabled
+    
+    With ``memoize`` repeated calls are answered from the result cache (see
+    result_cache.py); ``depends_on`` stamps any non-market state the result reads.
+    """
+    def decorator(fn):
+        if memoize:
+            mcp.memoize(fn, depends_on)
+        if config.profiling.enabled:
+            fn = profiled(
+                fn,
+                config.profiling.output_directory,
+                sample_rate=config.profiling.sample_rate,
+                tools=config.profiling.tools,
+                interval_seconds=config.profiling.interval_seconds
+            )
+        return mcp.tool()(instrument(with_deadline(admitted(fn), deadline_for(fn.__name__))))
+    return decorator
+
+if config.metrics.enabled:
+    @mcp.custom_route(config.metrics.path, methods=["GET"])
+    async def metrics_endpoint(request):
+        """Prometheus text exposition of tool metrics"""
+        from starlette.responses import PlainTextResponse
+        
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@mcp.custom_route("/ready", methods=["GET"])
+async def ready_endpoint(request):
+    """Readiness probe: 503 until the first warm-up when ``config.warmup.ready_when_warm`` is set"""
+    from starlette.responses import JSONResponse
+    
+    return JSONResponse(warmer.status(), status_code=200 if warmer.ready else 503)
 
 # Data Models
 class ClientProfile(BaseModel):
@@ -26,6 +102,7 @@ class ClientProfile(BaseModel):
     capital: float = Field(..., description="Available capital for investment")
     esg_preference: bool = Field(default=False, description="ESG investment preference")
     sector_preferences: List[str] = Field(default=[], description="Preferred sectors")
+    existing_assets: Dict[str, float] = Field(default_factory=dict, description="Market value held per asset")
 
 class PortfolioAllocation(BaseModel):
     """Portfolio allocation model"""
@@ -34,6 +111,13 @@ class PortfolioAllocation(BaseModel):
     volatility: float = Field(..., description="Portfolio volatility")
     sharpe_ratio: float = Field(..., description="Sharpe ratio")
 
+class TaxLot(BaseModel):
+    """One purchase of a holding, kept for tax-aware sales"""
+    symbol: str = Field(..., description="Asset symbol")
+    quantity: float = Field(..., gt=0, description="Shares held from this purchase")
+    cost_basis: float = Field(..., ge=0, description="Cost per share")
+    acquired: date = Field(..., description="Purchase date")
+
 class BacktestResult(BaseModel):
     """Backtesting results"""
     cagr: float = Field(..., description="Compound Annual Growth Rate")
@@ -42,22 +126,120 @@ class BacktestResult(BaseModel):
     volatility: float = Field(..., description="Annual volatility")
     total_return: float = Field(..., description="Total return over period")
 
-# Global storage for client profiles (in production, use proper database)
-client_profiles: Dict[str, ClientProfile] = {}
+# Persistent client profile store shared by every server process
+client_profiles = ClientStore(
+    config.storage.client_db_path,
+    ClientProfile,
+    busy_timeout_ms=config.storage.busy_timeout_ms
+)
+
+# Tax lots and realized sales, in the same database
+tax_lots = LotStore(config.storage.client_db_path, busy_timeout_ms=config.storage.busy_timeout_ms)
+
+# Account holdings and households, in the same database
+account_holdings = HoldingStore(config.storage.client_db_path, busy_timeout_ms=config.storage.busy_timeout_ms)
+
+# Account holdings across the book, rolled up by household (loaded on first use)
+_household_exposure: Optional["ExposureAggregator"] = None
+_household_exposure_version: Optional[Tuple[int, int]] = None  # (accounts, clients) versions it reflects
+_household_exposure_lock = threading.Lock()
+
+def _exposure_book() -> Tuple[Dict[str, Dict[str, float]], Dict[str, str]]:
+    """Stored accounts and households, plus each client's ``existing_assets`` as an account of its own household"""
+    accounts, households = account_holdings.load()
+    for name, profile in client_profiles.items():
+        if profile.existing_assets and name not in accounts:
+            accounts[name] = dict(profile.existing_assets)
+            households[name] = name
+    return accounts, households
+
+def _exposure_engine() -> "ExposureAggregator":
+    """Shared exposure aggregator, reloaded whenever any process changed the stored holdings or profiles"""
+    global _household_exposure, _household_exposure_version
+    version = (account_holdings.version("accounts"), client_profiles.version("clients"))
+    with _household_exposure_lock:
+        if _household_exposure is None:
+            from aggregation import ExposureAggregator
+            _household_exposure = ExposureAggregator()
+        if _household_exposure_version != version:
+            _household_exposure.load(*_exposure_book())
+            _household_exposure_version = version
+        return _household_exposure
 
-@mcp.tool()
-def create_client_profile(
+def _update_account(account_id: str, holdings: Dict[str, float], household: Optional[str]) -> None:
+    """Store one account's holdings, applying them in memory too when no other write came in between"""
+    global _household_exposure_version
+    engine = _exposure_engine()
+    with _household_exposure_lock:
+        household, version = account_holdings.put_account(account_id, holdings, household)
+        if _household_exposure_version is not None and _household_exposure_version[0] == version - 1:
+            engine.update_account(account_id, holdings, household)
+            _household_exposure_version = (version, _household_exposure_version[1])
+
+# Client drift from target weights, loaded from the stored lots, targets and prices
+_drift_monitor: Optional["DriftMonitor"] = None
+_drift_monitor_version: Optional[Tuple[int, int, int]] = None  # (lots, prices, clients) versions it reflects
+_drift_monitor_lock = threading.Lock()
+
+# Fundamentals table for screening, reloaded when any process refreshes the file
+_fundamentals: Optional[Tuple[int, "FundamentalsTable"]] = None
+_fundamentals_lock = threading.Lock()
+
+def _fundamentals_table() -> Optional["FundamentalsTable"]:
+    """The saved fundamentals table, or None before the first refresh"""
+    global _fundamentals
+    try:
+        modified = os.stat(config.fundamentals.path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _fundamentals_lock:
+        if _fundamentals is None or _fundamentals[0] != modified:
+            from fundamentals import FundamentalsTable
+            _fundamentals = (modified, FundamentalsTable.load(config.fundamentals.path))
+        return _fundamentals[1]
+
+def _default_universe(risk_tolerance: str) -> List[str]:
+    """Default asset universe for a risk tolerance level"""
+    if risk_tolerance == "conservative":
+        return ["BND", "VTI", "VEA", "VWO"]  # Bonds, US stocks, International
+    elif risk_tolerance == "moderate":
+        return ["VTI", "VEA", "VWO", "BND", "VNQ"]  # Balanced mix
+    else:  # aggressive
+        return ["VTI", "VEA", "VWO", "VNQ", "QQQ"]  # Growth focused
+
+def _risk_based_weights(risk_tolerance: str, n_assets: int) -> "np.ndarray":
+    """Simple risk-based weights, normalized to sum to one"""
+    import numpy as np
+    
+    if risk_tolerance == "conservative":
+        # Higher allocation to bonds/stable assets
+        weights = np.array([0.4, 0.3, 0.2, 0.1] + [0.0] * (n_assets - 4))[:n_assets]
+    elif risk_tolerance == "moderate":
+        # Balanced allocation
+        weights = np.array([1.0 / n_assets] * n_assets)
+    else:  # aggressive
+        # Higher allocation to growth assets
+        weights = np.array([0.4, 0.25, 0.2, 0.1, 0.05] + [0.0] * (n_assets - 5))[:n_assets]
+    
+    # Normalize weights
+    return weights / weights.sum()
+
+@tool()
+async def create_client_profile(
     name: str,
     age: int,
     risk_tolerance: str,
     investment_horizon: int,
     capital: float,
     esg_preference: bool = False,
-    sector_preferences: List[str] = None
+    sector_preferences: List[str] = None,
+    existing_assets: Dict[str, float] = None
 ) -> str:
     """Create a new client investment profile"""
     if sector_preferences is None:
         sector_preferences = []
+    if existing_assets is None:
+        existing_assets = {}
     
     profile = ClientProfile(
         name=name,
@@ -66,106 +248,353 @@ def create_client_profile(
         investment_horizon=investment_horizon,
         capital=capital,
         esg_preference=esg_preference,
-        sector_preferences=sector_preferences
+        sector_preferences=sector_preferences,
+        existing_assets=existing_assets
     )
     
-    client_profiles[name] = profile
+    await run_io(client_profiles.__setitem__, name, profile)
     return f"Client profile created for {name} with {risk_tolerance} risk tolerance and ${capital:,.2f} capital"
 
-@mcp.tool()
-def get_market_data(symbols: List[str], period: str = "1y") -> Dict[str, Any]:
-    """Retrieve market data for given symbols"""
+@tool()
+async def list_clients(
+    risk_tolerance: str = None,
+    min_horizon: int = None,
+    max_horizon: int = None,
+    name_prefix: str = None,
+    limit: int = 100,
+    offset: int = 0,
+    response_format: str = "json"
+) -> Dict[str, Any]:
+    """List client profiles, filtered by risk tolerance, investment horizon or name prefix"""
     try:
-        data = {}
-        for symbol in symbols:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
-            info = ticker.info
-            
-            if not hist.empty:
-                current_price = hist['Close'].iloc[-1]
-                price_change = ((current_price - hist['Close'].iloc[0]) / hist['Close'].iloc[0]) * 100
-                
-                data[symbol] = {
-                    "current_price": float(current_price),
-                    "price_change_pct": float(price_change),
-                    "volume": int(hist['Volume'].iloc[-1]),
-                    "market_cap": info.get('marketCap', 'N/A'),
-                    "sector": info.get('sector', 'N/A'),
-                    "pe_ratio": info.get('trailingPE', 'N/A')
-                }
+        compact_response = check_format(response_format)
+        profiles = await run_io(
+            client_profiles.query,
+            risk_tolerance=risk_tolerance,
+            min_horizon=min_horizon,
+            max_horizon=max_horizon,
+            name_prefix=name_prefix,
+            limit=limit,
+            offset=offset
+        )
+        clients = [profile.model_dump() for profile in profiles]
+        if compact_response:
+            paging = {"offset": offset}
+            if len(clients) == limit:
+                paging["next_offset"] = offset + limit
+            return compact({
+                "status": "success",
+                "count": len(clients),
+                "clients": record_columns(clients, ClientProfile.model_fields),
+                **paging
+            })
+        return {
+            "status": "success",
+            "count": len(clients),
+            "clients": clients
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def _served_path(path: str) -> str:
+    """``path`` resolved inside ``config.storage.files_directory``, refusing anything that escapes it"""
+    root = os.path.realpath(config.storage.files_directory)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Path {path} is outside the files directory")
+    return resolved
+
+@tool()
+async def import_client_profiles(path: str, file_format: str = None, batch_size: int = 1000) -> Dict[str, Any]:
+    """Bulk import client profiles from a CSV or JSONL file, reporting per-row errors
+    
+    ``path`` is relative to ``config.storage.files_directory``.
+    """
+    try:
+        summary = await run_io(
+            import_profiles, client_profiles, _served_path(path), file_format=file_format, batch_size=batch_size
+        )
+        return {"status": "success", **summary}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@tool()
+async def export_client_profiles(
+    path: str,
+    file_format: str = None,
+    risk_tolerance: str = None
+) -> Dict[str, Any]:
+    """Export client profiles to a CSV or JSONL file, optionally filtered by risk tolerance
+    
+    ``path`` is relative to ``config.storage.files_directory``.
+    """
+    try:
+        summary = await run_io(
+            export_profiles, client_profiles, _served_path(path), file_format=file_format, risk_tolerance=risk_tolerance
+        )
+        return {"status": "success", **summary}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@tool(memoize=True)
+async def get_market_data(
+    symbols: List[str],
+    period: str = "1y",
+    response_format: str = "json",
+    precision: int = 6,
+    offset: int = 0,
+    limit: int = None
+) -> Dict[str, Any]:
+    """Retrieve market data for given symbols, optionally one page of symbols at a time"""
+    try:
+        compact_response = check_format(response_format)
+        symbols, paging = page(symbols, offset, limit)
+        track(len(symbols))
+        fetched = 0
+        
+        async def fetch(symbol: str) -> Optional[Dict[str, Any]]:
+            # Stream each symbol to the client as soon as it arrives
+            nonlocal fetched
+            snapshot = await run_io(symbol_snapshot, symbol, period)
+            fetched += 1
+            await partial_result("get_market_data", {"symbol": symbol, "data": snapshot})
+            await advance(f"Fetched {fetched}/{len(symbols)} symbols")
+            return snapshot
         
+        with stage("fetch"):
+            snapshots = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        data = {symbol: snapshot for symbol, snapshot in zip(symbols, snapshots) if snapshot is not None}
+        
+        if compact_response:
+            return compact({
+                "status": "success",
+                "symbols": list(data),
+                **record_columns(list(data.values()), precision=precision),
+                "missing": [symbol for symbol in symbols if symbol not in data],
+                **paging
+            })
+        if limit is not None or offset:
+            return {"status": "success", "data": data, **paging}
         return {"status": "success", "data": data}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-@mcp.tool()
-def build_portfolio(client_name: str, asset_universe: List[str] = None) -> Dict[str, Any]:
-    """Build an optimized portfolio for a client based on their profile"""
-    if client_name not in client_profiles:
-        return {"status": "error", "message": f"Client profile not found for {client_name}"}
+def _save_fundamentals(existing: Optional["FundamentalsTable"], records: Dict[str, Dict[str, Any]]) -> "FundamentalsTable":
+    """Merge fresh snapshots into the fundamentals table and save it"""
+    from fundamentals import FundamentalsTable
     
-    profile = client_profiles[client_name]
+    table = FundamentalsTable.from_records(records, datetime.now().isoformat(timespec="seconds"))
+    if existing is not None:
+        table = existing.merged(table)
+    table.save(config.fundamentals.path)
+    return table
+
+@tool()
+async def refresh_fundamentals(symbols: List[str] = None) -> Dict[str, Any]:
+    """Fetch sector, quote type, fund category, market cap, P/E and price for ``symbols`` into the local fundamentals table
     
-    # Default asset universe if not provided
-    if asset_universe is None:
-        if profile.risk_tolerance == "conservative":
-            asset_universe = ["BND", "VTI", "VEA", "VWO"]  # Bonds, US stocks, International
-        elif profile.risk_tolerance == "moderate":
-            asset_universe = ["VTI", "VEA", "VWO", "BND", "VNQ"]  # Balanced mix
-        else:  # aggressive
-            asset_universe = ["VTI", "VEA", "VWO", "VNQ", "QQQ"]  # Growth focused
+    Without ``symbols`` the table's own symbols are refreshed, or the
+    configured asset universes when there is no table yet. Symbols the
+    provider has no data for keep their previous row.
+    """
+    from pipeline import fan_out
     
     try:
-        # Fetch historical data for portfolio optimization
-        data = yf.download(asset_universe, period="2y", progress=False)['Adj Close']
-        returns = data.pct_change().dropna()
+        existing = await run_io(_fundamentals_table)
+        if symbols is None:
+            if existing is not None:
+                symbols = existing.symbols.tolist()
+            else:
+                symbols = sorted({symbol for universe in config.asset_universes.values() for symbol in universe})
+        symbols = list(dict.fromkeys(symbols))
+        track(len(symbols) + 1)
+        fetched = 0
         
-        # Simple risk-based allocation (in production, use proper optimization)
-        n_assets = len(asset_universe)
-        
-        if profile.risk_tolerance == "conservative":
-            # Higher allocation to bonds/stable assets
-            weights = np.array([0.4, 0.3, 0.2, 0.1] + [0.0] * (n_assets - 4))[:n_assets]
-        elif profile.risk_tolerance == "moderate":
-            # Balanced allocation
-            weights = np.array([1.0 / n_assets] * n_assets)
-        else:  # aggressive
-            # Higher allocation to growth assets
-            weights = np.array([0.4, 0.25, 0.2, 0.1, 0.05] + [0.0] * (n_assets - 5))[:n_assets]
+        async def fetch(symbol: str) -> Optional[Dict[str, Any]]:
+            nonlocal fetched
+            try:
+                snapshot = await run_io(symbol_snapshot, symbol, "5d")
+            except CallCancelled:
+                raise
+            except Exception:
+                snapshot = None
+            fetched += 1
+            await advance(f"Fetched {fetched}/{len(symbols)} symbols")
+            return snapshot
         
-        # Normalize weights
-        weights = weights / weights.sum()
+        with stage("fetch"):
+            snapshots = await fan_out(symbols, fetch, config.fundamentals.refresh_parallelism)
+        records = {symbol: snapshot for symbol, snapshot in zip(symbols, snapshots) if snapshot is not None}
+        table = await run_io(_save_fundamentals, existing, records)
+        await advance("Table saved")
+        return {
+            "status": "success",
+            "refreshed": len(records),
+            "missing": [symbol for symbol in symbols if symbol not in records],
+            "securities": len(table),
+            "as_of": table.as_of
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@tool()
+async def screen_securities(
+    sectors: List[str] = None,
+    quote_types: List[str] = None,
+    categories: List[str] = None,
+    min_market_cap: float = None,
+    max_market_cap: float = None,
+    min_pe_ratio: float = None,
+    max_pe_ratio: float = None,
+    min_price: float = None,
+    max_price: float = None,
+    sort_by: str = "market_cap",
+    descending: bool = True,
+    limit: int = None,
+    response_format: str = "json",
+    precision: int = 6
+) -> Dict[str, Any]:
+    """Find securities by sector, quote type, fund category, market cap, trailing P/E and price, top ``limit`` by ``sort_by``
+    
+    Sectors, quote types and categories match by case-insensitive prefix
+    ("tech" finds Technology). Funds carry a category instead of a sector,
+    so "tech ETFs with P/E under 25" is ``quote_types=["etf"]``,
+    ``categories=["tech"]``, ``max_pe_ratio=25``.
+    Only the local fundamentals table is read (see ``refresh_fundamentals``);
+    the data provider is never called.
+    """
+    try:
+        compact_response = check_format(response_format)
+        limit = config.fundamentals.max_results if limit is None else limit
+        if limit < 1:
+            return {"status": "error", "message": "limit must be at least 1"}
+        table = await run_io(_fundamentals_table)
+        if table is None:
+            return {"status": "error", "message": "No fundamentals on file; run refresh_fundamentals first"}
         
+        ranges = {
+            "market_cap": (min_market_cap, max_market_cap),
+            "pe_ratio": (min_pe_ratio, max_pe_ratio),
+            "price": (min_price, max_price)
+        }
+        with stage("screen"):
+            rows, matches = table.screen(sectors, ranges, sort_by, descending, limit, quote_types, categories)
+            results = table.records(rows)
+        
+        if compact_response:
+            return compact({
+                "status": "success",
+                "matches": matches,
+                "as_of": table.as_of,
+                **record_columns(results, precision=precision)
+            })
+        return {"status": "success", "matches": matches, "as_of": table.as_of, "results": results}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def _estimate_returns(asset_universe: List[str], data: "pd.DataFrame") -> Tuple["pd.Series", "pd.DataFrame"]:
+    """Mean daily returns and annualized covariance of the universe"""
+    with stage("estimation"):
+        returns = data[asset_universe].pct_change().dropna()
+        return returns.mean(), returns.cov() * 252
+
+def _optimize_portfolio(
+    risk_tolerance: str,
+    asset_universe: List[str],
+    mean_returns: "pd.Series",
+    covariance: "pd.DataFrame"
+) -> Dict[str, Any]:
+    """Risk-based allocation and its expected return, volatility and Sharpe ratio, from estimated returns"""
+    import numpy as np
+    
+    checkpoint()
+    with stage("optimization"):
+        # Simple risk-based allocation (in production, use proper optimization)
+        weights = _risk_based_weights(risk_tolerance, len(asset_universe))
+    
+    checkpoint()
+    with stage("metrics"):
         # Calculate portfolio metrics
-        portfolio_return = np.sum(returns.mean() * weights) * 252
-        portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(returns.cov() * 252, weights)))
+        portfolio_return = np.sum(mean_returns * weights) * 252
+        portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(covariance, weights)))
         sharpe_ratio = portfolio_return / portfolio_volatility if portfolio_volatility > 0 else 0
+    
+    allocation = dict(zip(asset_universe, weights))
+    
+    return {
+        "assets": {k: float(v) for k, v in allocation.items()},
+        "expected_return": float(portfolio_return),
+        "volatility": float(portfolio_volatility),
+        "sharpe_ratio": float(sharpe_ratio)
+    }
+
+def _portfolio_metrics(risk_tolerance: str, asset_universe: List[str], data: "pd.DataFrame") -> Dict[str, Any]:
+    """Risk-based allocation and its expected return, volatility and Sharpe ratio"""
+    return _optimize_portfolio(risk_tolerance, asset_universe, *_estimate_returns(asset_universe, data))
+
+async def _client_version(arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The client profile a build reads, so edits to it invalidate cached builds"""
+    profile = await run_io(client_profiles.get, arguments["client_name"])
+    return profile.model_dump() if profile is not None else None
+
+@tool(memoize=True, depends_on=_client_version)
+async def build_portfolio(
+    client_name: str,
+    asset_universe: List[str] = None,
+    response_format: str = "json",
+    precision: int = 6
+) -> Dict[str, Any]:
+    """Build an optimized portfolio for a client based on their profile"""
+    profile = await run_io(client_profiles.get, client_name)
+    if profile is None:
+        return {"status": "error", "message": f"Client profile not found for {client_name}"}
+    
+    # Default asset universe if not provided
+    if asset_universe is None:
+        asset_universe = _default_universe(profile.risk_tolerance)
+    
+    try:
+        compact_response = check_format(response_format)
+        # One progress step per fetched symbol, then estimation and optimization
+        track(len(asset_universe) + 2)
+        estimates = warmer.estimates_for(asset_universe)
+        if estimates is not None:
+            mean_returns, covariance = estimates
+            await advance("Using precomputed estimates", steps=len(asset_universe) + 1)
+        else:
+            # Fetch historical data for portfolio optimization
+            data = await adj_close(asset_universe, period=PORTFOLIO_HISTORY)
+            mean_returns, covariance = await run_cpu(_estimate_returns, asset_universe, data)
+            await advance("Estimation done")
+        portfolio = await run_cpu(_optimize_portfolio, profile.risk_tolerance, asset_universe, mean_returns, covariance)
+        await advance("Optimized")
         
-        allocation = dict(zip(asset_universe, weights))
-        
+        if compact_response:
+            assets = portfolio.pop("assets")
+            return compact({
+                "status": "success",
+                **mapping_columns(assets, precision=precision),
+                **round_floats(portfolio, precision)
+            })
         return {
             "status": "success",
-            "portfolio": {
-                "assets": {k: float(v) for k, v in allocation.items()},
-                "expected_return": float(portfolio_return),
-                "volatility": float(portfolio_volatility),
-                "sharpe_ratio": float(sharpe_ratio)
-            },
-            "client_profile": profile.dict()
+            "portfolio": portfolio,
+            "client_profile": profile.model_dump()
         }
     
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-@mcp.tool()
-def adjust_portfolio(
+@tool()
+async def adjust_portfolio(
     client_name: str,
     current_portfolio: Dict[str, float],
-    adjustments: str
+    adjustments: str,
+    response_format: str = "json",
+    precision: int = 6
 ) -> Dict[str, Any]:
     """Adjust portfolio based on natural language instructions"""
-    if client_name not in client_profiles:
+    if not await run_io(client_profiles.__contains__, client_name):
         return {"status": "error", "message": f"Client profile not found for {client_name}"}
     
     try:
@@ -192,6 +621,8 @@ def adjust_portfolio(
         if total_weight > 0:
             adjusted_portfolio = {k: v/total_weight for k, v in adjusted_portfolio.items()}
         
+        if check_format(response_format):
+            return compact({"status": "success", **mapping_columns(adjusted_portfolio, precision=precision)})
         return {
             "status": "success",
             "original_portfolio": current_portfolio,
@@ -202,28 +633,350 @@ def adjust_portfolio(
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-@mcp.tool()
-def backtest_portfolio(
-    portfolio: Dict[str, float],
-    start_date: str = "2020-01-01",
-    end_date: str = None
+@tool()
+async def record_tax_lots(client_name: str, lots: List[TaxLot], replace: bool = False) -> Dict[str, Any]:
+    """Record a client's tax lots, optionally replacing the ones already on file"""
+    if not await run_io(client_profiles.__contains__, client_name):
+        return {"status": "error", "message": f"Client profile not found for {client_name}"}
+    
+    try:
+        rows = [{**lot.model_dump(), "acquired": lot.acquired.isoformat()} for lot in lots]
+        recorded = await run_io(_write_lots, tax_lots.add_lots, client_name, rows, replace)
+        await _track_drift([client_name])
+        return {"status": "success", "client_name": client_name, "recorded": recorded}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+async def _latest_prices(symbols: List[str]) -> Dict[str, float]:
+    """Most recent close of each symbol"""
+    data = await adj_close(symbols, period="1mo")
+    latest = data.ffill().iloc[-1]
+    return {symbol: float(price) for symbol, price in latest.items() if price == price}
+
+def _rebalance_client(
+    client_name: str,
+    lots: List[Tuple[int, str, float, float, str]],
+    target: Dict[str, float],
+    prices: Dict[str, float],
+    turnover_limit: float,
+    cash: float,
+    execute: bool
 ) -> Dict[str, Any]:
-    """Backtest portfolio performance over specified period"""
-    if end_date is None:
-        end_date = datetime.now().strftime("%Y-%m-%d")
+    """Plan one client's tax-aware rebalance and, with ``execute``, book its trades"""
+    from rebalancing import plan_rebalance
     
+    settings = config.tax
+    today = date.today()
+    since = (today - timedelta(days=settings.wash_sale_days)).isoformat()
+    with stage("rebalance"):
+        plan = plan_rebalance(
+            lots, prices, target, today,
+            tax_lots.loss_sales_since(client_name, since),
+            turnover_limit,
+            settings.short_term_rate,
+            settings.long_term_rate,
+            settings.long_term_days,
+            settings.wash_sale_days,
+            settings.min_trade_value,
+            cash
+        )
+    if execute:
+        _write_lots(
+            tax_lots.apply_trades,
+            client_name,
+            [(sale["lot_id"], sale["quantity"], sale["proceeds"], sale["gain"]) for sale in plan["lot_sales"]],
+            [(trade["symbol"], trade["quantity"], prices[trade["symbol"]]) for trade in plan["trades"] if trade["side"] == "buy"],
+            today.isoformat(),
+            target
+        )
+    return {"client_name": client_name, "target": target, **plan, "executed": execute}
+
+def _rebalance_book(
+    book: Dict[str, Tuple[List[Tuple[int, str, float, float, str]], Dict[str, float]]],
+    prices: Dict[str, float],
+    turnover_limit: float,
+    execute: bool
+) -> Dict[str, Any]:
+    """Per-client summaries and totals of a book-wide tax-aware rebalance"""
+    clients, failed = [], {}
+    for client_name, (lots, target) in book.items():
+        checkpoint()
+        try:
+            plan = _rebalance_client(client_name, lots, target, prices, turnover_limit, 0.0, execute)
+        except Exception as e:
+            failed[client_name] = str(e)
+            continue
+        clients.append({
+            "client_name": client_name,
+            "portfolio_value": plan["portfolio_value"],
+            "turnover": plan["turnover"],
+            "trades": len(plan["trades"]),
+            "lots_sold": len(plan["lot_sales"]),
+            "realized_gain": plan["realized_gain"]["total"],
+            "estimated_tax": plan["estimated_tax"]
+        })
+    return {
+        "clients": clients,
+        "failed": failed,
+        "totals": {
+            "clients": len(clients),
+            "lots_sold": sum(client["lots_sold"] for client in clients),
+            "realized_gain": sum(client["realized_gain"] for client in clients),
+            "estimated_tax": sum(client["estimated_tax"] for client in clients)
+        },
+        "executed": execute
+    }
+
+@tool()
+async def rebalance_tax_aware(
+    client_name: str = None,
+    target_portfolio: Dict[str, float] = None,
+    turnover_limit: float = None,
+    cash: float = 0.0,
+    execute: bool = False,
+    response_format: str = "json",
+    precision: int = 6
+) -> Dict[str, Any]:
+    """Rebalance toward target weights choosing which tax lots to sell
+    
+    Sales harvest losses first, then the lots with the least tax per dollar,
+    skip loss sales and buys that would be wash sales, and stay within
+    ``turnover_limit`` (default ``config.tax.max_turnover``). Without
+    ``execute`` the trades are only planned, and executing stores the
+    target for drift monitoring. Without ``target_portfolio`` a client is
+    rebalanced to its stored target, or its default risk-based allocation
+    if none is stored; without ``client_name`` the whole book is.
+    """
     try:
-        symbols = list(portfolio.keys())
-        weights = np.array(list(portfolio.values()))
+        compact_response = check_format(response_format)
+        if turnover_limit is None:
+            turnover_limit = config.tax.max_turnover
         
-        # Download historical data
-        data = yf.download(symbols, start=start_date, end=end_date, progress=False)['Adj Close']
-        returns = data.pct_change().dropna()
+        if client_name is None:
+            lots_by_client = dict(await run_io(lambda: list(tax_lots.iter_lots())))
+            profiles = await run_io(
+                lambda: {name: profile.model_dump() for name, profile in client_profiles.items() if name in lots_by_client}
+            )
+            targets = await run_cpu(_book_portfolios, profiles, await run_io(tax_lots.targets, list(profiles)))
+            book = {name: (lots_by_client[name], targets[name]) for name in targets}
+            symbols = sorted({lot[1] for lots, _ in book.values() for lot in lots} | {s for _, t in book.values() for s in t})
+            track(len(symbols) + 1)
+            prices = await _latest_prices(symbols) if symbols else {}
+            summary = await run_cpu(_rebalance_book, book, prices, turnover_limit, execute)
+            if execute:
+                await _track_drift([client["client_name"] for client in summary["clients"]])
+            summary["failed"].update({name: "Client profile not found" for name in lots_by_client if name not in book})
+            await advance("Book rebalanced")
+            if compact_response:
+                return compact({
+                    "status": "success",
+                    **record_columns(summary["clients"], precision=precision),
+                    "failed": summary["failed"],
+                    "totals": round_floats(summary["totals"], precision),
+                    "executed": execute
+                })
+            return {"status": "success", **summary}
+        
+        profile = await run_io(client_profiles.get, client_name)
+        if profile is None:
+            return {"status": "error", "message": f"Client profile not found for {client_name}"}
+        lots = await run_io(tax_lots.lots, client_name)
+        if target_portfolio is None:
+            stored = await run_io(tax_lots.targets, [client_name])
+            target_portfolio = (await run_cpu(_book_portfolios, {client_name: profile.model_dump()}, stored))[client_name]
+        symbols = sorted({lot[1] for lot in lots} | set(target_portfolio))
+        track(len(symbols) + 1)
+        prices = await _latest_prices(symbols)
+        plan = await run_cpu(_rebalance_client, client_name, lots, target_portfolio, prices, turnover_limit, cash, execute)
+        if execute:
+            await _track_drift([client_name])
+        await advance("Rebalance planned")
+        
+        if compact_response:
+            return compact({
+                "status": "success",
+                **round_floats({key: plan[key] for key in ("portfolio_value", "turnover", "estimated_tax", "cash_after")}, precision),
+                "trades": record_columns(plan["trades"], precision=precision),
+                "lot_sales": record_columns(plan["lot_sales"], precision=precision),
+                "realized_gain": round_floats(plan["realized_gain"], precision),
+                "deferred": round_floats(plan["deferred"], precision),
+                "executed": execute
+            })
+        return {"status": "success", **plan}
+    
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@tool()
+async def set_target_allocation(client_name: str, target_portfolio: Dict[str, float]) -> Dict[str, Any]:
+    """Store a client's target weights for rebalancing and drift monitoring
+    
+    Weights are normalized to sum to one. Executing ``rebalance_tax_aware``
+    stores the target it rebalanced to in the same way.
+    """
+    if not await run_io(client_profiles.__contains__, client_name):
+        return {"status": "error", "message": f"Client profile not found for {client_name}"}
+    
+    try:
+        target = await run_io(_write_lots, tax_lots.set_target, client_name, target_portfolio)
+        await _track_drift([client_name])
+        return {"status": "success", "client_name": client_name, "target": target}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def _drift_book(clients: Optional[List[str]] = None) -> Dict[str, Tuple[Dict[str, float], Dict[str, float]]]:
+    """Target weights and share quantities of clients with tax lots (all of them by default)
+    
+    Targets are the stored ones, falling back to the default risk-based allocation.
+    """
+    if clients is None:
+        lots_by_client = dict(tax_lots.iter_lots())
+        profiles = {name: profile.model_dump() for name, profile in client_profiles.items() if name in lots_by_client}
+    else:
+        lots_by_client = {name: tax_lots.lots(name) for name in clients}
+        profiles = {name: profile.model_dump() for name in clients if (profile := client_profiles.get(name)) is not None}
+    return {
+        name: (target, _lot_quantities(lots_by_client[name]))
+        for name, target in _book_portfolios(profiles, tax_lots.targets(clients)).items()
+    }
+
+def _lot_quantities(lots: List[Tuple[int, str, float, float, str]]) -> Dict[str, float]:
+    """Shares held per symbol across a client's lots"""
+    quantities: Dict[str, float] = {}
+    for _, symbol, quantity, _, _ in lots:
+        quantities[symbol] = quantities.get(symbol, 0.0) + quantity
+    return quantities
+
+def _drift_versions() -> Tuple[int, int, int]:
+    return tax_lots.version("lots"), tax_lots.version("prices"), client_profiles.version("clients")
+
+def _write_lots(write: Callable[..., Any], *args: Any) -> Any:
+    """Run one tax-lot or target write; the monitor stays current when no other process wrote in between
+    
+    The caller refreshes the written clients with ``_track_drift``.
+    """
+    global _drift_monitor_version
+    with _drift_monitor_lock:
+        before = tax_lots.version("lots")
+        result = write(*args)
+        if (
+            _drift_monitor_version is not None and _drift_monitor_version[0] == before
+            and tax_lots.version("lots") == before + 1
+        ):
+            _drift_monitor_version = (before + 1, *_drift_monitor_version[1:])
+    return result
+
+def _load_drift_monitor() -> Tuple["DriftMonitor", bool]:
+    """Shared drift monitor, reloaded whenever any process changed the stored lots, targets, prices or profiles
+    
+    Also returns whether this call loaded it.
+    """
+    global _drift_monitor, _drift_monitor_version
+    version = _drift_versions()  # read first: a write landing during the load only causes another reload
+    with _drift_monitor_lock:
+        # Versions only grow; one read before another thread's write is behind the monitor, not ahead of it
+        if _drift_monitor is not None and all(map(int.__le__, version, _drift_monitor_version)):
+            return _drift_monitor, False
+        from drift import DriftMonitor
+        
+        monitor = DriftMonitor(config.drift.band)
+        monitor.load(_drift_book())
+        monitor.update_prices(tax_lots.prices())
+        _drift_monitor, _drift_monitor_version = monitor, version
+        return monitor, True
+
+def _apply_prices(prices: Dict[str, float]) -> Tuple["DriftMonitor", Dict[str, Any]]:
+    """Store prices for every process and reprice this process's monitor"""
+    global _drift_monitor_version
+    monitor, _ = _load_drift_monitor()
+    with _drift_monitor_lock:
+        if prices:
+            version = tax_lots.put_prices(prices)
+            if _drift_monitor is monitor and _drift_monitor_version[1] == version - 1:
+                _drift_monitor_version = (_drift_monitor_version[0], version, _drift_monitor_version[2])
+        return monitor, monitor.update_prices(prices)
+
+async def _drift_engine() -> "DriftMonitor":
+    """Shared drift monitor, current with every process's writes; prices nobody has stored are fetched once loaded"""
+    monitor, loaded = await run_io(_load_drift_monitor)
+    if loaded:
+        unpriced = monitor.unpriced()
+        if unpriced:
+            monitor, _ = await run_cpu(_apply_prices, await _latest_prices(unpriced))
+    return monitor
+
+async def _track_drift(clients: List[str]) -> None:
+    """Refresh monitored clients this process just wrote lots or targets for; nothing to do before the monitor is loaded"""
+    monitor = _drift_monitor
+    if monitor is None:
+        return
+    book = await run_io(_drift_book, clients)
+    for name in clients:
+        if name in book:
+            monitor.set_client(name, *book[name])
+        else:
+            monitor.remove_client(name)
+    unpriced = monitor.unpriced({symbol for _, quantities in book.values() for symbol in quantities})
+    await run_cpu(_apply_prices, await _latest_prices(unpriced) if unpriced else {})
+
+@tool()
+async def update_market_prices(prices: Dict[str, float]) -> Dict[str, Any]:
+    """Apply new prices and report clients whose drift started or stopped breaching the rebalance band
+    
+    Only clients holding a repriced symbol are recomputed, found through a
+    symbol-to-clients index, instead of scanning the whole book. Prices are
+    stored, so every server process measures drift at the same prices.
+    """
+    try:
+        await _drift_engine()
+        _, result = await run_cpu(_apply_prices, prices)
+        return {"status": "success", **result}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@tool()
+async def get_drift_breaches(client_name: str = None, band: float = None, limit: int = None) -> Dict[str, Any]:
+    """Clients drifted past the rebalance band, most drifted first, or one client's drift and weights
+    
+    Drift is the share of the portfolio that would have to trade to get
+    back to the client's stored target (see ``set_target_allocation``), or
+    its default risk-based allocation if none is stored. ``band`` overrides
+    ``config.drift.band`` for this query only.
+    """
+    try:
+        monitor = await _drift_engine()
+        if client_name is not None:
+            if client_name not in monitor:
+                return {"status": "error", "message": f"No tax lots on file for {client_name}"}
+            return {"status": "success", **await run_cpu(monitor.client_drift, client_name)}
+        
+        breaches = await run_cpu(monitor.breaches, band)
+        limit = config.drift.max_breaches if limit is None else limit
+        return {
+            "status": "success",
+            "clients_monitored": len(monitor),
+            "band": config.drift.band if band is None else band,
+            "breaches": len(breaches),
+            "clients": [{"client_name": name, "drift": drift} for name, drift in breaches[:limit]]
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def _backtest_metrics(data: "pd.DataFrame", portfolio: Dict[str, float]) -> Dict[str, float]:
+    """Total return, CAGR, volatility, Sharpe ratio and max drawdown of a fixed-weight portfolio"""
+    import numpy as np
+    
+    symbols = list(portfolio.keys())
+    weights = np.array(list(portfolio.values()))
+    with stage("estimation"):
+        returns = data[symbols].pct_change().dropna()
         
         # Calculate portfolio returns
         portfolio_returns = (returns * weights).sum(axis=1)
         cumulative_returns = (1 + portfolio_returns).cumprod()
-        
+    
+    checkpoint()
+    with stage("metrics"):
         # Calculate metrics
         total_return = float(cumulative_returns.iloc[-1] - 1)
         cagr = float((cumulative_returns.iloc[-1] ** (252 / len(portfolio_returns))) - 1)
@@ -234,16 +987,42 @@ def backtest_portfolio(
         rolling_max = cumulative_returns.expanding().max()
         drawdown = (cumulative_returns - rolling_max) / rolling_max
         max_drawdown = float(drawdown.min())
+    
+    return {
+        "total_return": total_return,
+        "cagr": cagr,
+        "volatility": volatility,
+        "sharpe_ratio": sharpe_ratio,
+        "max_drawdown": max_drawdown
+    }
+
+@tool(memoize=True)
+async def backtest_portfolio(
+    portfolio: Dict[str, float],
+    start_date: str = "2020-01-01",
+    end_date: str = None,
+    response_format: str = "json",
+    precision: int = 6
+) -> Dict[str, Any]:
+    """Backtest portfolio performance over specified period"""
+    if end_date is None:
+        end_date = datetime.now().strftime("%Y-%m-%d")
+    
+    try:
+        compact_response = check_format(response_format)
+        track(len(portfolio) + 1)
+        # Download historical data
+        data = await adj_close(list(portfolio.keys()), start=start_date, end=end_date)
+        metrics = await run_cpu(_backtest_metrics, data, portfolio)
+        await advance("Backtest done")
         
+        if compact_response:
+            return compact({"status": "success", "start": start_date, "end": end_date, **round_floats(metrics, precision)})
         return {
             "status": "success",
             "backtest_results": {
                 "period": f"{start_date} to {end_date}",
-                "total_return": total_return,
-                "cagr": cagr,
-                "volatility": volatility,
-                "sharpe_ratio": sharpe_ratio,
-                "max_drawdown": max_drawdown
+                **metrics
             },
             "portfolio": portfolio
         }
@@ -251,58 +1030,745 @@ def backtest_portfolio(
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-@mcp.tool()
-def generate_investment_report(client_name: str, portfolio: Dict[str, float]) -> str:
+async def _requested_portfolios(
+    portfolio: Optional[Dict[str, float]],
+    portfolios: Optional[Dict[str, Dict[str, float]]],
+    book: bool
+) -> Tuple[Dict[str, Dict[str, float]], Optional[Dict[str, float]]]:
+    """Named portfolios to analyze and, for the whole book, each client's capital"""
+    portfolios = dict(portfolios or {})
+    if portfolio is not None:
+        portfolios["portfolio"] = portfolio
+    if not book:
+        return portfolios, None
+    profiles = await run_io(
+        lambda: {name: profile.model_dump() for name, profile in client_profiles.items()}
+    )
+    portfolios = await run_cpu(_book_portfolios, profiles, portfolios)
+    return portfolios, {name: profiles[name]["capital"] for name in portfolios}
+
+def _var_report(
+    data: "pd.DataFrame",
+    portfolios: Dict[str, Dict[str, float]],
+    methods: List[str],
+    confidence_levels: List[float],
+    horizons: List[int],
+    capital: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """VaR and CVaR rows for every portfolio, and for the firm when ``capital`` is given"""
+    import numpy as np
+    import risk
+    
+    symbols = sorted({symbol for portfolio in portfolios.values() for symbol in portfolio})
+    missing = [symbol for symbol in symbols if symbol not in data.columns]
+    if missing:
+        raise ValueError(f"No price history for {', '.join(missing)}")
+    returns = data[symbols].pct_change().dropna()
+    names = list(portfolios)
+    weights, rows = risk.distinct_weights(portfolios.values(), symbols)
+    distinct = len(weights)
+    if capital is not None:
+        # The firm is one more portfolio: every client's capital in its weights
+        invested = np.bincount(rows, weights=[capital[name] for name in names], minlength=distinct)
+        amounts = invested @ weights
+        firm_value = float(amounts.sum())
+        weights = np.vstack([weights, amounts / firm_value]) if firm_value > 0 else weights
+    
+    with stage("var"):
+        tables = risk.value_at_risk(
+            returns.to_numpy(), weights, confidence_levels, horizons, methods,
+            config.risk.simulations, config.risk.seed
+        )
+    
+    def risk_rows(p: int) -> List[Dict[str, Any]]:
+        return [
+            {"method": method, "confidence": c, "horizon_days": h, "var": float(var[i, j, p]), "cvar": float(cvar[i, j, p])}
+            for method, (var, cvar) in tables.items()
+            for i, h in enumerate(horizons)
+            for j, c in enumerate(confidence_levels)
+        ]
+    
+    by_row = [risk_rows(p) for p in range(distinct)]
+    report = {
+        "observations": len(returns),
+        "start": str(returns.index[0].date()),
+        "end": str(returns.index[-1].date()),
+        "portfolios": {name: by_row[row] for name, row in zip(names, rows)}
+    }
+    if capital is not None and firm_value > 0:
+        firm = risk_rows(distinct)
+        for row in firm:
+            row["var_amount"] = row["var"] * firm_value
+            row["cvar_amount"] = row["cvar"] * firm_value
+        report["firm"] = {"market_value": firm_value, "clients": len(names), "risk": firm}
+    return report
+
+@tool()
+async def calculate_var(
+    portfolio: Dict[str, float] = None,
+    portfolios: Dict[str, Dict[str, float]] = None,
+    book: bool = False,
+    methods: List[str] = None,
+    confidence_levels: List[float] = None,
+    horizons: List[int] = None,
+    response_format: str = "json",
+    precision: int = 6
+) -> Dict[str, Any]:
+    """Historical, parametric and Monte Carlo VaR and CVaR for one portfolio or a batch
+    
+    With ``book`` every client in the book is included, with ``portfolios``
+    overriding their default risk-based allocations, and the firm-wide VaR
+    of all clients' capital is added. Losses are fractions of portfolio
+    value over ``horizons`` trading days, estimated from the same price
+    history ``build_portfolio`` uses.
+    """
+    try:
+        compact_response = check_format(response_format)
+        portfolios, capital = await _requested_portfolios(portfolio, portfolios, book)
+        if not portfolios:
+            return {"status": "error", "message": "Give a portfolio, portfolios, or book=true"}
+        
+        symbols = sorted({symbol for holdings in portfolios.values() for symbol in holdings})
+        track(len(symbols) + 1)
+        data = await adj_close(symbols, period=PORTFOLIO_HISTORY)
+        checkpoint()
+        report = await run_cpu(
+            _var_report,
+            data,
+            portfolios,
+            methods or config.risk.methods,
+            confidence_levels or config.risk.confidence_levels,
+            horizons or config.risk.horizons,
+            capital
+        )
+        await advance("VaR computed")
+        
+        if compact_response:
+            rows = [{"portfolio": name, **row} for name, risk_rows in report["portfolios"].items() for row in risk_rows]
+            payload = {
+                "status": "success",
+                **{key: report[key] for key in ("observations", "start", "end")},
+                **record_columns(rows, precision=precision)
+            }
+            if "firm" in report:
+                payload["firm"] = {
+                    "market_value": round_floats(report["firm"]["market_value"], precision),
+                    **record_columns(report["firm"]["risk"], precision=precision)
+                }
+            return compact(payload)
+        return {"status": "success", **report}
+    
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+_factor_betas = None
+
+def _beta_cache() -> "BetaCache":
+    from scenarios import BetaCache
+    
+    global _factor_betas
+    if _factor_betas is None:
+        _factor_betas = BetaCache()
+    return _factor_betas
+
+def _factor_proxies() -> List[str]:
+    return [factor.proxy for factor in config.scenarios.factors.values()]
+
+def _estimate_factor_betas(data: "pd.DataFrame", symbols: List[str], provider: str) -> int:
+    """Estimate and cache the factor betas of ``symbols`` from a price panel holding them and the proxies"""
+    import numpy as np
+    from scenarios import estimate_betas
+    
+    proxies = _factor_proxies()
+    missing = [symbol for symbol in proxies if symbol not in data.columns]
+    if missing:
+        raise ValueError(f"No price history for factor proxies {', '.join(missing)}")
+    symbols = [symbol for symbol in symbols if symbol in data.columns]
+    with stage("estimation"):
+        prices = data[symbols + proxies].to_numpy()
+        returns = prices[1:] / prices[:-1] - 1
+        factor_returns = returns[:, len(symbols):]
+        days = ~np.isnan(factor_returns).any(axis=1)
+        betas = estimate_betas(returns[days, :len(symbols)], factor_returns[days])
+    estimated = {symbol: beta for symbol, beta in zip(symbols, betas) if not np.isnan(beta).any()}
+    _beta_cache().store(estimated, provider)
+    return len(estimated)
+
+async def _betas_for(symbols: List[str]) -> Dict[str, "np.ndarray"]:
+    """Cached factor betas of ``symbols``, estimating the ones missing or stale"""
+    from market_data import active_provider
+    
+    provider = active_provider()[0]
+    max_age = config.scenarios.betas_max_age_seconds
+    betas, missing = _beta_cache().lookup(symbols, provider, max_age)
+    if missing:
+        data = await adj_close(sorted(set(missing) | set(_factor_proxies())), period=PORTFOLIO_HISTORY)
+        checkpoint()
+        await run_cpu(_estimate_factor_betas, data, missing, provider)
+        betas.update(_beta_cache().lookup(missing, provider, max_age)[0])
+    return betas
+
+def _stress_report(
+    portfolios: Dict[str, Dict[str, float]],
+    betas: Dict[str, "np.ndarray"],
+    scenarios: Dict[str, Dict[str, float]],
+    capital: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """Every portfolio's return under every scenario, and the firm's when ``capital`` is given"""
+    import numpy as np
+    import risk
+    from scenarios import scenario_returns, shock_matrix
+    
+    symbols = sorted({symbol for portfolio in portfolios.values() for symbol in portfolio})
+    missing = [symbol for symbol in symbols if symbol not in betas]
+    if missing:
+        raise ValueError(f"Not enough price history for factor betas of {', '.join(missing)}")
+    factors = config.scenarios.factors
+    names = list(portfolios)
+    with stage("scenarios"):
+        weights, rows = risk.distinct_weights(portfolios.values(), symbols)
+        shocks = shock_matrix(scenarios, list(factors), [factor.return_per_unit for factor in factors.values()])
+        returns = scenario_returns(weights, np.array([betas[symbol] for symbol in symbols]), shocks)
+    
+    by_row = [{scenario: float(value) for scenario, value in zip(scenarios, row)} for row in returns]
+    report = {
+        "scenarios": scenarios,
+        "results": {name: by_row[row] for name, row in zip(names, rows)}
+    }
+    if capital is not None:
+        amounts = np.bincount(rows, weights=[capital[name] for name in names], minlength=len(weights))
+        firm_value = float(amounts.sum())
+        report["firm"] = {
+            "market_value": firm_value,
+            "clients": len(names),
+            "impacts": {
+                scenario: {"return": float(amount / firm_value) if firm_value else 0.0, "amount": float(amount)}
+                for scenario, amount in zip(scenarios, amounts @ returns)
+            }
+        }
+    return report
+
+@tool()
+async def run_stress_test(
+    portfolio: Dict[str, float] = None,
+    portfolios: Dict[str, Dict[str, float]] = None,
+    book: bool = False,
+    scenarios: List[str] = None,
+    custom_scenarios: Dict[str, Dict[str, float]] = None,
+    response_format: str = "json",
+    precision: int = 6
+) -> Dict[str, Any]:
+    """Portfolio returns under hypothetical factor shocks, such as rates +200bp or equities -20%
+    
+    ``scenarios`` names entries of the scenario library (default: all of
+    them, unless only ``custom_scenarios`` are given). ``custom_scenarios``
+    maps a name to factor shocks in ``config.scenarios.factors`` units:
+    returns for equities, usd and commodities, basis points for rates. With
+    ``book`` every client is included and the firm-wide impact is added.
+    """
+    try:
+        compact_response = check_format(response_format)
+        library = config.scenarios.library
+        if scenarios is None:
+            scenarios = [] if custom_scenarios else list(library)
+        unknown = [name for name in scenarios if name not in library]
+        if unknown:
+            return {"status": "error", "message": f"Unknown scenarios {unknown}; the library has {', '.join(library)}"}
+        selected = {name: library[name] for name in scenarios}
+        selected.update(custom_scenarios or {})
+        if not selected:
+            return {"status": "error", "message": "No scenarios to run"}
+        
+        portfolios, capital = await _requested_portfolios(portfolio, portfolios, book)
+        if not portfolios:
+            return {"status": "error", "message": "Give a portfolio, portfolios, or book=true"}
+        symbols = sorted({symbol for holdings in portfolios.values() for symbol in holdings})
+        track(len(symbols) + len(config.scenarios.factors) + 1)
+        betas = await _betas_for(symbols)
+        report = await run_cpu(_stress_report, portfolios, betas, selected, capital)
+        await advance("Scenarios evaluated")
+        
+        if compact_response:
+            names = list(report["results"])
+            payload = {
+                "status": "success",
+                "scenarios": list(selected),
+                "portfolios": names,
+                "returns": round_floats([list(report["results"][name].values()) for name in names], precision)
+            }
+            if "firm" in report:
+                payload["firm"] = {
+                    "market_value": round_floats(report["firm"]["market_value"], precision),
+                    "amounts": round_floats([impact["amount"] for impact in report["firm"]["impacts"].values()], precision)
+                }
+            return compact(payload)
+        return {"status": "success", **report}
+    
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+_correlation_models = None
+
+def _correlation_cache() -> "ModelCache":
+    from correlation import ModelCache
+    
+    global _correlation_models
+    if _correlation_models is None:
+        _correlation_models = ModelCache(config.correlation.cache_entries)
+    return _correlation_models
+
+def _cached_correlation_model(symbols: List[str], key: Tuple[Any, ...]) -> Optional["CorrelationModel"]:
+    """A model from an earlier call or from the precomputed universe estimates, without fetching prices"""
+    from correlation import CorrelationModel
+    
+    model = _correlation_cache().get(key)
+    if model is None:
+        estimates = warmer.estimates_for(symbols)
+        if estimates is not None:
+            model = CorrelationModel.from_covariance(symbols, estimates[1].to_numpy())
+            _correlation_cache().put(key, model)
+    return model
+
+def _correlation_model(data: "pd.DataFrame", key: Tuple[Any, ...]) -> "CorrelationModel":
+    """Model over every symbol with varying price history in ``data``"""
+    from correlation import CorrelationModel
+    
+    import numpy as np
+    
+    with stage("estimation"):
+        available = data.columns[data.notna().any()]
+        prices = data[available].to_numpy()
+        returns = prices[1:] / prices[:-1] - 1
+        # Gaps stay NaN: each pair is correlated over the days both symbols traded
+        returns = returns[~np.isnan(returns).all(axis=1)]
+        usable = (~np.isnan(returns)).sum(axis=0) >= config.correlation.min_overlap
+        usable[usable] = np.nanstd(returns[:, usable], axis=0) > 0
+        model = CorrelationModel.from_returns(
+            list(available[usable]), returns[:, usable], config.correlation.min_overlap
+        )
+    _correlation_cache().put(key, model)
+    return model
+
+def _correlation_summary(
+    model: "CorrelationModel",
+    top_k: int,
+    cluster_threshold: float,
+    matrix_symbols: Optional[List[str]]
+) -> Dict[str, Any]:
+    """Most correlated pairs, clusters and optionally a correlation block"""
+    import numpy as np
+    
+    block_size = config.correlation.block_size
+    with stage("correlation"):
+        summary = {
+            "source": model.source,
+            "symbols": len(model.symbols),
+            "top_pairs": [
+                {"pair": [first, second], "correlation": value}
+                for first, second, value in model.top_pairs(top_k, block_size)
+            ],
+            "clusters": model.clusters(cluster_threshold, block_size)
+        }
+        if matrix_symbols is not None:
+            unknown = [symbol for symbol in matrix_symbols if symbol not in model.index]
+            if unknown:
+                raise ValueError(f"No correlation for {', '.join(unknown)}")
+            values = model.matrix(matrix_symbols)
+            summary["matrix"] = {
+                "symbols": list(matrix_symbols),
+                "values": np.where(np.isnan(values), None, values).tolist()  # None: too few shared days
+            }
+    return summary
+
+@tool(memoize=True)
+async def analyze_correlation(
+    symbols: List[str] = None,
+    portfolio: Dict[str, float] = None,
+    universe: str = None,
+    top_k: int = None,
+    cluster_threshold: float = None,
+    include_matrix: bool = False,
+    matrix_symbols: List[str] = None,
+    response_format: str = "json",
+    precision: int = 6
+) -> Dict[str, Any]:
+    """Which holdings are the same bet: most correlated pairs, clusters and the correlation matrix
+    
+    Give ``symbols``, a ``portfolio`` or a configured ``universe``. Clusters
+    link symbols correlated at least ``cluster_threshold``, directly or
+    through each other. The matrix is returned with ``include_matrix`` for
+    up to ``config.correlation.max_matrix_symbols`` symbols, or for just
+    ``matrix_symbols`` on larger universes.
+    """
+    try:
+        compact_response = check_format(response_format)
+        if universe is not None:
+            if universe not in config.asset_universes:
+                return {"status": "error", "message": f"Unknown universe {universe}"}
+            symbols = config.asset_universes[universe]
+        elif portfolio is not None:
+            symbols = list(portfolio)
+        if not symbols or len(set(symbols)) < 2:
+            return {"status": "error", "message": "Give at least two symbols, a portfolio or a universe"}
+        symbols = list(dict.fromkeys(symbols))
+        if top_k is None:
+            top_k = config.correlation.top_k
+        elif top_k <= 0:
+            return {"status": "error", "message": "top_k must be positive"}
+        if cluster_threshold is None:
+            cluster_threshold = config.correlation.cluster_threshold
+        if include_matrix and matrix_symbols is None:
+            if len(symbols) > config.correlation.max_matrix_symbols:
+                return {
+                    "status": "error",
+                    "message": f"{len(symbols)} symbols is too many for a full matrix; "
+                               f"give matrix_symbols (up to {config.correlation.max_matrix_symbols})"
+                }
+            matrix_symbols = symbols
+        
+        from market_data import data_version
+        
+        track(len(symbols) + 1)
+        key = (tuple(symbols), PORTFOLIO_HISTORY, data_version())
+        model = await run_cpu(_cached_correlation_model, symbols, key)
+        if model is None:
+            data = await adj_close(symbols, period=PORTFOLIO_HISTORY)
+            checkpoint()
+            model = await run_cpu(_correlation_model, data, key)
+        missing = [symbol for symbol in symbols if symbol not in model.index]
+        summary = await run_cpu(_correlation_summary, model, top_k, cluster_threshold, matrix_symbols)
+        await advance("Correlation computed")
+        
+        if compact_response:
+            payload = {
+                "status": "success",
+                "source": summary["source"],
+                "symbols": summary["symbols"],
+                "pairs": [pair["pair"] for pair in summary["top_pairs"]],
+                "correlations": round_floats([pair["correlation"] for pair in summary["top_pairs"]], precision),
+                "clusters": [cluster["symbols"] for cluster in summary["clusters"]],
+                "cluster_correlations": round_floats([cluster["mean_correlation"] for cluster in summary["clusters"]], precision),
+                "missing": missing
+            }
+            if "matrix" in summary:
+                payload["matrix"] = round_floats(summary["matrix"], precision)
+            return compact(payload)
+        return {"status": "success", **summary, "missing": missing}
+    
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+@tool()
+async def generate_investment_report(client_name: str, portfolio: Dict[str, float]) -> str:
     """Generate a comprehensive investment report for the client"""
-    if client_name not in client_profiles:
+    profile = await run_io(client_profiles.get, client_name)
+    if profile is None:
         return f"Error: Client profile not found for {client_name}"
     
-    profile = client_profiles[client_name]
+    return render_investment_report(profile.model_dump(), portfolio)
+
+def _book_portfolios(
+    profiles: Dict[str, Dict[str, Any]],
+    portfolios: Dict[str, Dict[str, float]]
+) -> Dict[str, Dict[str, float]]:
+    """Requested portfolios, falling back to the default risk-based allocation"""
+    book = {}
+    for name, profile in profiles.items():
+        if name in portfolios:
+            book[name] = portfolios[name]
+        else:
+            universe = _default_universe(profile["risk_tolerance"])
+            weights = _risk_based_weights(profile["risk_tolerance"], len(universe))
+            book[name] = {k: float(v) for k, v in zip(universe, weights)}
+    return book
+
+def _market_stats(data: "pd.DataFrame") -> Dict[str, Any]:
+    """Annualized mean returns and covariance shared with report workers"""
+    returns = data.pct_change().dropna()
+    return {
+        "index": {symbol: i for i, symbol in enumerate(returns.columns)},
+        "mean": returns.mean().to_numpy() * 252,
+        "cov": returns.cov().to_numpy() * 252
+    }
+
+@tool()
+async def generate_book_reports(
+    output_dir: str = "reports",
+    portfolios: Dict[str, Dict[str, float]] = None,
+    archive: bool = False,
+    include_metrics: bool = False,
+    max_workers: int = None
+) -> Dict[str, Any]:
+    """Generate investment reports for every client in the book using a process pool
+    
+    Clients without an entry in ``portfolios`` get the default risk-based
+    allocation. With ``include_metrics`` the price history for all held
+    symbols is downloaded once and its statistics are shared with every worker.
+    ``output_dir`` is relative to ``config.storage.files_directory``.
+    """
+    if portfolios is None:
+        portfolios = {}
+    
+    try:
+        output_dir = _served_path(output_dir)
+        profiles = await run_io(
+            lambda: {name: profile.model_dump() for name, profile in client_profiles.items()}
+        )
+        book = await run_cpu(_book_portfolios, profiles, portfolios)
+        
+        market_stats = None
+        if include_metrics and book:
+            symbols = sorted({symbol for holdings in book.values() for symbol in holdings})
+            data = await adj_close(symbols, period=PORTFOLIO_HISTORY)
+            market_stats = await run_cpu(_market_stats, data)
+        
+        summary = await run_cpu(
+            generate_reports,
+            profiles,
+            book,
+            output_dir,
+            archive=archive,
+            market_stats=market_stats,
+            max_workers=max_workers
+        )
+        return {"status": "success", **summary}
     
-    # Generate report content
-    report = f"""
-INVESTMENT ADVISORY REPORT
-==========================
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
 
-Client: {profile.name}
-Date: {datetime.now().strftime('%Y-%m-%d')}
+@tool()
+async def update_account_holdings(
+    account_id: str,
+    holdings: Dict[str, float],
+    household: str = None
+) -> Dict[str, Any]:
+    """Set the market value held in each asset for one account, optionally assigning its household
+    
+    Holdings are stored with the client profiles, so they survive restarts
+    and every server process sees them.
+    """
+    try:
+        await run_cpu(_update_account, account_id, holdings, household)
+        return {
+            "status": "success",
+            "account_id": account_id,
+            "positions": len(holdings)
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def _exposure_summary(
+    rollup: Dict[str, Any],
+    household: Optional[str],
+    top_n: int,
+    volatility: Optional["np.ndarray"]
+) -> Dict[str, Any]:
+    """Household or firm-wide exposure response from a rollup"""
+    import numpy as np
+    
+    household_exposure = _exposure_engine()
+    households = rollup["households"]
+    
+    def summary(i: int) -> Dict[str, Any]:
+        result = {
+            "household": households[i],
+            "market_value": float(rollup["market_value"][i]),
+            "hhi": float(rollup["hhi"][i]),
+            "effective_holdings": float(rollup["effective_holdings"][i]),
+            "top_asset": rollup["top_asset"][i],
+            "top_weight": float(rollup["top_weight"][i])
+        }
+        if volatility is not None:
+            result["volatility"] = float(volatility[i])
+        return result
+    
+    if household is not None:
+        if household not in households:
+            return {"status": "error", "message": f"Household not found: {household}"}
+        return {
+            "status": "success",
+            **summary(households.index(household)),
+            "weights": household_exposure.household_weights(household)
+        }
+    
+    most_concentrated = np.argsort(rollup["hhi"])[::-1][:top_n]
+    return {
+        "status": "success",
+        "households": len(households),
+        "accounts": len(household_exposure.accounts),
+        "market_value": float(rollup["market_value"].sum()),
+        "firm_weights": household_exposure.firm_exposure(),
+        "most_concentrated": [summary(int(i)) for i in most_concentrated]
+    }
 
-CLIENT PROFILE
---------------
-Age: {profile.age}
-Risk Tolerance: {profile.risk_tolerance.title()}
-Investment Horizon: {profile.investment_horizon} years
-Available Capital: ${profile.capital:,.2f}
-ESG Preference: {'Yes' if profile.esg_preference else 'No'}
+def _compact_exposure(summary: Dict[str, Any], precision: int) -> Dict[str, Any]:
+    """Exposure response with weights and household lists as parallel arrays"""
+    result = dict(summary)
+    for key in ("weights", "firm_weights"):
+        if key in result:
+            result[key] = mapping_columns(result[key], value_name="weights", precision=precision)
+    if "most_concentrated" in result:
+        result["most_concentrated"] = record_columns(result["most_concentrated"], precision=precision)
+    return round_floats(result, precision)
 
-RECOMMENDED PORTFOLIO ALLOCATION
---------------------------------
-"""
+def _household_volatility(data: "pd.DataFrame") -> "np.ndarray":
+    returns = data.pct_change().dropna()
+    return _exposure_engine().household_risk(returns.cov().to_numpy() * 252, list(returns.columns))
+
+@tool()
+async def get_household_exposure(
+    household: str = None,
+    include_risk: bool = False,
+    period: str = "1y",
+    top_n: int = 10,
+    response_format: str = "json",
+    precision: int = 6
+) -> Dict[str, Any]:
+    """Combined exposure across a household's accounts, or a firm-wide rollup when no household is given"""
+    try:
+        compact_response = check_format(response_format)
+        household_exposure = await run_cpu(_exposure_engine)
+        rollup = await run_cpu(household_exposure.rollup)
+        if household is not None and household not in rollup["households"]:
+            return {"status": "error", "message": f"Household not found: {household}"}
+        volatility = None
+        if include_risk and household_exposure.assets:
+            if household is not None:
+                symbols = list(await run_cpu(household_exposure.household_weights, household))
+            else:
+                symbols = list(household_exposure.assets)
+            data = await adj_close(symbols, period=period)
+            volatility = await run_cpu(_household_volatility, data)
+        
+        summary = await run_cpu(_exposure_summary, rollup, household, top_n, volatility)
+        if compact_response and summary["status"] == "success":
+            return compact(_compact_exposure(summary, precision))
+        return summary
     
-    for symbol, weight in portfolio.items():
-        report += f"{symbol}: {weight*100:.1f}%\n"
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+SYNTHETIC_DATA_ENV = "FINANCIAL_ADVISOR_SYNTHETIC_DATA"  # carries --synthetic into uvicorn workers
+DATA_DIRECTORY_ENV = "FINANCIAL_ADVISOR_DATA_DIR"  # carries --data-dir into uvicorn workers
+
+def _warm_universes() -> Dict[str, List[str]]:
+    """Configured universes plus the defaults build_portfolio falls back to"""
+    universes = {name: list(symbols) for name, symbols in config.asset_universes.items()}
+    for risk_tolerance in ("conservative", "moderate", "aggressive"):
+        universes[f"default_{risk_tolerance}"] = _default_universe(risk_tolerance)
+    return universes
+
+@warmer.job
+async def warm_up() -> Dict[str, Any]:
+    """Prefetch every warm universe, the benchmark and the factor proxies, then precompute estimates and betas"""
+    from market_data import active_provider, data_version
     
-    report += f"""
+    universes = _warm_universes()
+    held = sorted({symbol for universe in universes.values() for symbol in universe})
+    symbols = sorted(set(held) | {config.backtest.benchmark} | set(_factor_proxies()))
+    provider = active_provider()[0]
+    # Taken before fetching, so bars landing mid-fetch leave the estimates stale rather than mislabelled
+    version = data_version()
+    data = await adj_close(symbols, period=PORTFOLIO_HISTORY)
+    
+    estimates = {}
+    for universe in universes.values():
+        if all(symbol in data.columns for symbol in universe):
+            # Only the universe's own dates, as if it had been fetched alone
+            panel = data[universe].dropna(how="all")
+            estimates[tuple(universe)] = await run_cpu(_estimate_returns, universe, panel)
+    warmer.store_estimates(version, estimates)
+    betas = 0
+    if all(symbol in data.columns for symbol in _factor_proxies()):
+        betas = await run_cpu(_estimate_factor_betas, data, held, provider)
+    return {"symbols": len(symbols), "universes": len(estimates), "betas": betas, "provider": provider}
 
-PORTFOLIO RATIONALE
--------------------
-This portfolio allocation is designed to match your {profile.risk_tolerance} risk profile 
-and {profile.investment_horizon}-year investment horizon. The diversified approach helps 
-balance growth potential with risk management.
+def use_synthetic_data() -> None:
+    """Serve generated prices instead of live market data (load testing, air-gapped hosts)"""
+    config.data_providers["synthetic"].enabled = True
 
-NEXT STEPS
-----------
-1. Review the proposed allocation
-2. Discuss any concerns or preferences
-3. Implement the investment strategy
-4. Schedule regular portfolio reviews
+def use_data_directory(directory: str) -> None:
+    """Keep the client database, caches and batch output under ``directory`` (tests, side-by-side servers)"""
+    global client_profiles, tax_lots, account_holdings
+    relocate_data(directory)
+    client_profiles = ClientStore(config.storage.client_db_path, ClientProfile, busy_timeout_ms=config.storage.busy_timeout_ms)
+    tax_lots = LotStore(config.storage.client_db_path, busy_timeout_ms=config.storage.busy_timeout_ms)
+    account_holdings = HoldingStore(config.storage.client_db_path, busy_timeout_ms=config.storage.busy_timeout_ms)
 
-This report is for informational purposes only and does not constitute investment advice.
-Please consult with a qualified financial advisor before making investment decisions.
-"""
+def create_app():
+    """ASGI app for multi-worker serving
     
-    return report
+    SSE sessions live inside one process, so workers behind a shared socket
+    or load balancer serve stateless streamable HTTP instead. Profiles and
+    price data are shared through the client store and the on-disk price
+    cache, so any worker can answer any request.
+    """
+    mcp.settings.stateless_http = True
+    if os.environ.get(SYNTHETIC_DATA_ENV):
+        use_synthetic_data()
+    if os.environ.get(DATA_DIRECTORY_ENV):
+        use_data_directory(os.environ[DATA_DIRECTORY_ENV])
+    if config.metrics.enabled:
+        registry.share(config.metrics.shared_directory, config.metrics.flush_interval_seconds)
+    return http_app("streamable-http")
+
+def http_app(transport: str):
+    """Starlette app for an HTTP transport that starts background jobs with the server, not with the first session"""
+    app = mcp.sse_app() if transport == "sse" else mcp.streamable_http_app()
+    transport_lifespan = app.router.lifespan_context
+    
+    @asynccontextmanager
+    async def lifespan(app):
+        async with _serving():
+            async with transport_lifespan(app):
+                yield
+    
+    app.router.lifespan_context = lifespan
+    return app
+
+def serve(transport: str, host: str, port: int, workers: int) -> None:
+    """Run the server with one process, or several uvicorn workers"""
+    if workers > 1:
+        import uvicorn
+        
+        if transport != "streamable-http":
+            print(f"Serving streamable-http: the {transport} transport cannot be shared across {workers} workers")
+        if config.data_providers["synthetic"].enabled:
+            os.environ[SYNTHETIC_DATA_ENV] = "1"
+        if config.metrics.enabled:
+            # Start from empty counters rather than merging snapshots left by a previous run
+            import shutil
+            shutil.rmtree(config.metrics.shared_directory, ignore_errors=True)
+        uvicorn.run("main:create_app", factory=True, host=host, port=port, workers=workers)
+        return
+    
+    mcp.settings.host = host
+    mcp.settings.port = port
+    if transport == "stdio":
+        mcp.run(transport=transport)
+        return
+    
+    import uvicorn
+    
+    uvicorn.run(http_app(transport), host=host, port=port, log_level=mcp.settings.log_level.lower())
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description=config.service_name)
+    parser.add_argument("--transport", choices=["sse", "stdio", "streamable-http"], default=config.server.transport)
+    parser.add_argument("--host", default=config.server.host)
+    parser.add_argument("--port", type=int, default=config.server.port)
+    parser.add_argument("--workers", type=int, default=config.server.workers)
+    parser.add_argument("--synthetic", action="store_true", help="serve synthetic prices instead of live market data")
+    parser.add_argument("--data-dir", help="keep the client database, caches and batch output here instead of data/")
+    args = parser.parse_args()
+    
+    if args.synthetic:
+        use_synthetic_data()
+    if args.data_dir:
+        os.environ[DATA_DIRECTORY_ENV] = args.data_dir  # read again by each worker's create_app
+        use_data_directory(args.data_dir)
+    
     # Start the MCP server
-    mcp.run(transport="sse")
\ No newline at end of file
+    serve(args.transport, args.host, args.port, args.workers)
\ No newline at end of file
@@ -0,0 +1,237 @@
+"""
+Market data access for Financial Advisor AI Copilot
+
+Prices are fetched one symbol per request so fetches can run concurrently
+on the I/O pool. ``yf.download`` keeps its results in module-level state
+and is not safe to call from several threads at once, so it is not used
+here.
+
+The provider is the first enabled entry of ``config.data_providers`` with
+an implementation registered through ``register_provider``; Yahoo Finance
+and the offline synthetic generator (synthetic_data.py) are built in.
+
+Price histories go through the shared on-disk cache (see price_cache.py)
+when it is enabled, so every server process reuses the same downloads.
+
+pandas and yfinance are imported on first use so that starting the server
+and serving tools that never touch prices stays fast.
+"""
+
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from cancellation import checkpoint, remaining
+from config import config
+from executor import run_io
+from metrics import stage
+from progress import advance
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from price_cache import PriceCache
+
+FETCH_TIMEOUT_SECONDS = 10.0  # yfinance's own default per request
+
+_price_cache: Optional["PriceCache"] = None
+_price_cache_lock = threading.Lock()
+
+
+def price_cache() -> Optional["PriceCache"]:
+    """Shared price cache configured under ``config.price_cache``, or None when disabled"""
+    global _price_cache
+    if not config.price_cache.enabled:
+        return None
+    if _price_cache is None:
+        with _price_cache_lock:
+            if _price_cache is None:
+                from price_cache import PriceCache
+                settings = config.price_cache
+                _price_cache = PriceCache(
+                    settings.directory,
+                    max_age_seconds=settings.max_age_seconds,
+                    closed_max_age_seconds=settings.closed_max_age_seconds,
+                    lock_timeout_seconds=settings.lock_timeout_seconds
+                )
+    return _price_cache
+
+
+class YFinanceProvider:
+    """Prices and fundamentals from Yahoo Finance"""
+
+    def history(
+        self,
+        symbol: str,
+        period: Optional[str],
+        start: Optional[str],
+        end: Optional[str]
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Daily adjusted close for one symbol, as (dates, prices) arrays"""
+        import numpy as np
+        import yfinance as yf
+
+        kwargs = {"start": start, "end": end} if start is not None else {"period": period}
+        # Don't let one slow request outlive the tool call's deadline
+        hist = yf.Ticker(symbol).history(auto_adjust=False, timeout=remaining(FETCH_TIMEOUT_SECONDS), **kwargs)
+        if hist.empty:
+            return np.array([], dtype="datetime64[D]"), np.array([], dtype=float)
+        index = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+        return index.values.astype("datetime64[D]"), hist["Adj Close"].to_numpy(dtype=float)
+
+    def snapshot(self, symbol: str, period: str) -> Optional[Dict[str, Any]]:
+        """Latest price, change over ``period``, volume and key fundamentals"""
+        import yfinance as yf
+
+        ticker = yf.Ticker(symbol)
+        hist = ticker.history(period=period, timeout=remaining(FETCH_TIMEOUT_SECONDS))
+        if hist.empty:
+            return None
+
+        checkpoint()
+        info = ticker.info
+        current_price = hist['Close'].iloc[-1]
+        price_change = ((current_price - hist['Close'].iloc[0]) / hist['Close'].iloc[0]) * 100
+        return {
+            "current_price": float(current_price),
+            "price_change_pct": float(price_change),
+            "volume": int(hist['Volume'].iloc[-1]),
+            "market_cap": info.get('marketCap', 'N/A'),
+            "sector": info.get('sector', 'N/A'),
+            "pe_ratio": info.get('trailingPE', 'N/A'),
+            "quote_type": info.get('quoteType', 'N/A'),
+            "category": info.get('category', 'N/A')
+        }
+
+
+def _synthetic_provider() -> Any:
+    from synthetic_data import SyntheticProvider
+
+    return SyntheticProvider.from_config(config.synthetic_data)
+
+
+# Provider implementations by ``config.data_providers`` key, and built-ins created on first use
+_providers: Dict[str, Any] = {"yfinance": YFinanceProvider()}
+_provider_factories = {"synthetic": _synthetic_provider}
+_providers_lock = threading.Lock()
+
+
+def register_provider(name: str, provider: Any) -> None:
+    """Make ``provider`` (with ``history`` and optionally ``snapshot``) selectable as ``name``"""
+    _providers[name] = provider
+
+
+def active_provider() -> Tuple[str, Any]:
+    """First enabled provider in ``config.data_providers`` that has an implementation"""
+    for name, settings in config.data_providers.items():
+        if not settings.enabled:
+            continue
+        if name not in _providers and name in _provider_factories:
+            with _providers_lock:
+                if name not in _providers:
+                    _providers[name] = _provider_factories[name]()
+        if name in _providers:
+            return name, _providers[name]
+    raise RuntimeError("No enabled market data provider")
+
+
+def data_version() -> str:
+    """Stamp of the market data tools would see now; it changes when new bars may have landed"""
+    name, provider = active_provider()
+    if hasattr(provider, "version"):
+        return f"{name}:{provider.version()}"
+    # Live providers can publish at any time; assume nothing new within one refresh interval
+    return f"{name}:{int(time.time() // config.result_cache.live_refresh_seconds)}"
+
+
+def _download_history(
+    symbol: str,
+    period: Optional[str],
+    start: Optional[str],
+    end: Optional[str]
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Daily adjusted close for one symbol from the active provider, as (dates, prices) arrays"""
+    return active_provider()[1].history(symbol, period, start, end)
+
+
+def symbol_history(
+    symbol: str,
+    period: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    refresh: bool = False
+) -> "pd.Series":
+    """Daily adjusted close for one symbol, indexed by tz-naive date; ``refresh`` bypasses cached prices"""
+    import pandas as pd
+
+    if start is None:
+        period = period or "1y"
+    fetch = lambda: _download_history(symbol, period, start, end)
+    cache = price_cache()
+    if cache is not None:
+        # Keyed by provider too, so synthetic and live prices never mix
+        key = f"{active_provider()[0]}:{symbol}"
+        if refresh:
+            cache.invalidate(key, period=period, start=start, end=end)
+        dates, prices = cache.get_or_fetch(key, fetch, period=period, start=start, end=end)
+    else:
+        dates, prices = fetch()
+    # Cached prices are memory-mapped; wrap them without copying
+    return pd.Series(prices, index=pd.DatetimeIndex(dates), name=symbol, dtype=float, copy=False)
+
+
+def symbol_snapshot(symbol: str, period: str = "1y") -> Optional[Dict[str, Any]]:
+    """Latest price, change over ``period``, volume and key fundamentals for one symbol"""
+    provider = active_provider()[1]
+    if hasattr(provider, "snapshot"):
+        return provider.snapshot(symbol, period)
+
+    # Providers without fundamentals: summarize the price history
+    dates, prices = provider.history(symbol, period, None, None)
+    if not len(prices):
+        return None
+    return {
+        "current_price": float(prices[-1]),
+        "price_change_pct": float((prices[-1] - prices[0]) / prices[0] * 100),
+        "volume": "N/A",
+        "market_cap": "N/A",
+        "sector": "N/A",
+        "pe_ratio": "N/A",
+        "quote_type": "N/A",
+        "category": "N/A"
+    }
+
+
+def combine_histories(histories: List["pd.Series"]) -> "pd.DataFrame":
+    """Align per-symbol series into a date x symbol panel"""
+    import pandas as pd
+
+    if not histories:
+        return pd.DataFrame()
+    return pd.concat(histories, axis=1).sort_index()
+
+
+async def adj_close(
+    symbols: List[str],
+    period: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    refresh: bool = False
+) -> "pd.DataFrame":
+    """Adjusted close panel for ``symbols``, fetched concurrently on the I/O pool
+
+    Reports one progress step per symbol as its history arrives.
+    """
+    fetched = 0
+
+    async def fetch(symbol: str) -> "pd.Series":
+        nonlocal fetched
+        history = await run_io(symbol_history, symbol, period=period, start=start, end=end, refresh=refresh)
+        fetched += 1
+        await advance(f"Fetched {fetched}/{len(symbols)} symbols")
+        return history
+
+    with stage("fetch"):
+        histories = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        return combine_histories(list(histories))
@@ -0,0 +1,255 @@
+"""
+Tool latency and throughput metrics for Financial Advisor AI Copilot
+
+Every tool call records a call count, an error count and a latency
+histogram. Calls answered from the result cache (see result_cache.py) are
+counted and timed like any other call, and also counted as cache hits per
+tool. Code inside a tool can time named sub-stages (fetch, estimation,
+optimization, metrics, ...) with ``stage()``; the current tool is tracked
+in a context variable, so stages are attributed correctly even when they
+run on the worker pools. Serialization of the result is timed by
+``MeteredFastMCP``. Everything is rendered in the Prometheus text format.
+
+With several server processes each worker periodically writes a snapshot
+to a shared directory and a scrape merges all snapshots, so the endpoint
+reports the whole deployment rather than whichever worker answered.
+"""
+
+import contextvars
+import functools
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+current_tool: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_tool", default=None)
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms with Prometheus text rendering"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], List[Any]] = {}
+        self._shared_directory: Optional[str] = None
+        self._flush_interval = 5.0
+        self._last_flush = 0.0
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._meta[name] = ("counter", help_text, ())
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self._meta[name] = ("histogram", help_text, buckets)
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, value: float = 1.0) -> None:
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        buckets = self._meta[name][2]
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Serializable copy of every series"""
+        with self._lock:
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "histograms": [
+                    [name, list(labels), list(entry[0]), entry[1], entry[2]]
+                    for (name, labels), entry in self._histograms.items()
+                ]
+            }
+
+    def share(self, directory: str, flush_interval: float = 5.0) -> None:
+        """Publish snapshots to ``directory`` so any worker can report for all of them"""
+        os.makedirs(directory, exist_ok=True)
+        self._shared_directory = directory
+        self._flush_interval = flush_interval
+
+    def flush(self, force: bool = False) -> None:
+        """Write this process's snapshot to the shared directory, at most once per interval"""
+        if self._shared_directory is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self._flush_interval:
+            return
+        self._last_flush = now
+        path = os.path.join(self._shared_directory, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.snapshot(), handle)
+        os.replace(tmp_path, path)
+
+    def _collect(self) -> Tuple[Dict[Tuple[str, Labels], float], Dict[Tuple[str, Labels], List[Any]]]:
+        if self._shared_directory is None:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush(force=True)
+            snapshots = []
+            for path in glob.glob(os.path.join(self._shared_directory, "*.json")):
+                try:
+                    with open(path, "r", encoding="utf-8") as handle:
+                        snapshots.append(json.load(handle))
+                except (OSError, ValueError):
+                    continue
+
+        counters: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], List[Any]] = {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                counters[key] = counters.get(key, 0.0) + value
+            for name, labels, buckets, total, count in snapshot["histograms"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                entry = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+                entry[0] = [a + b for a, b in zip(entry[0], buckets)]
+                entry[1] += total
+                entry[2] += count
+        return counters, histograms
+
+    def render(self) -> str:
+        """Prometheus text exposition of every series"""
+        counters, histograms = self._collect()
+
+        def label_text(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = list(labels) + ([extra] if extra else [])
+            if not pairs:
+                return ""
+            escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                       for key, value in pairs)
+            return "{" + ",".join(escaped) + "}"
+
+        lines: List[str] = []
+        for name, (kind, help_text, buckets) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (series, labels), value in sorted(counters.items()):
+                    if series == name:
+                        lines.append(f"{name}{label_text(labels)} {value:g}")
+            else:
+                for (series, labels), (counts, total, count) in sorted(histograms.items()):
+                    if series != name:
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{label_text(labels, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{label_text(labels, ('le', '+Inf'))} {count}")
+                    lines.append(f"{name}_sum{label_text(labels)} {total:.6f}")
+                    lines.append(f"{name}_count{label_text(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+registry.counter("mcp_tool_calls_total", "Tool calls by tool")
+registry.counter("mcp_tool_errors_total", "Tool calls that raised or returned an error status")
+registry.histogram("mcp_tool_latency_seconds", "Tool handler latency in seconds")
+registry.histogram("mcp_tool_stage_seconds", "Time spent in named stages of a tool call")
+registry.counter("mcp_cache_requests_total", "Cache lookups by cache and result (hit, miss, wait)")
+registry.counter("mcp_tool_cache_hits_total", "Tool calls answered from the result cache, by tool")
+registry.counter("mcp_tool_cancellations_total", "Tool calls stopped by client cancellation or their deadline")
+registry.histogram("mcp_admission_wait_seconds", "Time tool calls waited in their class queue before running")
+registry.counter("mcp_admission_rejections_total", "Tool calls rejected because their class queue was full")
+
+
+def _is_error(result: Any) -> bool:
+    if isinstance(result, dict):
+        return result.get("status") == "error"
+    return isinstance(result, str) and result.startswith("Error:")
+
+
+def instrument(fn: Callable) -> Callable:
+    """Record calls, errors and latency for an async tool handler"""
+    tool_name = fn.__name__
+    labels = {"tool": tool_name}
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = current_tool.set(tool_name)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await fn(*args, **kwargs)
+            failed = _is_error(result)
+            return result
+        finally:
+            registry.observe("mcp_tool_latency_seconds", time.perf_counter() - started, labels)
+            registry.inc("mcp_tool_calls_total", labels)
+            if failed:
+                registry.inc("mcp_tool_errors_total", labels)
+            current_tool.reset(token)
+            registry.flush()
+
+    return wrapper
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a named stage of the current tool call"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(
+            "mcp_tool_stage_seconds",
+            time.perf_counter() - started,
+            {"tool": current_tool.get() or "none", "stage": name}
+        )
+
+
+def record_cached_call(tool_name: str, seconds: float) -> None:
+    """Count a call answered from the result cache as a call of its tool, with its latency"""
+    labels = {"tool": tool_name}
+    registry.observe("mcp_tool_latency_seconds", seconds, labels)
+    registry.inc("mcp_tool_calls_total", labels)
+    registry.inc("mcp_tool_cache_hits_total", labels)
+    registry.flush()
+
+
+def cache_request(cache: str, result: str) -> None:
+    """Count a cache lookup outcome ("hit", "miss" or "wait")"""
+    registry.inc("mcp_cache_requests_total", {"cache": cache, "result": result})
+
+
+class MeteredFastMCP(FastMCP):
+    """FastMCP server that also times conversion of tool results to MCP content"""
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        tool = self._tool_manager.get_tool(name)
+        if tool is None:
+            return await super().call_tool(name, arguments)
+
+        context = self.get_context()
+        result = await self._tool_manager.call_tool(name, arguments, context=context, convert_result=False)
+        token = current_tool.set(name)
+        try:
+            with stage("serialization"):
+                return tool.fn_metadata.convert_result(result)
+        except Exception as e:
+            raise ToolError(f"Error executing tool {name}: {e}") from e
+        finally:
+            current_tool.reset(token)
@@ -0,0 +1,165 @@
+"""
+Dependency-graph batch pipelines with checkpoint/resume for Financial Advisor AI Copilot
+
+A ``Pipeline`` is a set of async stages. Each stage names the stages it
+depends on and receives their results as keyword arguments:
+
+    pipeline = Pipeline("eod")
+
+    @pipeline.stage()
+    async def prices():
+        ...
+
+    @pipeline.stage(depends_on=["prices"])
+    async def estimates(prices):
+        ...
+
+A stage starts as soon as all its dependencies finish, so independent
+stages run concurrently. Within a stage, ``fan_out`` spreads work over a
+bounded number of concurrent jobs.
+
+Every finished stage is checkpointed to ``<run_dir>/<stage>.pkl``, and
+``manifest.json`` records each stage's status and timing. When a run fails
+and is started again with the same ``run_dir``, finished stages load
+their checkpoints instead of running again. Stages already running when
+another fails are allowed to finish, so their work is kept too.
+"""
+
+import asyncio
+import json
+import os
+import pickle
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+
+from metrics import current_tool, stage as timed_stage
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class StageFailed(Exception):
+    """A pipeline stage raised; finished stages are checkpointed for resume"""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Stage {stage} failed: {type(error).__name__}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    """One named step of a pipeline and the stages it needs"""
+
+    def __init__(self, name: str, fn: Callable[..., Awaitable[Any]], depends_on: Sequence[str]):
+        self.name = name
+        self.fn = fn
+        self.depends_on = list(depends_on)
+
+
+async def fan_out(items: Iterable[T], fn: Callable[[T], Awaitable[R]], limit: int) -> List[R]:
+    """``[await fn(item) for item in items]`` with up to ``limit`` running at once, in input order"""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await fn(item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp_path, path)
+
+
+class Pipeline:
+    """Async stages run as a dependency graph, with per-stage checkpoints"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+
+    def stage(self, name: Optional[str] = None, depends_on: Sequence[str] = ()) -> Callable:
+        """Register an async stage; dependencies must be registered first"""
+        def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            stage_name = name or fn.__name__
+            missing = [dependency for dependency in depends_on if dependency not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage_name} depends on unknown stages: {', '.join(missing)}")
+            self.stages[stage_name] = Stage(stage_name, fn, depends_on)
+            return fn
+        return decorator
+
+    def _checkpoint_path(self, run_dir: str, name: str) -> str:
+        return os.path.join(run_dir, f"{name}.pkl")
+
+    def _load_manifest(self, run_dir: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(run_dir, "manifest.json"), "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return {"pipeline": self.name, "stages": {}}
+
+    def _save_manifest(self, run_dir: str, manifest: Dict[str, Any]) -> None:
+        _write_atomic(os.path.join(run_dir, "manifest.json"), json.dumps(manifest, indent=2).encode("utf-8"))
+
+    async def _run_stage(self, stage: Stage, results: Dict[str, Any], run_dir: str) -> Any:
+        started = time.perf_counter()
+        with timed_stage(stage.name):
+            result = await stage.fn(**{dependency: results[dependency] for dependency in stage.depends_on})
+        _write_atomic(self._checkpoint_path(run_dir, stage.name), pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        return result, time.perf_counter() - started
+
+    async def run(self, run_dir: str, resume: bool = True) -> Dict[str, Any]:
+        """Run every stage not already checkpointed in ``run_dir``; return all stage results"""
+        os.makedirs(run_dir, exist_ok=True)
+        manifest = self._load_manifest(run_dir) if resume else {"pipeline": self.name, "stages": {}}
+        manifest["started"] = time.time()
+        manifest.pop("finished", None)
+        statuses = manifest["stages"]
+        results: Dict[str, Any] = {}
+        pending = dict(self.stages)
+        running: Dict[asyncio.Task, str] = {}
+        failure: Optional[StageFailed] = None
+        token = current_tool.set(self.name)  # stage timings are reported under the pipeline's name
+
+        try:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if failure is not None or not all(dependency in results for dependency in stage.depends_on):
+                        continue
+                    del pending[name]
+                    checkpoint = self._checkpoint_path(run_dir, name)
+                    if statuses.get(name, {}).get("status") == "done" and os.path.exists(checkpoint):
+                        with open(checkpoint, "rb") as handle:
+                            results[name] = pickle.load(handle)
+                        statuses[name]["resumed"] = True
+                        continue
+                    statuses[name] = {"status": "running"}
+                    running[asyncio.create_task(self._run_stage(stage, results, run_dir))] = name
+                if not running:
+                    if pending and failure is None:
+                        continue  # checkpoints loaded above may have unblocked more stages
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    try:
+                        results[name], seconds = task.result()
+                        statuses[name] = {"status": "done", "seconds": round(seconds, 3)}
+                    except Exception as e:
+                        statuses[name] = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+                        failure = failure or StageFailed(name, e)
+                self._save_manifest(run_dir, manifest)
+        finally:
+            current_tool.reset(token)
+
+        if failure is not None:
+            self._save_manifest(run_dir, manifest)
+            raise failure
+        manifest["finished"] = time.time()
+        self._save_manifest(run_dir, manifest)
+        return results
@@ -0,0 +1,195 @@
+"""
+Shared on-disk price cache for Financial Advisor AI Copilot
+
+Every server process reads and writes the same cache directory. Each entry
+is one symbol's daily history for one request window, stored as a 2 x n
+float64 ``.npy`` array (dates as days since the epoch, then prices) so
+readers memory-map it instead of deserializing it. Entries are written to
+a temporary file and renamed into place, and a lock file per entry stops
+several workers from downloading the same series at once.
+
+Windows that had already closed when they were written only change when
+later dividends or splits re-adjust history, so they are kept for
+``closed_max_age_seconds``; open windows expire after ``max_age_seconds``.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from datetime import date
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+from cancellation import checkpoint
+from metrics import cache_request
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Series = Tuple["np.ndarray", "np.ndarray"]  # (datetime64[D] dates, float64 prices)
+
+
+class PriceCache:
+    """Memory-mapped per-symbol price histories shared across processes"""
+
+    def __init__(
+        self,
+        directory: str,
+        max_age_seconds: float = 6 * 3600,
+        closed_max_age_seconds: float = 7 * 86400,
+        lock_timeout_seconds: float = 60.0
+    ):
+        self.directory = directory
+        self.max_age_seconds = max_age_seconds
+        self.closed_max_age_seconds = closed_max_age_seconds
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "waits": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+        cache_request("prices", name[:-1])  # hits -> hit, for the metrics endpoint
+
+    def entry_path(
+        self,
+        symbol: str,
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> str:
+        """Cache file for one symbol and request window"""
+        window = f"{period}|{start}|{end}"
+        digest = hashlib.sha1(window.encode("utf-8")).hexdigest()[:12]
+        safe_symbol = re.sub(r"[^\w\-.^=]+", "_", symbol)
+        return os.path.join(self.directory, safe_symbol, f"{digest}.npy")
+
+    def _is_fresh(self, path: str, end: Optional[str]) -> bool:
+        try:
+            modified = os.path.getmtime(path)
+        except FileNotFoundError:
+            return False
+        max_age = self.max_age_seconds
+        if end is not None and end < date.fromtimestamp(modified).isoformat():
+            max_age = self.closed_max_age_seconds  # the window closed before the entry was written
+        return time.time() - modified < max_age
+
+    def _read(self, path: str) -> Series:
+        import numpy as np
+
+        data = np.load(path, mmap_mode="r")
+        dates = data[0].astype("int64").astype("datetime64[D]")
+        return dates, data[1]
+
+    def get(
+        self,
+        symbol: str,
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Optional[Series]:
+        """Cached (dates, prices) for the window, or None if missing or stale"""
+        path = self.entry_path(symbol, period, start, end)
+        if not self._is_fresh(path, end):
+            return None
+        try:
+            return self._read(path)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(
+        self,
+        symbol: str,
+        dates: "np.ndarray",
+        prices: "np.ndarray",
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> None:
+        """Atomically store (dates, prices) for the window"""
+        import numpy as np
+
+        path = self.entry_path(symbol, period, start, end)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = np.vstack([
+            np.asarray(dates, dtype="datetime64[D]").astype("int64").astype("float64"),
+            np.asarray(prices, dtype="float64")
+        ])
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            np.save(handle, data)
+        os.replace(tmp_path, path)
+
+    def invalidate(
+        self,
+        symbol: str,
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> None:
+        """Drop the cached window so the next read fetches it again"""
+        try:
+            os.remove(self.entry_path(symbol, period, start, end))
+        except FileNotFoundError:
+            pass
+
+    def _acquire(self, lock_path: str) -> bool:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > self.lock_timeout_seconds:
+                    os.remove(lock_path)  # left behind by a crashed worker
+            except FileNotFoundError:
+                pass
+            return False
+        os.close(fd)
+        return True
+
+    def get_or_fetch(
+        self,
+        symbol: str,
+        fetch: Callable[[], Series],
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Series:
+        """Return the cached window, fetching it once across all workers on a miss"""
+        cached = self.get(symbol, period, start, end)
+        if cached is not None:
+            self._count("hits")
+            return cached
+
+        path = self.entry_path(symbol, period, start, end)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lock_path = path + ".lock"
+        deadline = time.monotonic() + self.lock_timeout_seconds
+        while not self._acquire(lock_path):
+            # Another worker is fetching this window; use its result when it lands
+            checkpoint()
+            time.sleep(0.05)
+            cached = self.get(symbol, period, start, end)
+            if cached is not None:
+                self._count("waits")
+                return cached
+            if time.monotonic() > deadline:
+                # The lock holder is stuck; fetch without caching
+                self._count("misses")
+                return fetch()
+
+        try:
+            cached = self.get(symbol, period, start, end)
+            if cached is not None:
+                self._count("hits")
+                return cached
+            self._count("misses")
+            dates, prices = fetch()
+            if len(prices):
+                self.put(symbol, dates, prices, period, start, end)
+            return dates, prices
+        finally:
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
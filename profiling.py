@@ -0,0 +1,183 @@
+"""
+Opt-in per-call profiling for Financial Advisor AI Copilot
+
+A profiled tool call is sampled every ``interval_seconds``: the stacks of
+the event-loop thread and of every pool thread currently working for the
+call are recorded and written as a collapsed-stack file (one
+``thread;frame;frame count`` line per distinct stack) that flamegraph.pl,
+speedscope or inferno turn into a flame graph. Sampling is used instead of
+cProfile because a single call spreads its work across several threads.
+
+A call is profiled when profiling is enabled in ``config.profiling`` and
+the tool is named in ``tools``, a random draw falls under ``sample_rate``,
+or the client sets ``"profile": true`` in the request ``_meta``. When
+profiling is disabled tools are registered without the wrapper and no
+sampler thread is started.
+"""
+
+import contextvars
+import functools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Set
+
+_active_profile: contextvars.ContextVar[Optional["Profile"]] = contextvars.ContextVar("active_profile", default=None)
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class Profile:
+    """Stack samples collected for one tool call"""
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.started = time.time()
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self._threads: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, ident: int) -> None:
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def detach(self, ident: int) -> None:
+        with self._lock:
+            remaining = self._threads.get(ident, 0) - 1
+            if remaining > 0:
+                self._threads[ident] = remaining
+            else:
+                self._threads.pop(ident, None)
+
+    def bind(self, fn: Callable) -> Callable:
+        """Wrap ``fn`` so the thread running it is sampled for this call"""
+        @functools.wraps(fn)
+        def attached(*args, **kwargs):
+            ident = threading.get_ident()
+            self.attach(ident)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.detach(ident)
+        return attached
+
+    def sample(self, frames: Dict[int, Any], names: Dict[int, str]) -> None:
+        with self._lock:
+            threads = list(self._threads)
+        for ident in threads:
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def write(self, directory: str) -> str:
+        """Write the collapsed stacks and return the file path"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(self.started))
+        path = os.path.join(directory, f"{self.tool}-{stamp}-{os.getpid()}-{id(self):x}.collapsed")
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in self.stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+        return path
+
+
+class _Sampler:
+    """One background thread sampling every active profile, running only while there are any"""
+
+    def __init__(self):
+        self.interval = 0.005
+        self._profiles: Set[Profile] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+
+    def stop(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._profiles:
+                    self._thread = None
+                    return
+                profiles = list(self._profiles)
+            frames = sys._current_frames()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for profile in profiles:
+                profile.sample(frames, names)
+            del frames
+            time.sleep(self.interval)
+
+
+_sampler = _Sampler()
+
+
+def current_profile() -> Optional[Profile]:
+    """Profile of the tool call running in this context, if it is being profiled"""
+    return _active_profile.get()
+
+
+def _requested() -> bool:
+    """Whether the client asked for a profile through the request ``_meta``"""
+    from mcp.server.lowlevel.server import request_ctx
+
+    request = request_ctx.get(None)
+    meta = getattr(request, "meta", None)
+    return bool(getattr(meta, "profile", False))
+
+
+def profiled(
+    fn: Callable,
+    directory: str,
+    sample_rate: float = 0.0,
+    tools: Optional[List[str]] = None,
+    interval_seconds: float = 0.005
+) -> Callable:
+    """Profile calls to the async tool ``fn`` that are selected by name, sampling or request flag"""
+    tool_name = fn.__name__
+    always = tool_name in (tools or [])
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        requested = _requested()
+        if not (always or requested or (sample_rate > 0 and random.random() < sample_rate)):
+            return await fn(*args, **kwargs)
+
+        profile = Profile(tool_name)
+        token = _active_profile.set(profile)
+        ident = threading.get_ident()
+        profile.attach(ident)
+        _sampler.interval = interval_seconds
+        _sampler.start(profile)
+        try:
+            result = await fn(*args, **kwargs)
+        finally:
+            _sampler.stop(profile)
+            profile.detach(ident)
+            _active_profile.reset(token)
+        path = profile.write(directory)
+        if requested and isinstance(result, dict):
+            result = {**result, "profile": {"path": path, "samples": profile.samples}}
+        return result
+
+    return wrapper
@@ -0,0 +1,97 @@
+"""
+Progress notifications and partial results for Financial Advisor AI Copilot
+
+Long-running tools call ``track(total)`` once they know how many steps the
+call takes. Code anywhere below them, such as ``market_data.adj_close``
+fetching symbols, then calls ``await advance(message)``. When the client
+sent a progress token, each step becomes an MCP progress notification
+("Fetched 12/40 symbols", "Estimation done", ...). Otherwise the calls do
+nothing.
+
+Clients that set ``"partial_results": true`` in the request ``_meta`` also
+receive intermediate data as it becomes available, for example each
+symbol's market data as soon as it arrives. This data is sent as
+``notifications/message`` with logger ``"partial_result"`` and is tied to
+the originating request.
+
+Notifications are best effort: a client that has gone away does not fail
+the call.
+"""
+
+import contextvars
+from typing import Any, Dict, Optional
+
+_tracker: contextvars.ContextVar[Optional["ProgressTracker"]] = contextvars.ContextVar("progress_tracker", default=None)
+
+PARTIAL_RESULT_LOGGER = "partial_result"
+
+
+def _request() -> Any:
+    from mcp.server.lowlevel.server import request_ctx
+
+    return request_ctx.get(None)
+
+
+class ProgressTracker:
+    """Step counter for one tool call that reports to the calling client"""
+
+    def __init__(self, request: Any, total: Optional[float]):
+        self.request = request
+        self.token = getattr(request.meta, "progressToken", None) if request.meta is not None else None
+        self.total = total
+        self.done = 0.0
+
+    async def advance(self, message: Optional[str] = None, steps: float = 1) -> None:
+        self.done += steps
+        if self.token is None:
+            return
+        try:
+            await self.request.session.send_progress_notification(
+                self.token,
+                self.done,
+                total=self.total,
+                message=message,
+                related_request_id=str(self.request.request_id)
+            )
+        except Exception:
+            pass
+
+
+def track(total: Optional[float] = None) -> Optional[ProgressTracker]:
+    """Start reporting progress for the current tool call, out of ``total`` steps"""
+    request = _request()
+    if request is None:
+        return None
+    tracker = ProgressTracker(request, total)
+    _tracker.set(tracker)
+    return tracker
+
+
+async def advance(message: Optional[str] = None, steps: float = 1) -> None:
+    """Report that the current tool call completed ``steps`` more steps"""
+    tracker = _tracker.get()
+    if tracker is not None:
+        await tracker.advance(message, steps)
+
+
+def partial_results_requested() -> bool:
+    """Whether the client asked for partial results in the request ``_meta``"""
+    request = _request()
+    meta = getattr(request, "meta", None)
+    return bool(getattr(meta, "partial_results", False))
+
+
+async def partial_result(tool: str, data: Dict[str, Any]) -> None:
+    """Send intermediate data for the current call, if the client asked for it"""
+    request = _request()
+    if request is None or not partial_results_requested():
+        return
+    try:
+        await request.session.send_log_message(
+            level="info",
+            data={"tool": tool, **data},
+            logger=PARTIAL_RESULT_LOGGER,
+            related_request_id=request.request_id
+        )
+    except Exception:
+        pass
@@ -0,0 +1,155 @@
+"""
+Tax-lot-aware rebalancing for Financial Advisor AI Copilot
+
+Rebalancing to target weights has to decide which lots to sell. The
+engine works on all of a client's lots at once, as arrays:
+
+1. Each symbol's excess over its target value is what must be sold, less
+   what only wash-sale lots could cover. When the total exceeds
+   ``turnover_limit`` of the account, every symbol's sale is scaled down
+   in proportion.
+2. Every lot gets a score: the tax per dollar of proceeds if it is sold,
+   ``(price - basis) / price`` times the short- or long-term rate. Losses
+   score below zero, so they are harvested first, then the cheapest gains.
+3. Lots are ordered by (symbol, score) with one ``np.lexsort``. Each lot
+   sells whatever of its symbol's excess the better-scored lots before it
+   did not cover, computed from a cumulative sum. Nothing loops over lots.
+
+Wash sales are avoided on both sides. Loss lots in a symbol bought within
+the wash-sale window are not sold. Symbols the client sold at a loss
+within the window are not bought back; that cash stays uninvested until
+the window passes.
+"""
+
+from datetime import date
+from typing import Any, Dict, Mapping, Sequence, Set
+
+import numpy as np
+
+from lots import Lot
+
+
+def plan_rebalance(
+    lots: Sequence[Lot],
+    prices: Mapping[str, float],
+    target: Mapping[str, float],
+    as_of: date,
+    loss_sales: Set[str],
+    turnover_limit: float,
+    short_term_rate: float,
+    long_term_rate: float,
+    long_term_days: int = 365,
+    wash_sale_days: int = 30,
+    min_trade_value: float = 0.0,
+    cash: float = 0.0
+) -> Dict[str, Any]:
+    """Trades and lot sales moving ``lots`` (plus ``cash``) toward ``target`` weights"""
+    symbols = sorted({lot[1] for lot in lots} | set(target))
+    missing = [symbol for symbol in symbols if symbol not in prices]
+    if missing:
+        raise ValueError(f"No price for {', '.join(missing)}")
+    n = len(symbols)
+    price = np.array([prices[symbol] for symbol in symbols], dtype=float)
+    weights = np.array([target.get(symbol, 0.0) for symbol in symbols], dtype=float)
+    if weights.sum() <= 0:
+        raise ValueError("Target weights must add up to more than zero")
+    weights /= weights.sum()
+
+    if lots:
+        ids, lot_symbols, quantity, basis, acquired = zip(*lots)
+    else:
+        ids, lot_symbols, quantity, basis, acquired = (), (), (), (), ()
+    ids = np.array(ids, dtype=np.int64)
+    symbol_of = np.searchsorted(np.array(symbols), np.array(lot_symbols, dtype=str)).astype(np.int64)
+    quantity = np.array(quantity, dtype=float)
+    basis = np.array(basis, dtype=float)
+    days_held = (np.datetime64(as_of, "D") - np.array(acquired, dtype="datetime64[D]")).astype(np.int64)
+    lot_price = price[symbol_of]
+    lot_value = quantity * lot_price
+
+    holdings = np.bincount(symbol_of, weights=lot_value, minlength=n)
+    total = float(holdings.sum() + cash)
+    target_value = weights * total
+    excess = np.maximum(holdings - target_value, 0.0)
+    deficit = np.maximum(target_value - holdings, 0.0)
+    excess[excess < min_trade_value] = 0.0
+
+    # Score lots by tax per dollar sold; losses in recently bought symbols would be wash sales
+    long_term = days_held > long_term_days
+    gain_per_share = lot_price - basis
+    score = np.where(long_term, long_term_rate, short_term_rate) * gain_per_share / lot_price
+    recently_bought = np.bincount(symbol_of, weights=days_held <= wash_sale_days, minlength=n) > 0
+    blocked = (gain_per_share < 0) & recently_bought[symbol_of]
+    available = np.where(blocked, 0.0, lot_value)
+
+    # Only what can be sold without a wash sale counts against the turnover limit
+    sellable = np.minimum(excess, np.bincount(symbol_of, weights=available, minlength=n))
+    wash_sells = excess - sellable
+    excess = sellable.copy()
+    max_sell = turnover_limit * total
+    if excess.sum() > max_sell:
+        excess *= max_sell / excess.sum()
+
+    order = np.lexsort((score, symbol_of))
+    ordered_symbol = symbol_of[order]
+    ordered_value = available[order]
+    running = np.cumsum(ordered_value) - ordered_value
+    group_start = np.zeros(n)
+    present, first = np.unique(ordered_symbol, return_index=True)  # each symbol's first lot in the sorted order
+    group_start[present] = running[first]
+    covered_before = running - group_start[ordered_symbol]
+    sell_value = np.empty_like(lot_value)
+    sell_value[order] = np.clip(excess[ordered_symbol] - covered_before, 0.0, ordered_value)
+    sell_value[sell_value < 0.005] = 0.0  # cumulative-sum rounding, not a trade
+
+    sold = np.flatnonzero(sell_value > 0)
+    sold_quantity = sell_value[sold] / lot_price[sold]
+    gains = sold_quantity * gain_per_share[sold]
+    sold_long = long_term[sold]
+    sold_by_symbol = np.bincount(symbol_of[sold], weights=sell_value[sold], minlength=n)
+
+    # Spend the proceeds (and cash) on the deficits, except symbols still in a wash-sale window
+    wash_buys = np.array([symbol in loss_sales for symbol in symbols]) & (deficit > 0)
+    buyable = np.where(wash_buys, 0.0, deficit)
+    buyable[buyable < min_trade_value] = 0.0
+    budget = float(sold_by_symbol.sum() + cash)
+    buy_value = buyable * min(1.0, budget / buyable.sum()) if buyable.sum() > 0 else buyable
+
+    trades = [
+        {"symbol": symbols[i], "side": "sell", "quantity": float(sold_by_symbol[i] / price[i]), "value": float(sold_by_symbol[i])}
+        for i in np.flatnonzero(sold_by_symbol > 0)
+    ] + [
+        {"symbol": symbols[i], "side": "buy", "quantity": float(buy_value[i] / price[i]), "value": float(buy_value[i])}
+        for i in np.flatnonzero(buy_value > 0)
+    ]
+    short_gain = float(gains[~sold_long].sum())
+    long_gain = float(gains[sold_long].sum())
+    return {
+        "as_of": as_of.isoformat(),
+        "portfolio_value": total,
+        "lots": int(len(ids)),
+        "turnover": float(sold_by_symbol.sum() / total) if total else 0.0,
+        "trades": trades,
+        "lot_sales": [
+            {
+                "lot_id": lot_id,
+                "symbol": symbols[symbol],
+                "quantity": q,
+                "proceeds": proceeds,
+                "gain": gain,
+                "term": "long" if is_long else "short"
+            }
+            for lot_id, symbol, q, proceeds, gain, is_long in zip(
+                ids[sold].tolist(), symbol_of[sold].tolist(), sold_quantity.tolist(),
+                sell_value[sold].tolist(), gains.tolist(), sold_long.tolist()
+            )
+        ],
+        "realized_gain": {"short_term": short_gain, "long_term": long_gain, "total": short_gain + long_gain},
+        "estimated_tax": short_gain * short_term_rate + long_gain * long_term_rate,
+        "deferred": {
+            "turnover_limit": {symbols[i]: float(sellable[i] - excess[i]) for i in np.flatnonzero(sellable - excess > 1e-9)},
+            "wash_sale_sells": {symbols[i]: float(wash_sells[i]) for i in np.flatnonzero(wash_sells > 1e-9)},
+            "wash_sale_buys": {symbols[i]: float(deficit[i]) for i in np.flatnonzero(wash_buys)}
+        },
+        "cash_after": max(budget - float(buy_value.sum()), 0.0)
+    }
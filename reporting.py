@@ -0,0 +1,229 @@
+"""
+Investment report rendering and book-wide batch generation for Financial Advisor AI Copilot
+
+Report rendering is kept free of server state so it can run inside worker
+processes. Batch runs hand every worker the client snapshot and any shared
+market statistics once, through the pool initializer, instead of pickling
+them into each task.
+"""
+
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+def render_investment_report(
+    profile: Dict[str, Any],
+    portfolio: Dict[str, float],
+    metrics: Optional[Dict[str, float]] = None
+) -> str:
+    """Render the plain-text investment report for one client"""
+    report = f"""
+INVESTMENT ADVISORY REPORT
+==========================
+
+Client: {profile['name']}
+Date: {datetime.now().strftime('%Y-%m-%d')}
+
+CLIENT PROFILE
+--------------
+Age: {profile['age']}
+Risk Tolerance: {profile['risk_tolerance'].title()}
+Investment Horizon: {profile['investment_horizon']} years
+Available Capital: ${profile['capital']:,.2f}
+ESG Preference: {'Yes' if profile['esg_preference'] else 'No'}
+
+RECOMMENDED PORTFOLIO ALLOCATION
+--------------------------------
+"""
+
+    for symbol, weight in portfolio.items():
+        report += f"{symbol}: {weight*100:.1f}%\n"
+
+    if metrics is not None:
+        report += f"""
+PORTFOLIO METRICS
+-----------------
+Expected Return: {metrics['expected_return']*100:.2f}%
+Volatility: {metrics['volatility']*100:.2f}%
+Sharpe Ratio: {metrics['sharpe_ratio']:.2f}
+"""
+
+    report += f"""
+
+PORTFOLIO RATIONALE
+-------------------
+This portfolio allocation is designed to match your {profile['risk_tolerance']} risk profile 
+and {profile['investment_horizon']}-year investment horizon. The diversified approach helps
+balance growth potential with risk management.
+
+NEXT STEPS
+----------
+1. Review the proposed allocation
+2. Discuss any concerns or preferences
+3. Implement the investment strategy
+4. Schedule regular portfolio reviews
+
+This report is for informational purposes only and does not constitute investment advice.
+Please consult with a qualified financial advisor before making investment decisions.
+"""
+
+    return report
+
+
+def report_filename(client_name: str) -> str:
+    """File name used for a client's report inside a directory or archive"""
+    safe_name = re.sub(r"[^\w\-.]+", "_", client_name).strip("._") or "client"
+    return f"{safe_name}.txt"
+
+
+def portfolio_metrics(
+    portfolio: Dict[str, float],
+    market_stats: Dict[str, Any]
+) -> Optional[Dict[str, float]]:
+    """Expected return, volatility and Sharpe ratio from shared annualized statistics"""
+    import numpy as np
+
+    index = market_stats["index"]
+    if any(symbol not in index for symbol in portfolio):
+        return None
+
+    positions = [index[symbol] for symbol in portfolio]
+    weights = np.array(list(portfolio.values()), dtype=float)
+    mean = market_stats["mean"][positions]
+    cov = market_stats["cov"][np.ix_(positions, positions)]
+
+    expected_return = float(weights @ mean)
+    volatility = float(np.sqrt(weights @ cov @ weights))
+    sharpe_ratio = expected_return / volatility if volatility > 0 else 0.0
+    return {
+        "expected_return": expected_return,
+        "volatility": volatility,
+        "sharpe_ratio": sharpe_ratio
+    }
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    """Start workers without forking the multi-threaded server process"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+# Per-process state installed by the pool initializer
+_worker_context: Dict[str, Any] = {}
+
+
+def _init_worker(context: Dict[str, Any]) -> None:
+    """Receive the shared batch context once per worker process"""
+    global _worker_context
+    _worker_context = context
+
+
+def _render_one(client_name: str) -> Dict[str, Any]:
+    """Render (and, in directory mode, write) the report for one client"""
+    started = time.perf_counter()
+    context = _worker_context
+    portfolio = context["portfolios"][client_name]
+    metrics = None
+    if context["market_stats"] is not None:
+        metrics = portfolio_metrics(portfolio, context["market_stats"])
+
+    report = render_investment_report(context["profiles"][client_name], portfolio, metrics)
+    filename = report_filename(client_name)
+
+    result = {"client": client_name, "filename": filename}
+    if context["output_dir"] is not None:
+        path = os.path.join(context["output_dir"], filename)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(report)
+        result["path"] = path
+    else:
+        result["report"] = report
+
+    result["latency"] = time.perf_counter() - started
+    return result
+
+
+def generate_reports(
+    profiles: Dict[str, Dict[str, Any]],
+    portfolios: Dict[str, Dict[str, float]],
+    output_dir: str,
+    archive: bool = False,
+    market_stats: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """Fan report generation out across a process pool
+
+    Reports are written to ``output_dir`` (or appended to
+    ``output_dir/reports.zip`` when ``archive`` is set) as each worker
+    finishes. Returns throughput and per-report latency percentiles.
+    Reports not yet started are dropped if the tool call is cancelled.
+    """
+    from cancellation import CallCancelled, checkpoint
+
+    os.makedirs(output_dir, exist_ok=True)
+    clients = [name for name in profiles if name in portfolios]
+    context = {
+        "profiles": {name: profiles[name] for name in clients},
+        "portfolios": {name: portfolios[name] for name in clients},
+        "market_stats": market_stats,
+        "output_dir": None if archive else output_dir
+    }
+
+    archive_path = os.path.join(output_dir, "reports.zip") if archive else None
+    bundle = zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) if archive else None
+    latencies: List[float] = []
+    errors: Dict[str, str] = {}
+
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=_pool_context(),
+            initializer=_init_worker,
+            initargs=(context,)
+        ) as pool:
+            futures = {pool.submit(_render_one, name): name for name in clients}
+            for future in as_completed(futures):
+                try:
+                    checkpoint()
+                except CallCancelled:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors[futures[future]] = str(e)
+                    continue
+                if bundle is not None:
+                    bundle.writestr(result["filename"], result["report"])
+                latencies.append(result["latency"])
+    finally:
+        if bundle is not None:
+            bundle.close()
+    elapsed = time.perf_counter() - started
+
+    summary = {
+        "reports_written": len(latencies),
+        "failed": errors,
+        "output": archive_path or output_dir,
+        "elapsed_seconds": elapsed,
+        "reports_per_second": len(latencies) / elapsed if elapsed > 0 else 0.0
+    }
+    if latencies:
+        import numpy as np
+
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        summary["latency_ms"] = {
+            "p50": float(p50) * 1000,
+            "p90": float(p90) * 1000,
+            "p99": float(p99) * 1000,
+            "max": max(latencies) * 1000
+        }
+    return summary
@@ -0,0 +1,99 @@
+"""
+Compact response formatting for Financial Advisor AI Copilot
+
+Tools accept ``response_format="compact"`` to get a smaller payload
+instead of the default nested JSON. In compact form:
+- mappings and lists of records become parallel arrays
+  (``{"symbols": [...], "weights": [...]}``);
+- floats keep ``precision`` significant digits, and NaN or infinite values
+  become null;
+- inputs are not echoed back;
+- the text content is encoded once, without indentation.
+
+Large result sets are paged with ``offset``/``limit``, and the response
+carries ``next_offset`` while more results remain.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pydantic_core
+from mcp.types import CallToolResult, TextContent
+
+from metrics import stage
+
+RESPONSE_FORMATS = ("json", "compact")
+
+
+def check_format(response_format: str) -> bool:
+    """Validate ``response_format`` and return whether it is compact"""
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"response_format must be one of {', '.join(RESPONSE_FORMATS)}")
+    return response_format == "compact"
+
+
+def round_floats(value: Any, precision: int) -> Any:
+    """Round every float in a nested structure to ``precision`` significant digits; non-finite floats become None"""
+    if type(value) is float:
+        return float(f"{value:.{precision}g}") if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: round_floats(item, precision) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return _round_list(value, precision)
+    return value
+
+
+def _round_list(values: Sequence[Any], precision: int) -> List[Any]:
+    # Flat columns are the bulk of large payloads; handle scalars inline instead of recursing
+    rounded = []
+    append = rounded.append
+    isfinite = math.isfinite
+    spec = f".{precision}g"
+    for value in values:
+        kind = type(value)
+        if kind is float:
+            append(float(format(value, spec)) if isfinite(value) else None)
+        elif kind is str or kind is int or value is None:
+            append(value)
+        else:
+            append(round_floats(value, precision))
+    return rounded
+
+
+def mapping_columns(
+    mapping: Dict[str, Any],
+    key_name: str = "symbols",
+    value_name: str = "weights",
+    precision: int = 6
+) -> Dict[str, List[Any]]:
+    """``{"VTI": 0.6, "BND": 0.4}`` as ``{"symbols": ["VTI", "BND"], "weights": [0.6, 0.4]}``"""
+    return {key_name: list(mapping), value_name: round_floats(list(mapping.values()), precision)}
+
+
+def record_columns(
+    records: Sequence[Dict[str, Any]],
+    fields: Optional[Iterable[str]] = None,
+    precision: int = 6
+) -> Dict[str, List[Any]]:
+    """A list of records as one array per field"""
+    if fields is None:
+        fields = list(records[0]) if records else []
+    return {field: round_floats([record.get(field) for record in records], precision) for field in fields}
+
+
+def page(items: Sequence[Any], offset: int = 0, limit: Optional[int] = None) -> Tuple[Sequence[Any], Dict[str, Any]]:
+    """One page of ``items`` and its paging fields"""
+    if offset < 0 or (limit is not None and limit < 1):
+        raise ValueError("offset must be >= 0 and limit >= 1")
+    end = len(items) if limit is None else min(len(items), offset + limit)
+    paging = {"offset": offset, "total": len(items)}
+    if end < len(items):
+        paging["next_offset"] = end
+    return items[offset:end], paging
+
+
+def compact(payload: Dict[str, Any]) -> CallToolResult:
+    """Tool result whose text content is the payload encoded once, without whitespace"""
+    with stage("serialization"):
+        text = pydantic_core.to_json(payload, fallback=str).decode()
+    return CallToolResult(content=[TextContent(type="text", text=text)], structuredContent={"result": payload})
@@ -0,0 +1,142 @@
+"""
+Tool-result memoization for Financial Advisor AI Copilot
+
+Many calls are exact repeats: the same portfolio backtested over the same
+dates, or the same client rebuilt before any new prices arrive. Tools
+registered with ``memoize`` keep their finished MCP results, already
+serialized, in an in-process LRU cache. A repeat skips fetching,
+computation and serialization.
+
+The key combines
+- the tool name;
+- its arguments, with defaults filled in and encoded canonically;
+- the market data version (``market_data.data_version``);
+- for tools that also read other state, a ``depends_on`` stamp such as the
+  client profile.
+
+When a new bar lands the version changes, so older entries are never
+looked up again and age out of the LRU. Hits still count as calls of
+their tool in the latency and call metrics. Only successful results are
+cached. The cache is bounded by entry count and by the size of the
+serialized content, and each server process keeps its own.
+"""
+
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config import config
+from market_data import data_version
+from metrics import MeteredFastMCP, cache_request, record_cached_call
+
+DependsOn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def result_key(name: str, arguments: Dict[str, Any], version: str, dependency: Any = None) -> str:
+    """Canonical cache key for one call"""
+    return json.dumps([name, arguments, version, dependency], sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _content(result: Any) -> Tuple[Any, Any]:
+    """(content blocks, structured content) of a converted tool result"""
+    if isinstance(result, tuple):
+        return result
+    return result.content, result.structuredContent
+
+
+def _is_success(result: Any) -> bool:
+    payload = (_content(result)[1] or {}).get("result")
+    return isinstance(payload, dict) and payload.get("status") == "success"
+
+
+def _size(result: Any) -> int:
+    """Approximate memory held by a result: its text, once as content and once as structured data"""
+    return 2 * sum(len(getattr(block, "text", "")) for block in _content(result)[0])
+
+
+class ResultCache:
+    """LRU cache of converted tool results, bounded by entries and bytes"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, result: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (result, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class MemoizedFastMCP(MeteredFastMCP):
+    """Metered FastMCP server that answers repeated calls of memoized tools from ``results``"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.results = ResultCache(config.result_cache.max_entries, config.result_cache.max_bytes)
+        self._memoized: Dict[str, Tuple[inspect.Signature, Optional[DependsOn]]] = {}
+
+    def memoize(self, fn: Callable, depends_on: Optional[DependsOn] = None) -> None:
+        """Cache results of the tool registered as ``fn.__name__``
+
+        ``depends_on`` receives the call's arguments and returns a stamp of
+        any non-market state the result depends on.
+        """
+        self._memoized[fn.__name__] = (inspect.signature(fn), depends_on)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        policy = self._memoized.get(name)
+        if policy is None or not config.result_cache.enabled:
+            return await super().call_tool(name, arguments)
+
+        signature, depends_on = policy
+        started = time.perf_counter()
+        try:
+            bound = signature.bind(**arguments)
+            version = data_version()
+        except (TypeError, RuntimeError):
+            # Invalid arguments or no market data: let the tool report it
+            return await super().call_tool(name, arguments)
+        bound.apply_defaults()
+        dependency = await depends_on(bound.arguments) if depends_on is not None else None
+        key = result_key(name, bound.arguments, version, dependency)
+
+        cached = self.results.get(key)
+        if cached is not None:
+            cache_request("results", "hit")
+            record_cached_call(name, time.perf_counter() - started)
+            return cached
+        cache_request("results", "miss")
+        result = await super().call_tool(name, arguments)
+        if _is_success(result):
+            self.results.put(key, result, _size(result))
+        return result
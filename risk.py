@@ -0,0 +1,175 @@
+"""
+Value at Risk and Conditional Value at Risk for Financial Advisor AI Copilot
+
+Every method evaluates a whole batch of portfolios at once. The portfolios
+are a P x N weight matrix over the N symbols of a T x N daily returns
+panel:
+
+- historical: one product ``returns @ weights.T`` gives every portfolio's
+  daily returns. Overlapping h-day returns are compounded from cumulative
+  log returns. Each confidence level's tail is then found with a single
+  ``np.partition`` per horizon, so no portfolio is sorted or looped over.
+- parametric: normal returns with the panel's mean and covariance, scaled
+  to the horizon.
+- monte_carlo: correlated normal daily paths, compounded per asset (buy
+  and hold over the horizon), and valued for every portfolio with one
+  product per horizon. Paths are drawn in chunks of simulations so only
+  the simulations x horizons x portfolios values are kept, never every
+  asset's path.
+
+Losses are positive fractions of portfolio value. VaR at confidence c is
+the loss exceeded on a (1 - c) share of outcomes, and CVaR is the mean loss
+over that share.
+"""
+
+from statistics import NormalDist
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+METHODS = ("historical", "parametric", "monte_carlo")
+MAX_CHUNK_VALUES = 1 << 22  # simulated asset returns held at once (32 MB)
+
+
+def weight_matrix(portfolios: Iterable[Mapping[str, float]], symbols: Sequence[str]) -> np.ndarray:
+    """P x N weights of ``portfolios`` over ``symbols``"""
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    portfolios = list(portfolios)
+    weights = np.zeros((len(portfolios), len(symbols)))
+    for row, portfolio in enumerate(portfolios):
+        missing = [symbol for symbol in portfolio if symbol not in index]
+        if missing:
+            raise ValueError(f"No price history for {', '.join(missing)}")
+        weights[row, [index[symbol] for symbol in portfolio]] = list(portfolio.values())
+    return weights
+
+
+def distinct_weights(portfolios: Iterable[Mapping[str, float]], symbols: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """U x N weights of the distinct portfolios, and each input portfolio's row among them
+
+    Client books repeat a handful of model allocations, so risk is computed
+    once per allocation rather than once per client.
+    """
+    rows: Dict[Tuple[Tuple[str, float], ...], int] = {}
+    inverse = np.array([rows.setdefault(tuple(portfolio.items()), len(rows)) for portfolio in portfolios], dtype=np.int64)
+    return weight_matrix([dict(key) for key in rows], symbols), inverse
+
+
+def _check(confidence_levels: Sequence[float], horizons: Sequence[int], methods: Sequence[str]) -> None:
+    unknown = [method for method in methods if method not in METHODS]
+    if unknown:
+        raise ValueError(f"Unknown VaR methods {unknown}; use {', '.join(METHODS)}")
+    if not confidence_levels or any(not 0 < c < 1 for c in confidence_levels):
+        raise ValueError("Confidence levels must be between 0 and 1")
+    if not horizons or any(int(h) != h or h < 1 for h in horizons):
+        raise ValueError("Horizons must be whole numbers of trading days, at least 1")
+
+
+def tail_losses(returns: np.ndarray, confidence_levels: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """VaR and CVaR, each C x P, from n x P outcome returns"""
+    losses = -returns
+    n = losses.shape[0]
+    tail = np.maximum(1, np.ceil((1 - np.asarray(confidence_levels)) * n).astype(int))
+    kth = n - tail
+    # One partial sort places every level's cut-off; each tail is everything above its cut-off
+    ordered = np.partition(losses, np.unique(kth), axis=0)
+    var = ordered[kth]
+    cvar = np.stack([ordered[k:].mean(axis=0) for k in kth])
+    return var, cvar
+
+
+def historical(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    confidence_levels: Sequence[float],
+    horizons: Sequence[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """VaR and CVaR, each H x C x P, from overlapping historical h-day returns"""
+    daily = returns @ weights.T
+    log_growth = np.vstack([np.zeros((1, daily.shape[1])), np.cumsum(np.log1p(daily), axis=0)])
+    results = []
+    for horizon in horizons:
+        if horizon >= log_growth.shape[0]:
+            raise ValueError(f"{horizon}-day horizon needs more than {daily.shape[0]} days of returns")
+        period = np.expm1(log_growth[horizon:] - log_growth[:-horizon])
+        results.append(tail_losses(period, confidence_levels))
+    return np.stack([var for var, _ in results]), np.stack([cvar for _, cvar in results])
+
+
+def parametric(
+    mean: np.ndarray,
+    covariance: np.ndarray,
+    weights: np.ndarray,
+    confidence_levels: Sequence[float],
+    horizons: Sequence[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Normal VaR and CVaR, each H x C x P, from daily mean returns and covariance"""
+    normal = NormalDist()
+    mu = weights @ mean
+    sigma = np.sqrt(np.maximum(np.einsum("pi,ij,pj->p", weights, covariance, weights), 0.0))
+    z = np.array([normal.inv_cdf(c) for c in confidence_levels])[:, None]
+    tail_density = np.array([normal.pdf(normal.inv_cdf(c)) / (1 - c) for c in confidence_levels])[:, None]
+    horizons = np.asarray(horizons, dtype=float)[:, None, None]
+    var = z * sigma * np.sqrt(horizons) - mu * horizons
+    cvar = tail_density * sigma * np.sqrt(horizons) - mu * horizons
+    return var, cvar
+
+
+def monte_carlo(
+    mean: np.ndarray,
+    covariance: np.ndarray,
+    weights: np.ndarray,
+    confidence_levels: Sequence[float],
+    horizons: Sequence[int],
+    simulations: int,
+    seed: Optional[int] = None,
+    max_chunk_values: int = MAX_CHUNK_VALUES
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Simulated VaR and CVaR, each H x C x P, from correlated normal daily paths
+
+    Paths are drawn for as many simulations at a time as fit in
+    ``max_chunk_values`` asset returns; each chunk is reduced to portfolio
+    returns before the next is drawn. The draws come from one generator in
+    order, so the result does not depend on the chunk size.
+    """
+    rng = np.random.default_rng(seed)
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    factor = (eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))).T  # factored once, not per chunk
+    days = max(horizons)
+    chunk = max(1, max_chunk_values // (days * mean.size))
+    returns = np.empty((len(horizons), simulations, weights.shape[0]))
+    for start in range(0, simulations, chunk):
+        size = min(chunk, simulations - start)
+        growth = rng.standard_normal((size, days, mean.size)) @ factor
+        growth += 1 + mean
+        np.cumprod(growth, axis=1, out=growth)
+        for i, horizon in enumerate(horizons):
+            returns[i, start:start + size] = growth[:, horizon - 1] @ weights.T - 1
+    results = [tail_losses(horizon_returns, confidence_levels) for horizon_returns in returns]
+    return np.stack([var for var, _ in results]), np.stack([cvar for _, cvar in results])
+
+
+def value_at_risk(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    confidence_levels: Sequence[float],
+    horizons: Sequence[int],
+    methods: Sequence[str] = METHODS,
+    simulations: int = 10000,
+    seed: Optional[int] = None
+) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """VaR and CVaR, each H x C x P, per method, for P portfolios over a T x N returns panel"""
+    _check(confidence_levels, horizons, methods)
+    if returns.shape[0] < 2:
+        raise ValueError("At least two days of returns are needed")
+    tables = {}
+    if "historical" in methods:
+        tables["historical"] = historical(returns, weights, confidence_levels, horizons)
+    if "parametric" in methods or "monte_carlo" in methods:
+        mean = returns.mean(axis=0)
+        covariance = np.cov(returns, rowvar=False).reshape(returns.shape[1], returns.shape[1])
+        if "parametric" in methods:
+            tables["parametric"] = parametric(mean, covariance, weights, confidence_levels, horizons)
+        if "monte_carlo" in methods:
+            tables["monte_carlo"] = monte_carlo(mean, covariance, weights, confidence_levels, horizons, simulations, seed)
+    return {method: tables[method] for method in methods}
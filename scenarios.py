@@ -0,0 +1,105 @@
+"""
+Factor-shock stress scenarios for Financial Advisor AI Copilot
+
+Each market factor (equities, rates, the dollar, ...) has a traded proxy.
+Every symbol's betas to the proxies come from one least-squares fit of its
+daily returns on the proxies' returns. A shock scenario, such as rates
++200bp and equities -20%, becomes a vector of proxy returns. For P
+portfolios (weights W, P x N), N symbols (betas B, N x K) and S scenarios
+(proxy returns F, S x K), every portfolio's return under every scenario
+is ``W @ B @ F.T``.
+
+This is the usual first-order view: symbols move with the proxies in
+proportion to their betas. Residual risk and non-linear payoffs are left
+out.
+
+Betas are cached per symbol with the provider they were estimated from.
+The warm-up precomputes them for the warm universes, so most stress tests
+never touch price history.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+MIN_OBSERVATIONS = 60  # days of overlapping history a symbol needs for its betas
+
+
+def estimate_betas(returns: np.ndarray, factor_returns: np.ndarray) -> np.ndarray:
+    """N x K betas, with an intercept, of T x N returns on T x K factor returns
+
+    Symbols with gaps are fitted on their own days; those with fewer than
+    ``MIN_OBSERVATIONS`` get NaN betas.
+    """
+    n_days, n_symbols = returns.shape
+    design = np.column_stack([np.ones(n_days), factor_returns])
+    betas = np.full((n_symbols, factor_returns.shape[1]), np.nan)
+    complete = ~np.isnan(returns).any(axis=0)
+    if complete.any() and n_days >= MIN_OBSERVATIONS:
+        # Symbols with full history share the design matrix: one solve for all of them
+        coefficients, *_ = np.linalg.lstsq(design, returns[:, complete], rcond=None)
+        betas[complete] = coefficients[1:].T
+    for column in np.flatnonzero(~complete):
+        days = ~np.isnan(returns[:, column])
+        if days.sum() >= MIN_OBSERVATIONS:
+            coefficients, *_ = np.linalg.lstsq(design[days], returns[days, column], rcond=None)
+            betas[column] = coefficients[1:]
+    return betas
+
+
+def shock_matrix(
+    scenarios: Mapping[str, Mapping[str, float]],
+    factors: Sequence[str],
+    return_per_unit: Sequence[float]
+) -> np.ndarray:
+    """S x K proxy returns for scenarios given as factor shocks in each factor's units"""
+    index = {factor: i for i, factor in enumerate(factors)}
+    shocks = np.zeros((len(scenarios), len(factors)))
+    for row, (name, scenario) in enumerate(scenarios.items()):
+        unknown = [factor for factor in scenario if factor not in index]
+        if unknown:
+            raise ValueError(f"Scenario {name} shocks unknown factors {unknown}; use {', '.join(factors)}")
+        for factor, size in scenario.items():
+            shocks[row, index[factor]] = size * return_per_unit[index[factor]]
+    return shocks
+
+
+def scenario_returns(weights: np.ndarray, betas: np.ndarray, shocks: np.ndarray) -> np.ndarray:
+    """P x S portfolio returns of P x N weights under S x K proxy shocks, given N x K betas"""
+    return weights @ (betas @ shocks.T)
+
+
+class BetaCache:
+    """Factor betas per symbol, with the provider and time they were estimated"""
+
+    def __init__(self):
+        self._betas: Dict[str, Tuple[str, float, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, symbols: Iterable[str], provider: str, max_age_seconds: float) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """Fresh betas from ``provider`` for ``symbols``, and the symbols that need estimating"""
+        found, missing = {}, []
+        now = time.time()
+        with self._lock:
+            for symbol in symbols:
+                entry = self._betas.get(symbol)
+                if entry is not None and entry[0] == provider and now - entry[1] <= max_age_seconds:
+                    found[symbol] = entry[2]
+                else:
+                    missing.append(symbol)
+        return found, missing
+
+    def store(self, betas: Mapping[str, np.ndarray], provider: str) -> None:
+        now = time.time()
+        with self._lock:
+            for symbol, beta in betas.items():
+                self._betas[symbol] = (provider, now, beta)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._betas.clear()
+
+    def __len__(self) -> int:
+        return len(self._betas)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Startup import-cost report for Financial Advisor AI Copilot
+
+Imports a module in a fresh interpreter with ``-X importtime`` and
+summarizes where the time goes, grouped by top-level package. Use it to
+check that heavy stacks (pandas, numpy, scipy, yfinance) stay out of the
+server's cold start.
+
+Usage:
+    python startup.py [module] [--top N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List
+
+HEAVY_PACKAGES = ("numpy", "pandas", "scipy", "yfinance", "matplotlib", "reportlab")
+
+
+def measure_import_costs(module: str = "main", top: int = 20) -> Dict[str, Any]:
+    """Import ``module`` in a subprocess and report import time per top-level package"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    self_us: Dict[str, int] = defaultdict(int)
+    total_us = 0
+    modules = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            own = int(fields[0])
+        except ValueError:
+            continue  # header line
+        name = fields[2].strip()
+        self_us[name.split(".")[0]] += own
+        total_us += own
+        modules += 1
+
+    packages: List[Dict[str, Any]] = [
+        {"package": package, "ms": us / 1000, "share": us / total_us if total_us else 0.0}
+        for package, us in sorted(self_us.items(), key=lambda item: item[1], reverse=True)
+    ]
+    return {
+        "module": module,
+        "total_ms": total_us / 1000,
+        "modules_imported": modules,
+        "heavy_packages_loaded": [package for package in HEAVY_PACKAGES if package in self_us],
+        "packages": packages[:top]
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report import cost per package")
+    parser.add_argument("module", nargs="?", default="main", help="module to import (default: main)")
+    parser.add_argument("--top", type=int, default=20, help="number of packages to list")
+    args = parser.parse_args()
+
+    report = measure_import_costs(args.module, args.top)
+    print(f"⏱️  Importing {report['module']}: {report['total_ms']:.1f} ms across {report['modules_imported']} modules")
+    print("-" * 50)
+    for entry in report["packages"]:
+        print(f"{entry['package']:<30} {entry['ms']:>9.1f} ms {entry['share']*100:>5.1f}%")
+    print("-" * 50)
+    heavy = report["heavy_packages_loaded"]
+    print(f"Heavy packages loaded at import: {', '.join(heavy) if heavy else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Persistent client profile store for Financial Advisor AI Copilot
+
+Profiles live in a SQLite database in WAL mode so several server processes
+can share one book: readers never block each other or the writer, and
+batched writes commit in a single transaction. The store behaves like the
+``Dict[str, ClientProfile]`` it replaces and adds indexed queries on risk
+tolerance and investment horizon.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    name TEXT PRIMARY KEY,
+    risk_tolerance TEXT NOT NULL,
+    investment_horizon INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_clients_risk_tolerance ON clients (risk_tolerance);
+CREATE INDEX IF NOT EXISTS idx_clients_horizon ON clients (investment_horizon);
+CREATE INDEX IF NOT EXISTS idx_clients_risk_horizon ON clients (risk_tolerance, investment_horizon);
+"""
+
+
+# Change counters that let each server process tell whether another one
+# has written since it last loaded something into memory
+_VERSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteStore:
+    """Shared WAL database connections for one schema"""
+
+    schema = ""
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    # Connections are per thread and per process so forked workers never
+    # reuse a handle opened by their parent.
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.executescript(_VERSIONS_SCHEMA + self.schema)
+                self._schema_ready = True
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Connection inside one write transaction, rolled back if the block raises"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _bump(self, conn: sqlite3.Connection, name: str) -> int:
+        """Advance the ``name`` counter inside the caller's transaction; returns its new value"""
+        conn.execute(
+            "INSERT INTO versions (name, version) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET version = version + 1",
+            (name,)
+        )
+        return conn.execute("SELECT version FROM versions WHERE name = ?", (name,)).fetchone()[0]
+
+    def version(self, name: str) -> int:
+        """How many write transactions have changed ``name``, across every process"""
+        row = self._connection().execute("SELECT version FROM versions WHERE name = ?", (name,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def close(self) -> None:
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class ClientStore(SQLiteStore, MutableMapping):
+    """SQLite-backed mapping of client name to profile model"""
+
+    schema = _SCHEMA
+
+    def __init__(self, path: str, model: Type[BaseModel], busy_timeout_ms: int = 5000):
+        super().__init__(path, busy_timeout_ms)
+        self.model = model
+
+    def _row(self, profile: BaseModel) -> Tuple[str, str, int, str, float]:
+        return (
+            profile.name,
+            profile.risk_tolerance,
+            profile.investment_horizon,
+            profile.model_dump_json(),
+            time.time()
+        )
+
+    def _load(self, data: str) -> BaseModel:
+        return self.model.model_validate_json(data)
+
+    def __getitem__(self, name: str) -> BaseModel:
+        row = self._connection().execute(
+            "SELECT data FROM clients WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return self._load(row[0])
+
+    def __setitem__(self, name: str, profile: BaseModel) -> None:
+        if profile.name != name:
+            profile = profile.model_copy(update={"name": name})
+        self.put_many([profile])
+
+    def __delitem__(self, name: str) -> None:
+        with self._transaction() as conn:
+            if conn.execute("DELETE FROM clients WHERE name = ?", (name,)).rowcount == 0:
+                raise KeyError(name)
+            self._bump(conn, "clients")
+
+    def __contains__(self, name: object) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM clients WHERE name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        cursor = self._connection().execute("SELECT name FROM clients ORDER BY name")
+        for (name,) in cursor:
+            yield name
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM clients").fetchone()[0]
+
+    def items(self) -> Iterator[Tuple[str, BaseModel]]:
+        """Stream (name, profile) pairs with a single query"""
+        cursor = self._connection().execute("SELECT name, data FROM clients ORDER BY name")
+        for name, data in cursor:
+            yield name, self._load(data)
+
+    def values(self) -> Iterator[BaseModel]:
+        for _, profile in self.items():
+            yield profile
+
+    def put_many(self, profiles: Iterable[BaseModel]) -> int:
+        """Insert or replace profiles in one transaction"""
+        rows = [self._row(profile) for profile in profiles]
+        if not rows:
+            return 0
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO clients "
+                "(name, risk_tolerance, investment_horizon, data, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._bump(conn, "clients")
+        return len(rows)
+
+    def iter_query(
+        self,
+        risk_tolerance: Optional[str] = None,
+        min_horizon: Optional[int] = None,
+        max_horizon: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> Iterator[BaseModel]:
+        """Stream profiles through the name, risk tolerance and horizon indexes"""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if risk_tolerance is not None:
+            clauses.append("risk_tolerance = ?")
+            params.append(risk_tolerance)
+        if min_horizon is not None:
+            clauses.append("investment_horizon >= ?")
+            params.append(min_horizon)
+        if max_horizon is not None:
+            clauses.append("investment_horizon <= ?")
+            params.append(max_horizon)
+        if name_prefix:
+            # Range scan on the primary key instead of LIKE, which cannot use it
+            clauses.append("name >= ? AND name < ?")
+            params.extend([name_prefix, name_prefix + "\U0010ffff"])
+
+        sql = "SELECT data FROM clients"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY name LIMIT ? OFFSET ?"
+        params.extend([-1 if limit is None else limit, offset])
+
+        for (data,) in self._connection().execute(sql, params):
+            yield self._load(data)
+
+    def query(self, **filters: Any) -> List[BaseModel]:
+        """Look up profiles matching the ``iter_query`` filters"""
+        return list(self.iter_query(**filters))
+
+    def counts_by_risk(self) -> Dict[str, int]:
+        """Number of clients per risk tolerance level"""
+        cursor = self._connection().execute(
+            "SELECT risk_tolerance, COUNT(*) FROM clients GROUP BY risk_tolerance"
+        )
+        return dict(cursor.fetchall())
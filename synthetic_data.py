@@ -0,0 +1,240 @@
+"""
+Synthetic market data for Financial Advisor AI Copilot
+
+Generates realistic daily price histories with no network access, for load
+testing and benchmarking on air-gapped machines. Returns follow a
+multi-factor geometric Brownian motion: a few market factors are drawn once
+for the whole calendar, and each symbol combines them with its own loadings
+and idiosyncratic noise. Symbols are therefore correlated while each one is
+still generated on its own, on first request.
+
+Optional realism:
+- fat tails: shocks are Student-t with ``fat_tail_df`` degrees of freedom,
+  scaled to unit variance;
+- regimes: a two-state Markov chain switches the whole market between calm
+  and stressed periods with higher volatility and lower drift;
+- dividends: quarterly cash dividends make Close drop on ex-dates, while
+  Adj Close is back-adjusted like Yahoo's and follows total return.
+
+Everything derives from ``seed`` and the symbol name, and is anchored at
+``origin``, so a symbol has the same prices on every run and in every
+window.
+"""
+
+import re
+import threading
+import zlib
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+    from config import SyntheticDataConfig
+
+SECTORS = (
+    "Technology", "Healthcare", "Financial Services", "Consumer Cyclical", "Industrials",
+    "Energy", "Utilities", "Real Estate", "Communication Services", "Basic Materials"
+)
+QUOTE_TYPES = ("EQUITY", "ETF", "MUTUALFUND")
+QUOTE_TYPE_WEIGHTS = (0.8, 0.15, 0.05)
+
+_PERIOD = re.compile(r"(\d+)(d|wk|mo|y)")
+_PERIOD_DAYS = {"d": 1, "wk": 7, "mo": 30, "y": 365}
+
+
+class SyntheticProvider:
+    """Seeded correlated price histories, one symbol at a time"""
+
+    def __init__(
+        self,
+        seed: int = 42,
+        origin: str = "1990-01-01",
+        as_of: Optional[str] = None,
+        factors: int = 3,
+        fat_tail_df: Optional[float] = 5.0,
+        regimes: bool = True,
+        stress_entry_probability: float = 0.01,
+        stress_exit_probability: float = 0.05,
+        stress_volatility_multiplier: float = 2.5,
+        dividends: bool = True
+    ):
+        self.seed = seed
+        self.origin = origin
+        self.as_of = as_of
+        self.factors = factors
+        self.fat_tail_df = fat_tail_df
+        self.regimes = regimes
+        self.stress_entry_probability = stress_entry_probability
+        self.stress_exit_probability = stress_exit_probability
+        self.stress_volatility_multiplier = stress_volatility_multiplier
+        self.dividends = dividends
+        self._market: Optional[Dict[str, "np.ndarray"]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, settings: "SyntheticDataConfig") -> "SyntheticProvider":
+        return cls(**settings.model_dump())
+
+    def version(self) -> str:
+        """Changes only when the generated calendar would gain a day"""
+        return f"{self.seed}:{self.as_of or date.today().isoformat()}"
+
+    def _shocks(self, rng: "np.random.Generator", size: Any) -> "np.ndarray":
+        """Unit-variance shocks, Student-t when fat tails are enabled"""
+        import numpy as np
+
+        if self.fat_tail_df is None:
+            return rng.standard_normal(size)
+        df = self.fat_tail_df
+        return rng.standard_t(df, size) * np.sqrt((df - 2) / df)
+
+    def _market_state(self) -> Dict[str, "np.ndarray"]:
+        """Calendar, regime path and factor returns shared by every symbol"""
+        import numpy as np
+
+        if self._market is not None:
+            return self._market
+        with self._lock:
+            if self._market is not None:
+                return self._market
+            last = np.datetime64(self.as_of or date.today().isoformat(), "D")
+            days = np.arange(np.datetime64(self.origin, "D"), last + np.timedelta64(1, "D"))
+            days = days[np.is_busday(days)]
+            n_days = len(days)
+            rng = np.random.default_rng([self.seed, 0])
+
+            stressed = np.zeros(n_days, dtype=bool)
+            if self.regimes:
+                draws = rng.random(n_days)
+                state = False
+                for t in range(n_days):
+                    if state:
+                        state = draws[t] >= self.stress_exit_probability
+                    else:
+                        state = draws[t] < self.stress_entry_probability
+                    stressed[t] = state
+
+            months = days.astype("datetime64[M]")
+            # First trading day of each quarter's second month is the dividend ex-date
+            first_of_month = np.r_[True, months[1:] != months[:-1]]
+            ex_dates = first_of_month & (months.astype(int) % 3 == 1)
+
+            volatility_scale = np.where(stressed, self.stress_volatility_multiplier, 1.0)
+            factor_returns = self._shocks(rng, (n_days, self.factors)) * 0.008 * volatility_scale[:, None]
+            factor_returns[:, 0] += np.where(stressed, -0.001, 0.0003)  # market factor drift by regime
+            self._market = {
+                "days": days,
+                "stressed": stressed,
+                "volatility_scale": volatility_scale,
+                "factor_returns": factor_returns,
+                "ex_dates": ex_dates
+            }
+            return self._market
+
+    def _symbol_rng(self, symbol: str) -> "np.random.Generator":
+        import numpy as np
+
+        return np.random.default_rng([self.seed, 1, zlib.crc32(symbol.encode("utf-8"))])
+
+    def _generate(self, symbol: str) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Full-calendar (dates, close, adjusted close) for one symbol"""
+        import numpy as np
+
+        market = self._market_state()
+        rng = self._symbol_rng(symbol)
+        loadings = np.concatenate([[rng.uniform(0.5, 1.4)], rng.normal(0.0, 0.5, self.factors - 1)])
+        idiosyncratic_vol = rng.uniform(0.006, 0.02)
+        dividend_yield = rng.uniform(0.0, 0.04) if self.dividends else 0.0
+
+        log_returns = market["factor_returns"] @ loadings
+        log_returns += self._shocks(rng, len(market["days"])) * idiosyncratic_vol * market["volatility_scale"]
+        log_returns += 0.0001 - 0.5 * idiosyncratic_vol ** 2
+        total_return = rng.uniform(10, 400) * np.exp(np.cumsum(log_returns))
+
+        close = total_return
+        if dividend_yield > 0:
+            close = total_return * np.cumprod(np.where(market["ex_dates"], 1 - dividend_yield / 4, 1.0))
+        adjusted = total_return * (close[-1] / total_return[-1])
+        return market["days"], close, adjusted
+
+    def _window(
+        self,
+        days: "np.ndarray",
+        period: Optional[str],
+        start: Optional[str],
+        end: Optional[str]
+    ) -> "np.ndarray":
+        import numpy as np
+
+        if start is not None:
+            mask = days >= np.datetime64(start, "D")
+            if end is not None:
+                mask &= days < np.datetime64(end, "D")  # end is exclusive, as with yfinance
+            return mask
+        match = _PERIOD.fullmatch(period or "1y")
+        if match is None:  # "max"
+            return np.ones(len(days), dtype=bool)
+        span = int(match.group(1)) * _PERIOD_DAYS[match.group(2)]
+        return days > days[-1] - np.timedelta64(span, "D")
+
+    def history(
+        self,
+        symbol: str,
+        period: Optional[str],
+        start: Optional[str],
+        end: Optional[str]
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Daily adjusted close for one symbol, as (dates, prices) arrays"""
+        days, _, adjusted = self._generate(symbol)
+        window = self._window(days, period, start, end)
+        return days[window], adjusted[window]
+
+    def snapshot(self, symbol: str, period: str) -> Optional[Dict[str, Any]]:
+        """Latest price, change over ``period``, volume and synthetic fundamentals"""
+        days, close, _ = self._generate(symbol)
+        window = self._window(days, period, None, None)
+        prices = close[window]
+        if not len(prices):
+            return None
+        rng = self._symbol_rng(symbol)
+        shares = rng.uniform(5e7, 5e9)
+        volume = int(shares * rng.uniform(0.002, 0.02))
+        sector = SECTORS[int(rng.integers(len(SECTORS)))]
+        pe_ratio = float(rng.uniform(8, 45))
+        quote_type = QUOTE_TYPES[int(rng.choice(len(QUOTE_TYPES), p=QUOTE_TYPE_WEIGHTS))]
+        fund = quote_type != "EQUITY"  # a fund's drawn sector is its category
+        return {
+            "current_price": float(prices[-1]),
+            "price_change_pct": float((prices[-1] - prices[0]) / prices[0] * 100),
+            "volume": volume,
+            "market_cap": int(shares * prices[-1]),
+            "sector": "N/A" if fund else sector,
+            "pe_ratio": pe_ratio,
+            "quote_type": quote_type,
+            "category": sector if fund else "N/A"
+        }
+
+    def download(
+        self,
+        symbols: List[str],
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> "pd.DataFrame":
+        """Date x symbol adjusted close panel, shaped like ``yf.download(...)['Adj Close']``"""
+        import numpy as np
+        import pandas as pd
+
+        # Every symbol shares the calendar, so columns are stacked without aligning indexes
+        days = self._market_state()["days"]
+        window = self._window(days, period, start, end)
+        values = np.empty((int(window.sum()), len(symbols)))
+        for i, symbol in enumerate(symbols):
+            values[:, i] = self._generate(symbol)[2][window]
+        return pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(days[window], name="Date"),
+            columns=pd.Index(symbols, name="Ticker")
+        )
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for admission control and per-class concurrency limits
+"""
+
+import asyncio
+
+import admission
+from admission import AdmissionGate, AdmissionRejected, admitted
+from config import ToolClassConfig, config
+
+
+def test_queue_is_served_round_robin_across_sessions():
+    """Test a session with many queued calls cannot starve another session's call"""
+    gate = AdmissionGate("heavy", ToolClassConfig(max_concurrent=1, max_queue=3))
+    order = []
+
+    async def call(session, label, hold):
+        await gate.acquire(session)
+        order.append(label)
+        await hold.wait()
+        gate.release(0.5)
+
+    async def scenario():
+        hold = asyncio.Event()
+        tasks = [asyncio.create_task(call("A", "A1", hold))]
+        await asyncio.sleep(0)
+        for session, label in (("A", "A2"), ("A", "A3"), ("B", "B1")):
+            tasks.append(asyncio.create_task(call(session, label, hold)))
+            await asyncio.sleep(0)
+        assert gate.active == 1 and gate.queued == 3
+
+        try:
+            await gate.acquire("C")
+            assert False, "queue should be full"
+        except AdmissionRejected as e:
+            assert e.retry_after_seconds >= 1.0
+
+        hold.set()
+        await asyncio.gather(*tasks)
+        assert gate.active == 0 and gate.queued == 0
+
+    asyncio.run(scenario())
+    assert order == ["A1", "A2", "B1", "A3"]
+    print(f"✅ Admission order {order}")
+
+
+def test_full_class_rejects_with_retry_hint_and_spares_other_classes():
+    """Test a saturated class rejects fast, cancelled waiters leave the queue, and other classes still run"""
+    saved = config.admission.classes["heavy"]
+    config.admission.classes["heavy"] = ToolClassConfig(max_concurrent=1, max_queue=1, retry_after_seconds=3.0)
+    admission._gates.pop("heavy", None)
+    release = asyncio.Event()
+
+    async def backtest_portfolio():
+        await release.wait()
+        return {"status": "success"}
+
+    async def create_client_profile():
+        return {"status": "success"}
+
+    backtest = admitted(backtest_portfolio)
+    create = admitted(create_client_profile)
+
+    async def scenario():
+        running = asyncio.create_task(backtest())
+        queued = asyncio.create_task(backtest())
+        await asyncio.sleep(0)
+        rejected = await backtest()
+        assert await asyncio.wait_for(create(), 1.0) == {"status": "success"}
+
+        queued.cancel()
+        await asyncio.sleep(0)
+        assert admission.gate("heavy").queued == 0
+        release.set()
+        assert await running == {"status": "success"}
+        assert admission.gate("heavy").active == 0
+        return rejected
+
+    try:
+        rejected = asyncio.run(scenario())
+    finally:
+        config.admission.classes["heavy"] = saved
+        admission._gates.pop("heavy", None)
+    assert rejected["status"] == "error" and rejected["retry_after_seconds"] >= 3.0
+    assert "retry after" in rejected["message"]
+    print(f"✅ Rejected with retry hint: {rejected['message']}")
+
+
+if __name__ == "__main__":
+    test_queue_is_served_round_robin_across_sessions()
+    test_full_class_rejects_with_retry_hint_and_spares_other_classes()
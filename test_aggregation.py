@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for household and multi-account exposure aggregation
+"""
+
+import numpy as np
+
+from aggregation import ExposureAggregator
+
+
+def _book():
+    accounts = {
+        "ira": {"VTI": 60.0, "BND": 40.0},
+        "brokerage": {"VTI": 50.0, "QQQ": 50.0},
+        "solo": {"BND": 10.0}
+    }
+    households = {"ira": "smith", "brokerage": "smith"}
+    return accounts, households
+
+
+def test_household_rollup():
+    """Test combined weights and concentration across accounts"""
+    aggregator = ExposureAggregator()
+    aggregator.load(*_book())
+
+    weights = aggregator.household_weights("smith")
+    assert weights == {"VTI": 0.55, "BND": 0.2, "QQQ": 0.25}
+
+    rollup = aggregator.rollup()
+    smith = rollup["households"].index("smith")
+    assert rollup["market_value"][smith] == 200.0
+    assert np.isclose(rollup["hhi"][smith], 0.55 ** 2 + 0.2 ** 2 + 0.25 ** 2)
+    assert rollup["top_asset"][smith] == "VTI"
+    assert rollup["top_asset"][rollup["households"].index("solo")] == "BND"
+    print("✅ Household rollup works")
+
+
+def test_incremental_updates_match_reload():
+    """Test buffered account updates against a full rebuild"""
+    accounts, households = _book()
+    aggregator = ExposureAggregator()
+    aggregator.load(accounts, households)
+    aggregator.rollup()
+
+    aggregator.update_account("brokerage", {"QQQ": 80.0, "VGT": 20.0})
+    aggregator.update_account("solo", {"BND": 10.0}, household="smith")
+    aggregator.update_account("new", {"VNQ": 5.0}, household="jones")
+    aggregator.remove_account("ira")
+
+    accounts["brokerage"] = {"QQQ": 80.0, "VGT": 20.0}
+    accounts["new"] = {"VNQ": 5.0}
+    del accounts["ira"]
+    households.update({"solo": "smith", "new": "jones"})
+    rebuilt = ExposureAggregator()
+    rebuilt.load(accounts, households)
+
+    for household in ("smith", "jones"):
+        assert aggregator.household_weights(household) == rebuilt.household_weights(household)
+    assert aggregator.firm_exposure() == rebuilt.firm_exposure()
+    print("✅ Incremental updates match a full rebuild")
+
+
+def test_household_risk():
+    """Test household volatility from an asset covariance matrix"""
+    aggregator = ExposureAggregator()
+    aggregator.load({"a": {"X": 50.0}, "b": {"Y": 50.0}}, {"a": "h", "b": "h"})
+    cov = np.array([[0.04, 0.0], [0.0, 0.09]])
+    volatility = aggregator.household_risk(cov, ["X", "Y"])
+    assert np.isclose(volatility[0], np.sqrt(0.25 * 0.04 + 0.25 * 0.09))
+    print("✅ Household risk works")
+
+
+def test_unknown_household():
+    """Test an unknown household is reported as not found, with or without risk"""
+    import asyncio
+
+    import main
+
+    async def scenario():
+        await main.mcp.call_tool("update_account_holdings", {"account_id": "known-account", "holdings": {"VTI": 10.0}})
+        results = []
+        for include_risk in (False, True):
+            _, result = await main.mcp.call_tool("get_household_exposure", {
+                "household": "no-such-household", "include_risk": include_risk
+            })
+            results.append(result["result"])
+        return results
+
+    for result in asyncio.run(scenario()):
+        assert result == {"status": "error", "message": "Household not found: no-such-household"}
+    print("✅ Unknown households are reported as not found")
+
+
+def test_subtraction_residuals_are_pruned():
+    """Test removing accounts one at a time leaves no floating-point dust in household totals"""
+    aggregator = ExposureAggregator()
+    aggregator.load({"a": {"X": 0.1}, "b": {"X": 0.2}}, {"a": "h", "b": "h"})
+    aggregator.remove_account("a")
+    aggregator.rollup()
+    aggregator.remove_account("b")
+    rollup = aggregator.rollup()
+    assert rollup["market_value"][0] == 0.0 and rollup["top_asset"][0] is None
+    assert aggregator.household_weights("h") == {}
+    print("✅ Subtraction residuals are pruned")
+
+
+def test_holdings_are_shared_through_the_store():
+    """Test holdings written by another process and profiles' existing assets show up in the rollup"""
+    import asyncio
+
+    import main
+    from holdings import HoldingStore
+
+    other_worker = HoldingStore(main.config.storage.client_db_path)
+
+    async def scenario():
+        await main.mcp.call_tool("update_account_holdings", {
+            "account_id": "shared-ira", "holdings": {"VTI": 60.0}, "household": "shared"
+        })
+        _, before = await main.mcp.call_tool("get_household_exposure", {"household": "shared"})
+        other_worker.put_account("shared-401k", {"BND": 40.0}, household="shared")
+        _, after = await main.mcp.call_tool("get_household_exposure", {"household": "shared"})
+        await main.mcp.call_tool("create_client_profile", {
+            "name": "Seeded Client", "age": 50, "risk_tolerance": "moderate", "investment_horizon": 10,
+            "capital": 100000.0, "existing_assets": {"VTI": 75000.0, "BND": 25000.0}
+        })
+        _, seeded = await main.mcp.call_tool("get_household_exposure", {"household": "Seeded Client"})
+        return before["result"], after["result"], seeded["result"]
+
+    before, after, seeded = asyncio.run(scenario())
+    assert before["weights"] == {"VTI": 1.0}
+    assert after["market_value"] == 100.0 and after["weights"] == {"VTI": 0.6, "BND": 0.4}
+    assert seeded["status"] == "success" and seeded["weights"] == {"VTI": 0.75, "BND": 0.25}
+    assert other_worker.load()[1]["shared-ira"] == "shared"
+    print("✅ Holdings are shared through the store and seeded from profiles")
+
+
+if __name__ == "__main__":
+    test_household_rollup()
+    test_incremental_updates_match_reload()
+    test_household_risk()
+    test_unknown_household()
+    test_subtraction_residuals_are_pruned()
+    test_holdings_are_shared_through_the_store()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline benchmark suite
+"""
+
+import copy
+import os
+import sys
+import tempfile
+
+import benchmark
+from benchmark import CLIENT, compare, run_suite
+from config import config
+
+
+def test_suite_runs_offline():
+    """Test a small suite times kernels and tools on synthetic prices, away from the real stores"""
+    import main
+
+    fundamentals_path = config.fundamentals.path
+    client_db_path = config.storage.client_db_path
+    stores = (main.client_profiles, main.tax_lots, main.account_holdings)
+    report = run_suite(asset_counts=(5,), history_years=(1,), repeats=1)
+    names = {result["name"] for result in report["results"]}
+    assert {"kernel.portfolio_metrics", "kernel.backtest_metrics"} <= names
+    assert {"tool.build_portfolio", "tool.backtest_portfolio", "tool.get_market_data"} <= names
+    assert {
+        "tool.adjust_portfolio", "tool.generate_book_reports", "tool.update_account_holdings",
+        "tool.get_household_exposure", "tool.import_client_profiles", "tool.export_client_profiles",
+        "tool.calculate_var", "tool.analyze_correlation",
+        "tool.run_stress_test", "tool.record_tax_lots", "tool.rebalance_tax_aware",
+        "tool.set_target_allocation", "tool.update_market_prices", "tool.get_drift_breaches",
+        "tool.refresh_fundamentals", "tool.screen_securities"
+    } <= names
+    assert all(result["median_ms"] > 0 for result in report["results"])
+    assert "benchmark" not in config.data_providers
+    assert config.fundamentals.path == fundamentals_path
+    assert config.data_providers["yfinance"].enabled
+    assert config.storage.client_db_path == client_db_path
+    assert (main.client_profiles, main.tax_lots, main.account_holdings) == stores
+    assert CLIENT not in main.client_profiles and not main.tax_lots.lots(CLIENT)
+    print(f"✅ {len(report['results'])} benchmark cases ran offline")
+
+
+def test_regressions_are_detected():
+    """Test slowdowns beyond the threshold are reported and noise is ignored"""
+    baseline = {"results": [
+        {"name": "kernel.portfolio_metrics", "params": {"assets": 500, "years": 10}, "median_ms": 40.0},
+        {"name": "tool.list_clients", "params": {}, "median_ms": 0.4}
+    ]}
+    report = copy.deepcopy(baseline)
+    report["results"][0]["median_ms"] = 60.0
+    report["results"][1]["median_ms"] = 0.8  # doubled, but below the noise floor
+
+    regressions = compare(report, baseline, threshold=0.25)
+    assert [regression["name"] for regression in regressions] == ["kernel.portfolio_metrics"]
+    assert abs(regressions[0]["slowdown"] - 0.5) < 1e-9
+    assert compare(baseline, baseline) == []
+    print("✅ Regressions are detected")
+
+
+
+def test_missing_baseline_fails_the_gate():
+    """Test a gate run without a baseline exits with status 1 instead of passing"""
+    with tempfile.TemporaryDirectory() as directory:
+        argv = sys.argv
+        sys.argv = [
+            "benchmark.py", "--quick", "--kernels-only", "--repeats", "1",
+            "--output", os.path.join(directory, "results.json"),
+            "--baseline", os.path.join(directory, "baseline.json")
+        ]
+        try:
+            benchmark.main()
+        except SystemExit as e:
+            code = e.code
+        else:
+            code = 0
+        finally:
+            sys.argv = argv
+    assert code == 1
+    print("✅ A missing baseline fails the gate")
+
+
+if __name__ == "__main__":
+    test_suite_runs_offline()
+    test_regressions_are_detected()
+    test_missing_baseline_fails_the_gate()
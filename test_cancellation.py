@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for per-tool deadlines and cooperative cancellation
+"""
+
+import asyncio
+import threading
+import time
+
+from cancellation import CallCancelled, checkpoint, with_deadline
+from executor import run_cpu
+from metrics import registry
+
+stopped = threading.Event()
+
+
+def _long_backtest():
+    """Pool work with a checkpoint per iteration that records when it is stopped"""
+    try:
+        while True:
+            checkpoint()
+            time.sleep(0.005)
+    except CallCancelled:
+        stopped.set()
+        raise
+
+
+async def slow_backtest():
+    try:
+        await run_cpu(_long_backtest)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    return {"status": "success"}
+
+
+def _cancellations(reason):
+    for name, labels, value in registry.snapshot()["counters"]:
+        if name == "mcp_tool_cancellations_total" and dict(labels) == {"tool": "slow_backtest", "reason": reason}:
+            return value
+    return 0.0
+
+
+def test_deadline_returns_error_and_stops_pool_work():
+    """Test a call past its deadline returns an error and its pool thread stops at the next checkpoint"""
+    stopped.clear()
+    before = _cancellations("deadline")
+    tool = with_deadline(slow_backtest, 0.1)
+
+    started = time.perf_counter()
+    result = asyncio.run(tool())
+    elapsed = time.perf_counter() - started
+
+    assert result == {"status": "error", "message": "slow_backtest exceeded its 0.1 s deadline"}
+    assert elapsed < 1.0
+    assert stopped.wait(1.0), "pool work kept running past the deadline"
+    assert _cancellations("deadline") == before + 1
+    print(f"✅ Deadline enforced after {elapsed * 1000:.0f} ms")
+
+
+def test_client_cancellation_stops_pool_work():
+    """Test cancelling the handler, as the MCP server does on notifications/cancelled, stops its pool work"""
+    stopped.clear()
+    before = _cancellations("cancelled")
+    tool = with_deadline(slow_backtest)
+
+    async def cancel_soon():
+        task = asyncio.create_task(tool())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(cancel_soon())
+    assert stopped.wait(1.0), "pool work kept running after cancellation"
+    assert _cancellations("cancelled") == before + 1
+    print("✅ Cancelled call released its pool thread")
+
+
+if __name__ == "__main__":
+    test_deadline_returns_error_and_stops_pool_work()
+    test_client_cancellation_stops_pool_work()
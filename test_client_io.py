@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming bulk client import and export
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+from client_io import export_profiles, import_profiles
+from config import config
+from main import ClientProfile
+from store import ClientStore
+
+
+def _row(i):
+    return {
+        "name": f"Client {i}",
+        "age": 25 + i % 50,
+        "risk_tolerance": ["conservative", "moderate", "aggressive"][i % 3],
+        "investment_horizon": 1 + i % 20,
+        "capital": 5000.0 * (i + 1),
+        "sector_preferences": ["technology", "healthcare"],
+        "existing_assets": {"VTI": 1000.0 * i} if i % 2 else {}
+    }
+
+
+def test_jsonl_import_with_errors():
+    """Test JSONL import keeps going past invalid rows"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clients.jsonl")
+        with open(path, "w", encoding="utf-8") as handle:
+            for i in range(250):
+                handle.write(json.dumps(_row(i)) + "\n")
+            handle.write(json.dumps({"name": "Bad Age", "age": "old"}) + "\n")
+            handle.write("{not json\n")
+
+        store = ClientStore(os.path.join(tmp, "clients.db"), ClientProfile)
+        summary = import_profiles(store, path, batch_size=100)
+        assert summary["imported"] == 250
+        assert summary["rejected"] == 2
+        assert sorted(error["line"] for error in summary["errors"]) == [251, 252]
+        assert len(store) == 250
+    print("✅ JSONL import works")
+
+
+def test_csv_round_trip():
+    """Test CSV export followed by import into a fresh store"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = ClientStore(os.path.join(tmp, "source.db"), ClientProfile)
+        source.put_many(ClientProfile(**_row(i)) for i in range(60))
+
+        path = os.path.join(tmp, "export", "moderate.csv")
+        summary = export_profiles(source, path, risk_tolerance="moderate")
+        assert summary["exported"] == 20
+
+        target = ClientStore(os.path.join(tmp, "target.db"), ClientProfile)
+        summary = import_profiles(target, path)
+        assert summary["imported"] == 20 and summary["rejected"] == 0
+        assert target["Client 1"] == source["Client 1"]
+        assert target["Client 1"].sector_preferences == ["technology", "healthcare"]
+        assert target["Client 1"].existing_assets == {"VTI": 1000.0}
+    print("✅ CSV round trip works")
+
+
+def test_tool_paths_stay_in_the_files_directory():
+    """Test the file tools resolve paths inside the files directory and refuse ones that leave it"""
+    import main
+
+    async def scenario():
+        results = {}
+        for path in ("exports/book.jsonl", "../clients.db", "/etc/passwd", "exports/../../escape.jsonl"):
+            _, exported = await main.mcp.call_tool("export_client_profiles", {"path": path})
+            results[path] = exported["result"]
+        _, imported = await main.mcp.call_tool("import_client_profiles", {"path": "/etc/passwd"})
+        _, reports = await main.mcp.call_tool("generate_book_reports", {"output_dir": "../reports"})
+        return results, imported["result"], reports["result"]
+
+    exported, imported, reports = asyncio.run(scenario())
+    assert exported["exports/book.jsonl"]["status"] == "success"
+    assert os.path.exists(os.path.join(config.storage.files_directory, "exports", "book.jsonl"))
+    for path in ("../clients.db", "/etc/passwd", "exports/../../escape.jsonl"):
+        assert exported[path]["status"] == "error" and "outside the files directory" in exported[path]["message"]
+    assert imported["status"] == "error" and reports["status"] == "error"
+    print("✅ File tool paths are confined to the files directory")
+
+
+if __name__ == "__main__":
+    test_jsonl_import_with_errors()
+    test_csv_round_trip()
+    test_tool_paths_stay_in_the_files_directory()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the correlation and clustering analysis
+"""
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from config import config
+from correlation import CorrelationModel
+
+
+def test_blockwise_pairs_and_clusters_match_full_matrix():
+    """Test top pairs and clusters found block by block agree with the full correlation matrix"""
+    rng = np.random.default_rng(5)
+    factors = rng.normal(size=(400, 3))
+    returns = rng.normal(size=(400, 300))
+    returns[:, 10:14] += 4 * factors[:, [0]]  # four near-duplicates of one bet
+    returns[:, 200:202] += 4 * factors[:, [1]]
+    symbols = [f"S{i:03d}" for i in range(300)]
+    model = CorrelationModel.from_returns(symbols, returns)
+
+    full = np.corrcoef(returns, rowvar=False)
+    upper = np.triu_indices(300, k=1)
+    order = np.argsort(-full[upper])[:12]
+    expected = [(symbols[upper[0][i]], symbols[upper[1][i]]) for i in order]
+    pairs = model.top_pairs(12, block_size=64)
+    assert [(first, second) for first, second, _ in pairs] == expected
+    assert np.allclose([value for _, _, value in pairs], full[upper][order])
+
+    clusters = model.clusters(0.8, block_size=64)
+    assert [cluster["symbols"] for cluster in clusters] == [symbols[10:14], symbols[200:202]]
+    assert np.allclose(model.matrix(symbols[10:14]), full[10:14, 10:14])
+
+    from_covariance = CorrelationModel.from_covariance(symbols, np.cov(returns, rowvar=False))
+    assert np.allclose(from_covariance.block(slice(0, 50), slice(100, 300)), full[:50, 100:])
+    print(f"✅ Top pair {pairs[0][0]}/{pairs[0][1]} at {pairs[0][2]:.3f}, {len(clusters)} clusters")
+
+
+def test_tool_returns_matrix_and_uses_warm_estimates():
+    """Test analyze_correlation on a universe, the large-matrix guard, and reuse of precomputed estimates"""
+    import main
+    from warmup import warmer
+
+    saved = config.correlation.model_copy()
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+    config.correlation.max_matrix_symbols = 3
+
+    async def call(arguments):
+        main.mcp.results.clear()
+        _, structured = await main.mcp.call_tool("analyze_correlation", arguments)
+        return structured["result"]
+
+    async def scenario():
+        too_big = await call({"universe": "moderate", "include_matrix": True})
+        block = await call({"universe": "moderate", "matrix_symbols": ["VTI", "BND"], "top_k": 3})
+        assert await warmer.run_once()
+        main._correlation_cache().clear()
+        warm = await call({"universe": "moderate"})
+        return too_big, block, warm
+
+    try:
+        too_big, block, warm = asyncio.run(scenario())
+    finally:
+        config.correlation = saved
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+        warmer.store_estimates(None, {})
+
+    assert too_big["status"] == "error" and "matrix_symbols" in too_big["message"]
+    assert block["status"] == "success" and block["source"] == "returns" and len(block["top_pairs"]) == 3
+    values = np.array(block["matrix"]["values"])
+    assert values.shape == (2, 2) and np.allclose(values, values.T) and np.allclose(np.diag(values), 1.0)
+    assert warm["source"] == "covariance" and warm["symbols"] == len(config.asset_universes["moderate"])
+    assert np.isclose(warm["top_pairs"][0]["correlation"], block["top_pairs"][0]["correlation"], atol=0.05)
+    print(f"✅ Most correlated {warm['top_pairs'][0]['pair']} from warm estimates")
+
+
+
+def test_gaps_use_pairwise_complete_days():
+    """Test histories with gaps are correlated over shared days, and constant symbols are left out of covariance models"""
+    rng = np.random.default_rng(11)
+    factor = rng.normal(size=(300, 1))
+    returns = rng.normal(size=(300, 6)) + 2 * factor
+    returns[:200, 0] = np.nan  # listed late
+    returns[::7, 3] = np.nan  # missing bars
+    returns[:290, 5] = np.nan  # too short to pair with anything
+    symbols = ["LATE", "B", "C", "GAPS", "E", "NEW"]
+    model = CorrelationModel.from_returns(symbols, returns, min_overlap=20)
+
+    expected = pd.DataFrame(returns).corr(min_periods=20).to_numpy()
+    assert np.allclose(model.matrix(symbols), expected, equal_nan=True)
+    pairs = model.top_pairs(20, block_size=2)
+    assert len(pairs) == 10 and all("NEW" not in pair[:2] for pair in pairs)
+    assert model.clusters(0.5, block_size=2)[0]["symbols"] == symbols[:5]
+
+    covariance = np.cov(rng.normal(size=(100, 3)), rowvar=False)
+    covariance[1, :] = covariance[:, 1] = 0.0
+    from_covariance = CorrelationModel.from_covariance(["A", "CASH", "C"], covariance)
+    assert from_covariance.symbols == ["A", "C"] and np.isfinite(from_covariance.matrix(["A", "C"])).all()
+    print(f"✅ Pairwise correlations over gaps, top pair {pairs[0][0]}/{pairs[0][1]}")
+
+
+def test_tool_rejects_non_positive_top_k():
+    """Test analyze_correlation refuses a top_k of zero or less"""
+    import main
+
+    async def scenario():
+        _, structured = await main.mcp.call_tool("analyze_correlation", {"symbols": ["VTI", "BND"], "top_k": 0})
+        return structured["result"]
+
+    result = asyncio.run(scenario())
+    assert result["status"] == "error" and "top_k" in result["message"]
+    print("✅ Non-positive top_k is rejected")
+
+
+if __name__ == "__main__":
+    test_blockwise_pairs_and_clusters_match_full_matrix()
+    test_tool_returns_matrix_and_uses_warm_estimates()
+    test_gaps_use_pairwise_complete_days()
+    test_tool_rejects_non_positive_top_k()
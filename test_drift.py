@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental drift monitoring
+"""
+
+import asyncio
+import time
+from datetime import date
+
+import numpy as np
+
+from config import config
+from drift import DriftMonitor
+from eod import _drift
+
+
+def test_price_updates_recompute_only_holders():
+    """Test drift values, band crossings and that only holders of repriced symbols are recomputed"""
+    monitor = DriftMonitor(band=0.05)
+    monitor.load({
+        "equity": ({"VTI": 0.6, "BND": 0.4}, {"VTI": 60, "BND": 40}),
+        "bonds": ({"BND": 1.0}, {"BND": 10}),
+        "tech": ({"QQQ": 0.5, "VTI": 0.5}, {"QQQ": 10, "VTI": 10})
+    })
+    first = monitor.update_prices({"VTI": 1.0, "BND": 1.0, "QQQ": 1.0})
+    assert first["clients_recomputed"] == 3 and first["breached"] == []
+
+    # Only QQQ moves: "equity" and "bonds" do not hold it
+    jump = monitor.update_prices({"QQQ": 1.5, "VTI": 1.0})
+    assert jump["symbols_changed"] == 1 and jump["clients_recomputed"] == 1
+    assert jump["breached"] == ["tech"]
+    detail = monitor.client_drift("tech")
+    assert np.isclose(detail["drift"], _drift(detail["weights"], detail["target"]))
+    assert np.isclose(detail["drift"], 0.1)
+
+    # Moving VTI up brings "tech" back and pushes "equity" out of its band
+    back = monitor.update_prices({"VTI": 1.5})
+    assert back["clients_recomputed"] == 2
+    assert back["cleared"] == ["tech"] and back["breached"] == ["equity"]
+    assert [name for name, _ in monitor.breaches()] == ["equity"]
+    assert monitor.breaches(band=0.1) == []
+
+    # Client changes apply at the next update; unpriced holdings are never flagged
+    monitor.set_client("equity", {"VTI": 0.6, "BND": 0.4}, {"VTI": 40, "BND": 40})
+    monitor.set_client("new", {"GLD": 1.0}, {"GLD": 5})
+    changed = monitor.update_prices({})
+    assert changed["clients_recomputed"] == 2 and changed["cleared"] == ["equity"]
+    assert monitor.unpriced() == ["GLD"] and monitor.client_drift("new")["drift"] is None
+    monitor.remove_client("bonds")
+    assert "bonds" in monitor and monitor.client_drift("bonds")["weights"] == {}
+    print(f"✅ Drift {detail['drift']:.2%} flagged after recomputing {jump['clients_recomputed']} of 3 clients")
+
+
+def test_incremental_matches_full_recompute():
+    """Test a book of 20,000 clients: a one-symbol update touches its holders only and matches a full pass"""
+    rng = np.random.default_rng(7)
+    symbols = [f"S{i:03d}" for i in range(500)]
+    book = {}
+    for client in range(20000):
+        held = rng.choice(500, 8, replace=False)
+        book[f"client-{client}"] = (
+            {symbols[i]: 1 / 8 for i in held},
+            {symbols[i]: float(rng.uniform(1, 100)) for i in held}
+        )
+    monitor = DriftMonitor(band=0.2)
+    monitor.load(book)
+    prices = {symbol: float(rng.uniform(10, 100)) for symbol in symbols}
+    monitor.update_prices(prices)
+
+    started = time.perf_counter()
+    result = monitor.update_prices({"S000": prices["S000"] * 3})
+    elapsed = time.perf_counter() - started
+    holders = sum("S000" in quantities for _, quantities in book.values())
+    assert result["clients_recomputed"] == holders < len(book) // 10
+
+    flagged = dict(monitor.breaches())
+    reference = DriftMonitor(band=0.2)
+    reference.load(book)
+    reference.update_prices({**prices, "S000": prices["S000"] * 3})
+    expected = dict(reference.breaches())
+    assert flagged.keys() == expected.keys()
+    assert np.allclose(list(flagged.values()), [expected[name] for name in flagged])
+    assert set(result["breached"]) <= flagged.keys()
+    print(f"✅ Repriced 1 of 500 symbols: {holders} of {len(book)} clients recomputed in {elapsed * 1000:.1f} ms")
+
+
+def test_drift_tools():
+    """Test the drift tools on tax lots recorded away from a client's default allocation"""
+    import main
+
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+    main._drift_monitor = None
+    name = "Drifting Client"
+
+    async def scenario():
+        await main.mcp.call_tool("create_client_profile", {
+            "name": name, "age": 35, "risk_tolerance": "aggressive",
+            "investment_horizon": 20, "capital": 80000.0
+        })
+        target = main._book_portfolios({name: {"risk_tolerance": "aggressive"}}, {})[name]
+        symbol = next(iter(target))
+        prices = await main._latest_prices(list(target))
+        await main.mcp.call_tool("record_tax_lots", {"client_name": name, "replace": True, "lots": [
+            {"symbol": s, "quantity": 1000 * w / prices[s], "cost_basis": prices[s], "acquired": str(date.today())}
+            for s, w in target.items()
+        ]})
+        _, on_target = await main.mcp.call_tool("get_drift_breaches", {"client_name": name})
+        _, moved = await main.mcp.call_tool("update_market_prices", {"prices": {symbol: prices[symbol] * 4}})
+        _, breaches = await main.mcp.call_tool("get_drift_breaches", {})
+        _, restored = await main.mcp.call_tool("update_market_prices", {"prices": {symbol: prices[symbol]}})
+        _, missing = await main.mcp.call_tool("get_drift_breaches", {"client_name": "Nobody Here"})
+        return on_target["result"], moved["result"], breaches["result"], restored["result"], missing["result"]
+
+    try:
+        on_target, moved, breaches, restored, missing = asyncio.run(scenario())
+    finally:
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+        main._drift_monitor = None
+
+    assert on_target["status"] == "success" and on_target["drift"] < 1e-9 and not on_target["breached"]
+    assert moved["status"] == "success" and name in moved["breached"]
+    assert moved["clients_recomputed"] < moved["clients_monitored"] or moved["clients_monitored"] == 1
+    assert name in {client["client_name"] for client in breaches["clients"]}
+    assert name in restored["cleared"]
+    assert missing["status"] == "error"
+    print(f"✅ {name} flagged after a price jump, cleared when it reversed")
+
+
+def test_drift_is_measured_against_the_stored_target():
+    """Test a client rebalanced to a custom target is not flagged, and a set target replaces the default"""
+    import main
+
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+    main._drift_monitor = None
+    name = "Custom Target Client"
+    custom = {"QQQ": 0.5, "VTI": 0.5}
+
+    async def scenario():
+        await main.mcp.call_tool("create_client_profile", {
+            "name": name, "age": 50, "risk_tolerance": "conservative",
+            "investment_horizon": 10, "capital": 100000.0
+        })
+        prices = await main._latest_prices(list(custom))
+        await main.mcp.call_tool("record_tax_lots", {"client_name": name, "replace": True, "lots": [
+            {"symbol": s, "quantity": 1000 / prices[s], "cost_basis": prices[s], "acquired": str(date.today())}
+            for s in custom
+        ]})
+        await main.mcp.call_tool("set_target_allocation", {"client_name": name, "target_portfolio": {"BND": 1.0}})
+        _, off_target = await main.mcp.call_tool("get_drift_breaches", {"client_name": name})
+        _, rebalanced = await main.mcp.call_tool("rebalance_tax_aware", {
+            "client_name": name, "target_portfolio": custom, "execute": True
+        })
+        main._drift_monitor = None  # reload from the store, as a restarted server would
+        _, on_target = await main.mcp.call_tool("get_drift_breaches", {"client_name": name})
+        _, invalid = await main.mcp.call_tool("set_target_allocation", {"client_name": name, "target_portfolio": {"BND": -1.0}})
+        return off_target["result"], rebalanced["result"], on_target["result"], invalid["result"]
+
+    try:
+        off_target, rebalanced, on_target, invalid = asyncio.run(scenario())
+    finally:
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+        main._drift_monitor = None
+
+    assert off_target["target"] == {"BND": 1.0} and off_target["breached"]
+    assert rebalanced["status"] == "success" and rebalanced["executed"]
+    assert main.tax_lots.targets([name]) == {name: custom}
+    assert on_target["target"] == custom and on_target["drift"] < 1e-9 and not on_target["breached"]
+    assert invalid["status"] == "error"
+    print(f"✅ {name} measured against its stored target")
+
+
+def test_concurrent_first_use_loads_one_monitor():
+    """Test concurrent first calls load the book once and share one drift monitor"""
+    import main
+
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+    main._drift_monitor = None
+    drift_book = main._drift_book
+    loads = []
+
+    def counted_book(clients=None):
+        if clients is None:
+            loads.append(clients)
+            time.sleep(0.05)  # keep the first load running while the others arrive
+        return drift_book(clients)
+
+    async def scenario():
+        return await asyncio.gather(*(main._drift_engine() for _ in range(8)))
+
+    main._drift_book = counted_book
+    try:
+        monitors = asyncio.run(scenario())
+    finally:
+        main._drift_book = drift_book
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+        main._drift_monitor = None
+    assert len(loads) == 1
+    assert all(monitor is monitors[0] for monitor in monitors)
+    print("✅ Concurrent first calls loaded one drift monitor")
+
+
+
+def test_other_processes_writes_reach_the_monitor():
+    """Test prices, targets and lots written by another server process show up here, and this one's writes need no reload"""
+    import main
+    from lots import LotStore
+
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+    main._drift_monitor = None
+    other_worker = LotStore(main.config.storage.client_db_path)
+    drift_book = main._drift_book
+    loads = []
+    name = "Shared Drift Client"
+
+    def counted_book(clients=None):
+        if clients is None:
+            loads.append(clients)
+        return drift_book(clients)
+
+    async def drift():
+        _, result = await main.mcp.call_tool("get_drift_breaches", {"client_name": name})
+        return result["result"]
+
+    async def scenario():
+        await main.mcp.call_tool("create_client_profile", {
+            "name": name, "age": 40, "risk_tolerance": "moderate", "investment_horizon": 15, "capital": 2000.0
+        })
+        prices = await main._latest_prices(["VTI", "BND"])
+        await main.mcp.call_tool("set_target_allocation", {"client_name": name, "target_portfolio": {"VTI": 1, "BND": 1}})
+        await main.mcp.call_tool("record_tax_lots", {"client_name": name, "replace": True, "lots": [
+            {"symbol": s, "quantity": 1000 / prices[s], "cost_basis": prices[s], "acquired": str(date.today())}
+            for s in ("VTI", "BND")
+        ]})
+        on_target = await drift()
+        await main.mcp.call_tool("record_tax_lots", {"client_name": name, "lots": [
+            {"symbol": "BND", "quantity": 1000 / prices["BND"], "cost_basis": prices["BND"], "acquired": str(date.today())}
+        ]})
+        own_write = await drift()
+        own_loads = len(loads)
+        try:
+            other_worker.put_prices({"VTI": prices["VTI"] * 4})
+            repriced = await drift()
+            other_worker.set_target(name, {"VTI": 2, "BND": 1})
+            retargeted = await drift()
+        finally:
+            other_worker.put_prices({"VTI": prices["VTI"]})
+        return on_target, own_write, own_loads, repriced, retargeted
+
+    main._drift_book = counted_book
+    try:
+        on_target, own_write, own_loads, repriced, retargeted = asyncio.run(scenario())
+    finally:
+        main._drift_book = drift_book
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+        main._drift_monitor = None
+
+    assert on_target["drift"] < 1e-9
+    assert np.isclose(own_write["weights"]["BND"], 2 / 3) and own_loads == 1
+    assert np.isclose(repriced["weights"]["VTI"], 2 / 3) and np.isclose(repriced["drift"], 1 / 6) and repriced["breached"]
+    assert np.isclose(retargeted["target"]["VTI"], 2 / 3) and np.isclose(retargeted["drift"], 0.0, atol=1e-9)
+    assert len(loads) == 3
+    print(f"✅ Another process's writes reached the monitor after {len(loads)} loads")
+
+
+if __name__ == "__main__":
+    test_price_updates_recompute_only_holders()
+    test_incremental_matches_full_recompute()
+    test_drift_tools()
+    test_drift_is_measured_against_the_stored_target()
+    test_concurrent_first_use_loads_one_monitor()
+    test_other_processes_writes_reach_the_monitor()
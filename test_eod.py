@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for the end-of-day batch pipeline
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from config import config
+import eod
+from eod import EodScheduler, RolledBacktest, RollingMoments, build_pipeline, run_eod
+
+
+def test_rolling_moments_match_full_recompute():
+    """Test incremental window updates give the same estimates as recomputing over the window"""
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range("2024-01-01", periods=120).values.astype("datetime64[D]")
+    returns = rng.normal(0.0005, 0.01, size=(120, 3))
+    moments = RollingMoments(["A", "B", "C"])
+
+    for start, end in ((0, 80), (3, 85), (10, 90), (10, 90), (40, 110), (111, 120)):
+        moments.update(dates[start:end], returns[start:end])
+        mean, covariance = moments.estimates()
+        window = pd.DataFrame(returns[start:end], columns=["A", "B", "C"])
+        assert np.allclose(mean.to_numpy(), window.mean().to_numpy())
+        assert np.allclose(covariance.to_numpy(), window.cov().to_numpy() * 252)
+    assert moments.rebuilds == 2  # the first load, and the jump past the old window
+
+    backtest = RolledBacktest({"A": 0.5, "B": 0.3, "C": 0.2})
+    assert backtest.roll_forward(dates[:60], returns[:60]) == 60
+    assert backtest.roll_forward(dates[:90], returns[:90]) == 30
+    assert backtest.days == 90 and backtest.metrics()["as_of"] == str(dates[89])
+    print(f"✅ Incremental estimates matched after {moments.rebuilds} rebuilds")
+
+
+def test_eod_run_resumes_and_updates_estimates():
+    """Test an end-of-day run reports every client, resumes from checkpoints and publishes estimates"""
+    import main
+    from warmup import warmer
+
+    saved = config.eod.model_copy()
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+
+    async def scenario():
+        await main.mcp.call_tool("create_client_profile", {
+            "name": "EOD Client", "age": 50, "risk_tolerance": "conservative",
+            "investment_horizon": 10, "capital": 250000.0
+        })
+        first = await run_eod("2025-06-30")
+        again = await run_eod("2025-06-30")
+        return first, again
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            config.eod.directory = directory
+            first, again = asyncio.run(scenario())
+            with open(os.path.join(first["run_dir"], "report.json"), "r", encoding="utf-8") as handle:
+                report = json.load(handle)
+            with open(os.path.join(first["run_dir"], "manifest.json"), "r", encoding="utf-8") as handle:
+                stages = json.load(handle)["stages"]
+            universe = main._default_universe("conservative")
+            estimates = warmer.estimates_for(universe)
+            data = asyncio.run(main.adj_close(universe, period=main.PORTFOLIO_HISTORY))
+            expected = main._estimate_returns(universe, data[universe].dropna(how="all"))
+    finally:
+        config.eod = saved
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+        warmer.store_estimates(None, {})
+
+    row = next(row for row in report["rows"] if row["client"] == "EOD Client")
+    assert row["volatility"] > 0 and row["drift_source"] == "backtest" and row["backtest"]["as_of"]
+    assert first["clients"] == again["clients"] == len(report["rows"])
+    assert all(status.get("resumed") for status in stages.values())
+    assert np.allclose(estimates[0].to_numpy(), expected[0].to_numpy())
+    assert np.allclose(estimates[1].to_numpy(), expected[1].to_numpy())
+    print(f"✅ End-of-day report for {first['clients']} clients, drift {row['drift']:.2%}")
+
+
+
+def test_eod_drift_matches_the_drift_monitor():
+    """Test the report measures lot holdings against the stored target, as get_drift_breaches does at the same prices"""
+    import main
+    from warmup import warmer
+
+    saved = config.eod.model_copy()
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+    main._drift_monitor = None
+    name = "EOD Lots Client"
+
+    async def scenario():
+        await main.mcp.call_tool("create_client_profile", {
+            "name": name, "age": 45, "risk_tolerance": "aggressive", "investment_horizon": 12, "capital": 3000.0
+        })
+        await main.mcp.call_tool("set_target_allocation", {"client_name": name, "target_portfolio": {"BND": 0.5, "GLD": 0.5}})
+        await main.mcp.call_tool("record_tax_lots", {"client_name": name, "replace": True, "lots": [
+            {"symbol": "BND", "quantity": 30.0, "cost_basis": 50.0, "acquired": str(date.today())},
+            {"symbol": "GLD", "quantity": 2.0, "cost_basis": 150.0, "acquired": str(date.today())}
+        ]})
+        summary = await run_eod("2025-07-01")
+        closes = await main._latest_prices(["BND", "GLD"])
+        await main.mcp.call_tool("update_market_prices", {"prices": closes})
+        _, live = await main.mcp.call_tool("get_drift_breaches", {"client_name": name})
+        return summary, live["result"]
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            config.eod.directory = directory
+            summary, live = asyncio.run(scenario())
+            with open(os.path.join(summary["run_dir"], "report.json"), "r", encoding="utf-8") as handle:
+                report = json.load(handle)
+    finally:
+        config.eod = saved
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+        main._drift_monitor = None
+        warmer.store_estimates(None, {})
+
+    row = next(row for row in report["rows"] if row["client"] == name)
+    assert row["drift_source"] == "lots" and row["drift"] > 0
+    assert np.isclose(row["drift"], live["drift"]) and live["target"] == {"BND": 0.5, "GLD": 0.5}
+    print(f"✅ End-of-day drift {row['drift']:.2%} matches the drift monitor")
+
+
+def test_estimates_carry_the_version_from_before_the_fetch():
+    """Test bars landing during the price fetch leave the estimates stamped with the older version"""
+    fetches = []
+    real_fetch, real_version = eod.adj_close, eod.data_version
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+
+    async def fetch(*args, **kwargs):
+        fetches.append(args)
+        return await real_fetch(*args, **kwargs)
+
+    eod.adj_close = fetch
+    eod.data_version = lambda: f"v{len(fetches)}"
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            pipeline = build_pipeline(os.path.join(directory, "run"), os.path.join(directory, "state"))
+            results = asyncio.run(pipeline.run(os.path.join(directory, "run")))
+    finally:
+        eod.adj_close, eod.data_version = real_fetch, real_version
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+
+    assert len(fetches) == 1
+    assert results["estimates"]["data_version"] == "v0"
+    print("✅ Estimates are stamped with the version read before the fetch")
+
+
+def test_one_scheduler_holds_the_lock():
+    """Test only one scheduler takes the run lock, and another takes it once the holder lets go"""
+    saved = config.eod.model_copy()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            config.eod.directory = directory
+            first, second = EodScheduler(), EodScheduler()
+            assert first.holds_lock() and first.holds_lock()
+            assert not second.holds_lock()
+            first._lock_file.close()  # as when the holding process exits
+            assert second.holds_lock()
+            second._lock_file.close()
+    finally:
+        config.eod = saved
+    print("✅ One scheduler runs the end-of-day pipeline")
+
+
+if __name__ == "__main__":
+    test_rolling_moments_match_full_recompute()
+    test_eod_run_resumes_and_updates_estimates()
+    test_eod_drift_matches_the_drift_monitor()
+    test_estimates_carry_the_version_from_before_the_fetch()
+    test_one_scheduler_holds_the_lock()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded I/O and CPU worker pools
+"""
+
+import asyncio
+import threading
+import time
+
+from executor import get_pool, run_cpu, run_io
+
+
+def test_slow_io_does_not_block_cpu_or_loop():
+    """Test a slow fetch leaves the event loop and CPU pool responsive"""
+    async def scenario():
+        slow = asyncio.ensure_future(run_io(time.sleep, 0.5))
+        started = time.perf_counter()
+        await asyncio.sleep(0)
+        assert await run_cpu(sum, range(10)) == 45
+        fast_latency = time.perf_counter() - started
+        await slow
+        return fast_latency
+
+    assert asyncio.run(scenario()) < 0.25
+    print("✅ Slow I/O does not stall other work")
+
+
+def test_pools_are_separate_and_bounded():
+    """Test work lands on the named, bounded pool"""
+    async def thread_names():
+        return await run_io(lambda: threading.current_thread().name), \
+            await run_cpu(lambda: threading.current_thread().name)
+
+    io_name, cpu_name = asyncio.run(thread_names())
+    assert io_name.startswith("io-worker")
+    assert cpu_name.startswith("cpu-worker")
+    assert get_pool("io")._max_workers > 0 and get_pool("cpu")._max_workers > 0
+    print("✅ I/O and CPU pools are separate")
+
+
+if __name__ == "__main__":
+    test_slow_io_does_not_block_cpu_or_loop()
+    test_pools_are_separate_and_bounded()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Tests for the local fundamentals table and securities screening
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from config import config
+from fundamentals import FundamentalsTable
+from synthetic_data import QUOTE_TYPES, SECTORS
+
+
+def _record(rng):
+    sector = SECTORS[int(rng.integers(len(SECTORS)))] if rng.random() > 0.05 else "N/A"
+    quote_type = QUOTE_TYPES[int(rng.choice(len(QUOTE_TYPES), p=[0.7, 0.2, 0.1]))]
+    fund = quote_type != "EQUITY"
+    return {
+        "sector": "N/A" if fund else sector,
+        "quote_type": quote_type,
+        "category": sector if fund else None,
+        "market_cap": float(rng.lognormal(22, 2)),
+        "pe_ratio": float(rng.uniform(4, 60)) if rng.random() > 0.1 else "N/A",
+        "current_price": float(rng.uniform(5, 500))
+    }
+
+
+def _table(n=50000, seed=3):
+    rng = np.random.default_rng(seed)
+    records = {f"X{i:05d}": _record(rng) for i in range(n)}
+    return FundamentalsTable.from_records(records, "2026-06-30")
+
+
+def _brute_force(table, labels, ranges, sort_by, descending, limit):
+    keep = np.ones(len(table), dtype=bool)
+    for label, values in labels.items():
+        names = table.labels(label)
+        keep &= np.array([any(name.lower().startswith(v.lower()) for v in values) for name in names])
+    for field, (low, high) in ranges.items():
+        values = table.columns[field]
+        if low is not None:
+            keep &= values >= low
+        if high is not None:
+            keep &= values <= high
+    rows = np.flatnonzero(keep)
+    values = table.columns[sort_by][rows]
+    ranked = sorted(rows.tolist(), key=lambda row: (np.isnan(table.columns[sort_by][row]),
+                                                   (-1 if descending else 1) * table.columns[sort_by][row],
+                                                   table.symbols[row]))
+    return ranked[:limit], rows.size
+
+
+def test_screens_match_brute_force():
+    """Test indexed screens against a full scan, on 50,000 securities"""
+    table = _table()
+    queries = [
+        ({"sector": ["tech"]}, {"pe_ratio": (None, 25)}, "market_cap", True, 20),
+        ({}, {}, "market_cap", True, 10),
+        ({"sector": ["energy", "Utilities"]}, {"market_cap": (1e9, 1e11), "price": (None, 100)}, "pe_ratio", False, 15),
+        ({}, {"pe_ratio": (10, 10.05)}, "price", True, 1000),
+        ({"sector": ["health"]}, {"market_cap": (1e13, None)}, "market_cap", True, 5),
+        ({"quote_type": ["etf"], "category": ["tech"]}, {"pe_ratio": (None, 25)}, "market_cap", True, 20),
+        ({"quote_type": ["mutual"], "category": ["energy", "real"]}, {}, "price", False, 50),
+        ({"quote_type": ["equity"]}, {"market_cap": (1e12, None)}, "market_cap", True, 10)
+    ]
+    elapsed = 0.0
+    for labels, ranges, sort_by, descending, limit in queries:
+        started = time.perf_counter()
+        rows, matches = table.screen(
+            labels.get("sector"), ranges, sort_by, descending, limit,
+            quote_types=labels.get("quote_type"), categories=labels.get("category")
+        )
+        elapsed += time.perf_counter() - started
+        expected, expected_matches = _brute_force(table, labels, ranges, sort_by, descending, limit)
+        assert matches == expected_matches
+        assert rows.tolist() == expected
+    elapsed /= len(queries)
+    assert elapsed < 0.05
+
+    try:
+        table.screen(["crypto"])
+        assert False, "unknown sector accepted"
+    except ValueError as e:
+        assert "Technology" in str(e)
+    try:
+        table.screen(quote_types=["bond"])
+        assert False, "unknown quote type accepted"
+    except ValueError as e:
+        assert "ETF" in str(e)
+    print(f"✅ {len(queries)} screens over {len(table)} securities, {elapsed * 1000:.2f} ms each")
+
+
+def test_save_load_and_merge():
+    """Test the table round-trips through its file and refreshed rows replace old ones"""
+    table = _table(n=200)
+    fresh = FundamentalsTable.from_records(
+        {"X00000": {"sector": "Energy", "market_cap": 5.0, "pe_ratio": None, "current_price": 1.0},
+         "NEW": {"sector": "Technology", "market_cap": 7.0, "pe_ratio": 12.0, "current_price": 2.0}},
+        "2026-07-01"
+    )
+    merged = table.merged(fresh)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fundamentals.npz")
+        merged.save(path)
+        loaded = FundamentalsTable.load(path)
+
+    assert len(loaded) == 201 and loaded.as_of == "2026-07-01"
+    records = {record["symbol"]: record for record in loaded.records(np.arange(len(loaded)))}
+    assert records["X00000"] == {
+        "symbol": "X00000", "sector": "Energy", "quote_type": "N/A", "category": "N/A",
+        "market_cap": 5.0, "pe_ratio": None, "price": 1.0
+    }
+    assert records["NEW"]["pe_ratio"] == 12.0
+    rows, _ = loaded.screen(["energy"], {"market_cap": (None, 6.0)})
+    assert loaded.symbols[rows].tolist() == ["X00000"]
+    assert records["X00001"]["quote_type"] == table.records(np.array([1]))[0]["quote_type"]
+
+    # Tables saved before quote types and categories were kept still load
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fundamentals.npz")
+        np.savez(path, symbols=fresh.symbols, sectors=fresh.labels("sector"), as_of=np.array(fresh.as_of),
+                 **fresh.columns)
+        old = FundamentalsTable.load(path)
+    assert old.labels("quote_type").tolist() == ["N/A", "N/A"]
+    assert old.records(np.arange(2)) == fresh.records(np.arange(2))
+    print("✅ Fundamentals table saved, loaded and merged")
+
+
+def test_screen_tools():
+    """Test refreshing from the provider and screening without calling it"""
+    import main
+
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    path = config.fundamentals.path
+    symbols = [f"SCR{i:03d}" for i in range(60)]
+
+    async def scenario():
+        _, missing = await main.mcp.call_tool("screen_securities", {})
+        _, refreshed = await main.mcp.call_tool("refresh_fundamentals", {"symbols": symbols})
+        snapshot = main.symbol_snapshot
+        main.symbol_snapshot = None  # screens must not touch the provider
+        try:
+            _, screened = await main.mcp.call_tool("screen_securities", {
+                "sectors": ["tech", "energy"], "max_pe_ratio": 30, "limit": 5
+            })
+            _, funds = await main.mcp.call_tool("screen_securities", {
+                "quote_types": ["etf", "mutual"], "sort_by": "pe_ratio", "limit": 60
+            })
+            compact = await main.mcp.call_tool("screen_securities", {
+                "sort_by": "pe_ratio", "descending": False, "limit": 3, "response_format": "compact"
+            })
+        finally:
+            main.symbol_snapshot = snapshot
+        return missing["result"], refreshed["result"], screened["result"], funds["result"], compact
+
+    with tempfile.TemporaryDirectory() as directory:
+        config.data_providers["synthetic"].enabled = True
+        config.fundamentals.path = os.path.join(directory, "fundamentals.npz")
+        try:
+            missing, refreshed, screened, funds, compact = asyncio.run(scenario())
+        finally:
+            config.data_providers["synthetic"].enabled = synthetic_enabled
+            config.fundamentals.path = path
+
+    assert missing["status"] == "error"
+    assert refreshed["status"] == "success" and refreshed["securities"] == 60 and not refreshed["missing"]
+    assert screened["status"] == "success" and 0 < screened["matches"] < 60
+    results = screened["results"]
+    assert all(row["sector"] in ("Technology", "Energy") and row["pe_ratio"] <= 30 for row in results)
+    assert [row["market_cap"] for row in results] == sorted((row["market_cap"] for row in results), reverse=True)
+    assert funds["status"] == "success" and 0 < funds["matches"] < 60
+    assert all(row["quote_type"] in ("ETF", "MUTUALFUND") for row in funds["results"])
+    assert all(row["sector"] == "N/A" and row["category"] != "N/A" for row in funds["results"])
+    assert '"pe_ratio":[' in compact.content[0].text
+    print(f"✅ Screen found {screened['matches']} of {refreshed['securities']} securities")
+
+
+if __name__ == "__main__":
+    test_screens_match_brute_force()
+    test_save_load_and_merge()
+    test_screen_tools()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent load generator
+"""
+
+import asyncio
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from loadgen import WORKFLOW, run_load
+
+
+def test_stdio_sessions_replay_workflow(tmp_path):
+    """Test concurrent stdio sessions replay the whole workflow against synthetic data"""
+    summary = asyncio.run(run_load(
+        transport="stdio",
+        sessions=2,
+        rate=20.0,
+        duration=None,
+        workflows=4,
+        server_command=[sys.executable, "main.py", "--transport", "stdio", "--synthetic", "--data-dir", str(tmp_path)]
+    ))
+    assert summary["session_failures"] == []
+    assert summary["workflows_completed"] == 4, summary["error_samples"]
+    for tool in WORKFLOW:
+        entry = summary["tools"][tool]
+        assert entry["calls"] == 4 and entry["errors"] == 0
+        assert 0 < entry["latency_ms"]["p50"] <= entry["latency_ms"]["p99"] <= entry["latency_ms"]["max"]
+    assert summary["workflows_per_second"] > 0
+    print(f"✅ {summary['workflows_completed']} workflows replayed at {summary['workflows_per_second']:.1f}/s")
+
+
+
+def test_streamable_http_sessions_connect(tmp_path):
+    """Test the streamable HTTP transport against a server started on a free port"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "main.py", "--transport", "streamable-http", "--host", "127.0.0.1",
+         "--port", str(port), "--synthetic", "--data-dir", str(tmp_path)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=1)
+                break
+            except OSError:
+                assert server.poll() is None and time.time() < deadline, "server did not start"
+                time.sleep(0.2)
+        summary = asyncio.run(run_load(
+            transport="streamable-http",
+            url=f"http://127.0.0.1:{port}/mcp",
+            sessions=1,
+            rate=20.0,
+            duration=None,
+            workflows=1
+        ))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    assert summary["session_failures"] == []
+    assert summary["workflows_completed"] == 1, summary["error_samples"]
+    print("✅ Streamable HTTP sessions replay the workflow")
+
+
+if __name__ == "__main__":
+    test_stdio_sessions_replay_workflow(tempfile.mkdtemp(prefix="loadgen-"))
+    test_streamable_http_sessions_connect(tempfile.mkdtemp(prefix="loadgen-"))
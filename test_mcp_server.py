@@ -4,12 +4,15 @@ Test script to verify the MCP server functionality
 This script tests the actual MCP server by running it and verifying tool responses.
 """
 
+import os
 import subprocess
 import time
 import json
 import sys
 from datetime import datetime
 
+from config import config
+
 def test_server_startup():
     """Test if the MCP server starts successfully"""
     print("🚀 Testing MCP Server Startup...")
@@ -17,7 +20,7 @@ def test_server_startup():
     try:
         # Start the server in a subprocess
         process = subprocess.Popen(
-            [sys.executable, "main.py"],
+            [sys.executable, "main.py", "--data-dir", os.path.dirname(config.storage.client_db_path)],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True
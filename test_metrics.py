@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for tool latency and throughput metrics
+"""
+
+import asyncio
+import os
+import tempfile
+
+from executor import run_cpu
+from metrics import MetricsRegistry, instrument, registry, stage
+
+
+def _sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.split()[-1])
+    return 0.0
+
+
+def test_calls_errors_and_stages():
+    """Test calls, error statuses and stages run on the CPU pool are attributed to the tool"""
+    def estimate():
+        with stage("estimation"):
+            return sum(range(1000))
+
+    @instrument
+    async def metered_tool(fail: bool = False):
+        await run_cpu(estimate)
+        if fail:
+            return {"status": "error", "message": "bad input"}
+        return {"status": "success"}
+
+    async def scenario():
+        await metered_tool()
+        await metered_tool()
+        await metered_tool(fail=True)
+
+    asyncio.run(scenario())
+    text = registry.render()
+    assert _sample(text, 'mcp_tool_calls_total{tool="metered_tool"}') == 3
+    assert _sample(text, 'mcp_tool_errors_total{tool="metered_tool"}') == 1
+    assert _sample(text, 'mcp_tool_latency_seconds_count{tool="metered_tool"}') == 3
+    assert _sample(text, 'mcp_tool_latency_seconds_bucket{tool="metered_tool",le="+Inf"}') == 3
+    assert _sample(text, 'mcp_tool_stage_seconds_count{stage="estimation",tool="metered_tool"}') == 3
+    assert "# TYPE mcp_tool_latency_seconds histogram" in text
+    print("✅ Calls, errors and stages are recorded")
+
+
+def test_shared_snapshots_merge():
+    """Test a scrape on one worker reports the totals of every worker"""
+    with tempfile.TemporaryDirectory() as tmp:
+        workers = []
+        for calls in (2, 5):
+            worker = MetricsRegistry()
+            worker.counter("calls_total", "Calls")
+            worker.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+            worker.share(tmp)
+            for _ in range(calls):
+                worker.inc("calls_total", {"tool": "build_portfolio"})
+                worker.observe("latency_seconds", 0.5, {"tool": "build_portfolio"})
+            workers.append(worker)
+
+        # Stand-in for the second process: its snapshot lands under another pid
+        workers[1].flush(force=True)
+        os.replace(os.path.join(tmp, f"{os.getpid()}.json"), os.path.join(tmp, "other.json"))
+
+        text = workers[0].render()
+        assert _sample(text, 'calls_total{tool="build_portfolio"}') == 7
+        assert _sample(text, 'latency_seconds_bucket{tool="build_portfolio",le="0.1"}') == 0
+        assert _sample(text, 'latency_seconds_bucket{tool="build_portfolio",le="1"}') == 7
+        assert _sample(text, 'latency_seconds_count{tool="build_portfolio"}') == 7
+    print("✅ Worker snapshots are merged")
+
+
+def test_server_tools_are_metered():
+    """Test tools called through the server record latency and serialization time"""
+    import main
+
+    async def scenario():
+        await main.mcp.call_tool("adjust_portfolio", {
+            "client_name": "Nobody", "current_portfolio": {"VTI": 1.0}, "adjustments": "none"
+        })
+
+    asyncio.run(scenario())
+    text = registry.render()
+    assert _sample(text, 'mcp_tool_errors_total{tool="adjust_portfolio"}') >= 1
+    assert _sample(text, 'mcp_tool_stage_seconds_count{stage="serialization",tool="adjust_portfolio"}') >= 1
+    assert any(getattr(route, "path", None) == main.config.metrics.path for route in main.mcp._custom_starlette_routes)
+    print("✅ Server tools are metered")
+
+
+if __name__ == "__main__":
+    test_calls_errors_and_stages()
+    test_shared_snapshots_merge()
+    test_server_tools_are_metered()
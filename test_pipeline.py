@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for dependency-graph pipelines with checkpoint/resume
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+
+from pipeline import Pipeline, StageFailed, fan_out
+
+
+def _pipeline(calls, fail_in=None):
+    pipeline = Pipeline("test")
+    running = set()
+
+    async def step(name, value):
+        calls.append(name)
+        running.add(name)
+        await asyncio.sleep(0.02)
+        concurrent = set(running)
+        running.discard(name)
+        if name == fail_in:
+            raise RuntimeError(f"{name} broke")
+        return {"value": value, "concurrent": concurrent}
+
+    @pipeline.stage()
+    async def load():
+        return await step("load", 1)
+
+    @pipeline.stage(depends_on=["load"])
+    async def left(load):
+        return await step("left", load["value"] + 1)
+
+    @pipeline.stage(depends_on=["load"])
+    async def right(load):
+        return await step("right", load["value"] + 2)
+
+    @pipeline.stage(depends_on=["left", "right"])
+    async def combine(left, right):
+        return await step("combine", left["value"] + right["value"])
+
+    return pipeline
+
+
+def test_stages_run_in_dependency_order_and_concurrently():
+    """Test dependents wait for their inputs, independent stages overlap, and fan_out keeps order"""
+    calls = []
+    with tempfile.TemporaryDirectory() as run_dir:
+        results = asyncio.run(_pipeline(calls).run(run_dir))
+        with open(os.path.join(run_dir, "manifest.json"), "r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+
+    assert calls[0] == "load" and calls[-1] == "combine" and set(calls[1:3]) == {"left", "right"}
+    assert {"left", "right"} <= results["left"]["concurrent"]
+    assert results["combine"]["value"] == 5
+    assert all(status["status"] == "done" for status in manifest["stages"].values())
+
+    async def double(x):
+        await asyncio.sleep(0.01 * (5 - x))
+        return 2 * x
+
+    assert asyncio.run(fan_out(range(5), double, limit=2)) == [0, 2, 4, 6, 8]
+    print(f"✅ Stage order {calls}")
+
+
+def test_resume_after_failure_skips_finished_stages():
+    """Test a failed run keeps finished stages and the next run resumes without redoing them"""
+    with tempfile.TemporaryDirectory() as run_dir:
+        calls = []
+        try:
+            asyncio.run(_pipeline(calls, fail_in="right").run(run_dir))
+            assert False, "right should fail"
+        except StageFailed as e:
+            assert e.stage == "right"
+        assert "combine" not in calls
+
+        resumed = []
+        results = asyncio.run(_pipeline(resumed).run(run_dir))
+        with open(os.path.join(run_dir, "manifest.json"), "r", encoding="utf-8") as handle:
+            stages = json.load(handle)["stages"]
+
+        fresh = []
+        asyncio.run(_pipeline(fresh).run(run_dir, resume=False))
+
+    assert resumed == ["right", "combine"]
+    assert stages["load"]["resumed"] and stages["left"]["resumed"]
+    assert results["combine"]["value"] == 5
+    assert fresh[0] == "load" and len(fresh) == 4
+    print(f"✅ Resumed with {resumed}")
+
+
+if __name__ == "__main__":
+    test_stages_run_in_dependency_order_and_concurrently()
+    test_resume_after_failure_skips_finished_stages()
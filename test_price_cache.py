@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared on-disk price cache
+"""
+
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from price_cache import PriceCache
+
+
+def _series():
+    dates = np.arange("2024-01-01", "2024-03-01", dtype="datetime64[D]")
+    return dates, np.linspace(100.0, 110.0, len(dates))
+
+
+def test_round_trip_is_memory_mapped():
+    """Test entries come back memory-mapped and unchanged"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PriceCache(tmp)
+        dates, prices = _series()
+        cache.put("VTI", dates, prices, period="2y")
+
+        cached_dates, cached_prices = cache.get("VTI", period="2y")
+        assert isinstance(cached_prices, np.memmap)
+        assert np.array_equal(cached_dates, dates)
+        assert np.array_equal(cached_prices, prices)
+        assert cache.get("VTI", period="5y") is None
+    print("✅ Cache round trip works")
+
+
+def test_expiry():
+    """Test open windows expire and closed windows are kept longer"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PriceCache(tmp, max_age_seconds=60, closed_max_age_seconds=86400)
+        dates, prices = _series()
+        cache.put("VTI", dates, prices, period="1y")
+        cache.put("VTI", dates, prices, start="2024-01-01", end="2024-03-01")
+
+        an_hour_ago = time.time() - 3600
+        for path in (cache.entry_path("VTI", period="1y"),
+                     cache.entry_path("VTI", start="2024-01-01", end="2024-03-01")):
+            os.utime(path, (an_hour_ago, an_hour_ago))
+
+        assert cache.get("VTI", period="1y") is None
+        assert cache.get("VTI", start="2024-01-01", end="2024-03-01") is not None
+    print("✅ Cache expiry works")
+
+
+def test_concurrent_misses_fetch_once():
+    """Test concurrent requests for one window share a single download"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PriceCache(tmp)
+        calls = []
+        lock = threading.Lock()
+
+        def fetch():
+            with lock:
+                calls.append(1)
+            time.sleep(0.2)
+            return _series()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: cache.get_or_fetch("BND", fetch, period="2y"), range(8)))
+
+        assert len(calls) == 1
+        assert all(len(prices) == len(_series()[1]) for _, prices in results)
+        assert cache.stats["misses"] == 1
+    print("✅ Concurrent misses fetch once")
+
+
+if __name__ == "__main__":
+    test_round_trip_is_memory_mapped()
+    test_expiry()
+    test_concurrent_misses_fetch_once()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for opt-in per-call profiling
+"""
+
+import asyncio
+import glob
+import os
+import tempfile
+
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from mcp.types import RequestParams
+
+from executor import run_cpu
+from profiling import profiled
+
+
+def _busy_estimation():
+    total = 0.0
+    for i in range(2_000_000):
+        total += i * 0.5
+    return total
+
+
+async def slow_backtest():
+    await run_cpu(_busy_estimation)
+    return {"status": "success"}
+
+
+def test_named_tool_writes_collapsed_stacks():
+    """Test every call to a named tool writes a flame-graph file covering pool threads"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = profiled(slow_backtest, tmp, tools=["slow_backtest"], interval_seconds=0.001)
+        result = asyncio.run(tool())
+        assert result == {"status": "success"}
+
+        files = glob.glob(os.path.join(tmp, "slow_backtest-*.collapsed"))
+        assert len(files) == 1
+        with open(files[0], encoding="utf-8") as handle:
+            lines = handle.read().splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+        assert any(line.startswith("cpu-worker") and "_busy_estimation" in line for line in lines)
+    print("✅ Named tools are profiled across threads")
+
+
+def test_unselected_calls_are_not_profiled():
+    """Test calls that are not selected write nothing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = profiled(slow_backtest, tmp, sample_rate=0.0, tools=["other_tool"])
+        assert asyncio.run(tool()) == {"status": "success"}
+        assert os.listdir(tmp) == []
+    print("✅ Unselected calls are not profiled")
+
+
+def test_request_flag():
+    """Test a client can ask for a profile through the request _meta"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tool = profiled(slow_backtest, tmp, interval_seconds=0.001)
+
+        async def flagged_call():
+            request = RequestContext(
+                request_id=1,
+                meta=RequestParams.Meta(profile=True),
+                session=None,
+                lifespan_context=None
+            )
+            token = request_ctx.set(request)
+            try:
+                return await tool()
+            finally:
+                request_ctx.reset(token)
+
+        result = asyncio.run(flagged_call())
+        assert result["status"] == "success"
+        assert os.path.exists(result["profile"]["path"])
+        assert result["profile"]["samples"] > 0
+    print("✅ Request flag enables profiling")
+
+
+if __name__ == "__main__":
+    test_named_tool_writes_collapsed_stacks()
+    test_unselected_calls_are_not_profiled()
+    test_request_flag()
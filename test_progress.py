@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for progress notifications and partial results
+"""
+
+import asyncio
+import os
+import sys
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from config import config
+
+SERVER = StdioServerParameters(
+    command=sys.executable,
+    # The same data directory as this process, a temporary one under pytest
+    args=["main.py", "--transport", "stdio", "--synthetic", "--data-dir", os.path.dirname(config.storage.client_db_path)],
+    cwd=os.path.dirname(os.path.abspath(__file__))
+)
+SYMBOLS = ["VTI", "BND", "VEA", "VWO", "QQQ"]
+
+
+async def _call_with_progress(tool, arguments, meta=None):
+    """Call a tool over stdio, collecting its progress and partial result notifications"""
+    progress = []
+    partials = []
+
+    async def on_progress(done, total, message):
+        progress.append((done, total, message))
+
+    async def on_log(params):
+        if params.logger == "partial_result":
+            partials.append(params.data)
+
+    async with stdio_client(SERVER) as (read, write):
+        async with ClientSession(read, write, logging_callback=on_log) as session:
+            await session.initialize()
+            result = await session.call_tool(tool, arguments, progress_callback=on_progress, meta=meta)
+    return result.structuredContent["result"], progress, partials
+
+
+def test_backtest_reports_fetch_progress():
+    """Test a backtest reports one step per fetched symbol, then completion"""
+    result, progress, partials = asyncio.run(_call_with_progress(
+        "backtest_portfolio",
+        {"portfolio": {symbol: 0.2 for symbol in SYMBOLS}, "start_date": "2015-01-01", "end_date": "2020-01-01"}
+    ))
+    assert result["status"] == "success"
+    assert [done for done, _, _ in progress] == list(range(1, len(SYMBOLS) + 2))
+    assert all(total == len(SYMBOLS) + 1 for _, total, _ in progress)
+    assert progress[0][2] == f"Fetched 1/{len(SYMBOLS)} symbols"
+    assert progress[-1][2] == "Backtest done"
+    assert partials == []  # not requested
+    print(f"✅ Backtest reported {len(progress)} progress steps")
+
+
+def test_market_data_streams_partial_results():
+    """Test market data streams each symbol before the final result when asked to"""
+    result, progress, partials = asyncio.run(_call_with_progress(
+        "get_market_data", {"symbols": SYMBOLS}, meta={"partial_results": True}
+    ))
+    assert result["status"] == "success"
+    assert sorted(partial["symbol"] for partial in partials) == sorted(SYMBOLS)
+    for partial in partials:
+        assert partial["tool"] == "get_market_data"
+        assert partial["data"] == result["data"][partial["symbol"]]
+    assert progress[-1][:2] == (len(SYMBOLS), len(SYMBOLS))
+    print(f"✅ Streamed {len(partials)} symbols as partial results")
+
+
+if __name__ == "__main__":
+    test_backtest_reports_fetch_progress()
+    test_market_data_streams_partial_results()
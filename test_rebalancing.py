@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tests for tax-lot-aware rebalancing
+"""
+
+import asyncio
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from config import config
+from rebalancing import plan_rebalance
+
+TODAY = date(2026, 6, 30)
+
+
+def _days_ago(days):
+    return (TODAY - timedelta(days=days)).isoformat()
+
+
+def _plan(lots, prices, target, loss_sales=(), turnover_limit=1.0, cash=0.0):
+    return plan_rebalance(lots, prices, target, TODAY, set(loss_sales), turnover_limit, 0.37, 0.20, 365, 30, 0.0, cash)
+
+
+def test_lot_selection_order_wash_sales_and_turnover():
+    """Test losses are harvested first, wash-sale lots are skipped and turnover is capped"""
+    lots = [
+        (1, "AAA", 10, 50.0, _days_ago(400)),   # long-term gain of 50/share
+        (2, "AAA", 10, 90.0, _days_ago(100)),   # short-term gain of 10/share
+        (3, "AAA", 10, 120.0, _days_ago(500)),  # long-term loss
+        (4, "AAA", 10, 130.0, _days_ago(200)),  # short-term loss: the most valuable sale
+        (5, "BBB", 10, 150.0, _days_ago(10)),   # loss bought 10 days ago: selling is a wash sale
+        (6, "CCC", 1, 100.0, _days_ago(800))
+    ]
+    prices = {"AAA": 100.0, "BBB": 100.0, "CCC": 100.0, "DDD": 100.0}
+    plan = _plan(lots, prices, {"AAA": 0.2, "CCC": 0.4, "DDD": 0.4}, loss_sales={"DDD"})
+
+    sold = [(sale["lot_id"], round(sale["quantity"], 6)) for sale in plan["lot_sales"]]
+    assert sold == [(2, 9.8), (3, 10.0), (4, 10.0)]  # AAA sheds 2,980; the long-term gain is the dearest lot
+    assert np.isclose(plan["realized_gain"]["short_term"], 9.8 * 10 - 10 * 30)
+    assert np.isclose(plan["realized_gain"]["long_term"], -10 * 20)
+    assert plan["deferred"]["wash_sale_sells"] == {"BBB": 1000.0}
+    assert "DDD" in plan["deferred"]["wash_sale_buys"]
+    assert {trade["symbol"] for trade in plan["trades"] if trade["side"] == "buy"} == {"CCC"}
+
+    capped = _plan(lots, prices, {"AAA": 0.2, "CCC": 0.4, "DDD": 0.4}, turnover_limit=0.1)
+    assert np.isclose(capped["turnover"], 0.1) and capped["deferred"]["turnover_limit"]
+    assert [sale["lot_id"] for sale in capped["lot_sales"]] == [4]  # the cap still sells the best lot first
+    print(f"✅ Sold lots {sold}, tax {plan['estimated_tax']:.2f}")
+
+
+def test_vectorized_selection_matches_greedy_and_is_fast():
+    """Test the vectorized fill equals a per-symbol greedy loop, on an account with 20,000 lots"""
+    rng = np.random.default_rng(4)
+    symbols = [f"S{i:02d}" for i in range(40)]
+    prices = {symbol: float(rng.uniform(20, 200)) for symbol in symbols}
+    lots = [
+        (i, symbols[rng.integers(40)], float(rng.uniform(1, 50)), float(rng.uniform(20, 200)), _days_ago(int(rng.integers(31, 1500))))
+        for i in range(20000)
+    ]
+    target = {symbol: 1 / 20 for symbol in symbols[:20]}
+
+    started = time.perf_counter()
+    plan = _plan(lots, prices, target, turnover_limit=0.3)
+    elapsed = time.perf_counter() - started
+
+    holdings = {symbol: 0.0 for symbol in symbols}
+    for _, symbol, quantity, _, _ in lots:
+        holdings[symbol] += quantity * prices[symbol]
+    total = sum(holdings.values())
+    excess = {symbol: max(value - target.get(symbol, 0.0) * total, 0.0) for symbol, value in holdings.items()}
+    scale = min(1.0, 0.3 * total / sum(excess.values()))
+    expected = {}
+    for symbol in symbols:
+        need = excess[symbol] * scale
+        ranked = sorted(
+            (lot for lot in lots if lot[1] == symbol),
+            key=lambda lot: (0.20 if (TODAY - date.fromisoformat(lot[4])).days > 365 else 0.37) * (prices[symbol] - lot[3]) / prices[symbol]
+        )
+        for lot_id, _, quantity, _, _ in ranked:
+            if need <= 1e-9:
+                break
+            value = min(need, quantity * prices[symbol])
+            expected[lot_id] = value
+            need -= value
+
+    actual = {sale["lot_id"]: sale["proceeds"] for sale in plan["lot_sales"]}
+    assert actual.keys() == expected.keys()
+    assert np.allclose([actual[lot_id] for lot_id in expected], list(expected.values()))
+    assert elapsed < 0.5
+    print(f"✅ {len(lots)} lots planned in {elapsed * 1000:.1f} ms, {len(actual)} lots sold")
+
+
+def test_execute_updates_lots_and_blocks_wash_sale_buys():
+    """Test a dry run leaves lots alone, execution books the trades, and loss sales block buying back"""
+    import main
+
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+    name = "Lot Holder"
+
+    async def scenario():
+        await main.mcp.call_tool("create_client_profile", {
+            "name": name, "age": 60, "risk_tolerance": "conservative",
+            "investment_horizon": 5, "capital": 50000.0
+        })
+        prices = await main._latest_prices(["QQQ", "BND"])
+        _, recorded = await main.mcp.call_tool("record_tax_lots", {"client_name": name, "replace": True, "lots": [
+            {"symbol": "QQQ", "quantity": 100, "cost_basis": prices["QQQ"] * 1.5, "acquired": str(date.today() - timedelta(days=90))},
+            {"symbol": "BND", "quantity": 10, "cost_basis": prices["BND"], "acquired": str(date.today() - timedelta(days=400))}
+        ]})
+        assert recorded["result"]["recorded"] == 2
+        before = main.tax_lots.lots(name)
+        _, dry = await main.mcp.call_tool("rebalance_tax_aware", {"client_name": name, "turnover_limit": 1.0})
+        assert main.tax_lots.lots(name) == before
+        _, done = await main.mcp.call_tool("rebalance_tax_aware", {"client_name": name, "turnover_limit": 1.0, "execute": True})
+        after = main.tax_lots.lots(name)
+        _, again = await main.mcp.call_tool("rebalance_tax_aware", {
+            "client_name": name, "target_portfolio": {"QQQ": 0.5, "BND": 0.5}
+        })
+        _, book = await main.mcp.call_tool("rebalance_tax_aware", {})
+        assert book["result"]["status"] == "success" and not book["result"]["executed"]
+        assert name in {client["client_name"] for client in book["result"]["clients"]}
+        return dry["result"], done["result"], after, again["result"]
+
+    try:
+        dry, done, after, again = asyncio.run(scenario())
+    finally:
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+
+    assert dry["status"] == "success" and not dry["executed"]
+    assert done["lot_sales"][0]["symbol"] == "QQQ" and done["realized_gain"]["short_term"] < 0
+    assert "QQQ" not in {lot[1] for lot in after}
+    assert {trade["symbol"] for trade in done["trades"] if trade["side"] == "buy"} <= {lot[1] for lot in after}
+    assert "QQQ" in again["deferred"]["wash_sale_buys"]
+    assert "QQQ" not in {trade["symbol"] for trade in again["trades"]}
+    print(f"✅ Harvested {-done['realized_gain']['total']:,.0f} of losses; QQQ buy-back deferred")
+
+
+def test_trades_on_a_vanished_lot_roll_back():
+    """Test selling a lot deleted after planning names the lot and applies none of the trades"""
+    import os
+    import tempfile
+
+    from lots import LotStore
+
+    store = LotStore(os.path.join(tempfile.mkdtemp(), "lots.db"))
+    store.add_lots("Client", [
+        {"symbol": "AAA", "quantity": 10, "cost_basis": 100.0, "acquired": _days_ago(400)},
+        {"symbol": "BBB", "quantity": 5, "cost_basis": 50.0, "acquired": _days_ago(400)}
+    ])
+    gone = store.lots("Client")[1][0]
+    store.add_lots("Client", [{"symbol": "AAA", "quantity": 10, "cost_basis": 100.0, "acquired": _days_ago(400)}], replace=True)
+    before = store.lots("Client")
+
+    try:
+        store.apply_trades("Client", [(before[0][0], 4.0, 380.0, -20.0), (gone, 5.0, 300.0, 50.0)], [("CCC", 1.0, 10.0)], TODAY.isoformat())
+    except ValueError as exc:
+        assert str(gone) in str(exc)
+    else:
+        raise AssertionError("selling a vanished lot should fail")
+    assert store.lots("Client") == before
+    assert store.loss_sales_since("Client", "2000-01-01") == set()
+    print(f"✅ Trades on vanished lot {gone} rolled back")
+
+
+if __name__ == "__main__":
+    test_lot_selection_order_wash_sales_and_turnover()
+    test_vectorized_selection_matches_greedy_and_is_fast()
+    test_execute_updates_lots_and_blocks_wash_sale_buys()
+    test_trades_on_a_vanished_lot_roll_back()
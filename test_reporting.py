@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Offline tests for report rendering and book-wide batch generation
+"""
+
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from reporting import generate_reports, portfolio_metrics, render_investment_report
+
+
+def _profile(name, risk_tolerance="moderate"):
+    return {
+        "name": name,
+        "age": 40,
+        "risk_tolerance": risk_tolerance,
+        "investment_horizon": 10,
+        "capital": 250000.0,
+        "esg_preference": False,
+        "sector_preferences": []
+    }
+
+
+def test_render_report():
+    """Test single report rendering with and without metrics"""
+    portfolio = {"VTI": 0.6, "BND": 0.4}
+    report = render_investment_report(_profile("Alice"), portfolio)
+    assert "Client: Alice" in report
+    assert "VTI: 60.0%" in report
+    assert "PORTFOLIO METRICS" not in report
+
+    metrics = {"expected_return": 0.07, "volatility": 0.12, "sharpe_ratio": 0.58}
+    report = render_investment_report(_profile("Alice"), portfolio, metrics)
+    assert "Expected Return: 7.00%" in report
+    print("✅ Report rendering works")
+
+
+def test_portfolio_metrics():
+    """Test metrics computed from shared annualized statistics"""
+    market_stats = {
+        "index": {"VTI": 0, "BND": 1},
+        "mean": np.array([0.08, 0.03]),
+        "cov": np.array([[0.04, 0.0], [0.0, 0.01]])
+    }
+    metrics = portfolio_metrics({"VTI": 0.5, "BND": 0.5}, market_stats)
+    assert abs(metrics["expected_return"] - 0.055) < 1e-12
+    assert abs(metrics["volatility"] - np.sqrt(0.0125)) < 1e-12
+    assert portfolio_metrics({"QQQ": 1.0}, market_stats) is None
+    print("✅ Shared portfolio metrics work")
+
+
+def test_generate_reports():
+    """Test directory and archive output of a batch run"""
+    profiles = {f"Client {i}": _profile(f"Client {i}") for i in range(12)}
+    portfolios = {name: {"VTI": 0.5, "BND": 0.5} for name in profiles}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        summary = generate_reports(profiles, portfolios, output_dir, max_workers=2)
+        assert summary["reports_written"] == 12
+        assert not summary["failed"]
+        assert summary["latency_ms"]["p50"] <= summary["latency_ms"]["p99"]
+        assert len(os.listdir(output_dir)) == 12
+
+        summary = generate_reports(profiles, portfolios, output_dir, archive=True, max_workers=2)
+        with zipfile.ZipFile(summary["output"]) as bundle:
+            assert len(bundle.namelist()) == 12
+    print("✅ Batch report generation works")
+
+
+if __name__ == "__main__":
+    test_render_report()
+    test_portfolio_metrics()
+    test_generate_reports()
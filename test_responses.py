@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact, columnar response format
+"""
+
+import asyncio
+import math
+
+from config import config
+from responses import mapping_columns, page, record_columns, round_floats
+
+
+def _unpack(response):
+    """(text, result) from either a (content, structured) pair or a CallToolResult"""
+    if isinstance(response, tuple):
+        content, structured = response
+    else:
+        content, structured = response.content, response.structuredContent
+    return content[0].text, structured["result"]
+
+
+def test_columnar_helpers():
+    """Test rounding, parallel arrays and paging"""
+    assert round_floats({"a": [1.234567, math.nan], "b": "x", "c": 3}, 3) == {"a": [1.23, None], "b": "x", "c": 3}
+    assert round_floats(0.000123456, 2) == 0.00012
+    assert mapping_columns({"VTI": 0.61234, "BND": 0.38766}, precision=2) == {
+        "symbols": ["VTI", "BND"], "weights": [0.61, 0.39]
+    }
+    records = [{"price": 10.126, "sector": "Tech"}, {"price": 20.0, "sector": None}]
+    assert record_columns(records, precision=3) == {"price": [10.1, 20.0], "sector": ["Tech", None]}
+
+    items, paging = page(list(range(10)), offset=4, limit=4)
+    assert items == [4, 5, 6, 7] and paging == {"offset": 4, "total": 10, "next_offset": 8}
+    items, paging = page(list(range(10)), offset=8, limit=4)
+    assert items == [8, 9] and "next_offset" not in paging
+    print("✅ Columnar helpers work")
+
+
+def test_compact_tools_shrink_payloads():
+    """Test compact responses drop echoed inputs and are several times smaller"""
+    import main
+
+    symbols = [f"CMP{i:03d}" for i in range(300)]
+    config.data_providers["synthetic"].enabled = True
+    cache_enabled = config.price_cache.enabled
+    config.price_cache.enabled = False
+
+    async def scenario():
+        await main.mcp.call_tool("create_client_profile", {
+            "name": "Compact Client", "age": 50, "risk_tolerance": "moderate",
+            "investment_horizon": 10, "capital": 250000.0
+        })
+        results = {}
+        for response_format in ("json", "compact"):
+            for tool, arguments in (
+                ("build_portfolio", {"client_name": "Compact Client", "asset_universe": symbols}),
+                ("get_market_data", {"symbols": symbols})
+            ):
+                results[tool, response_format] = _unpack(await main.mcp.call_tool(
+                    tool, {**arguments, "response_format": response_format}
+                ))
+        paged = await main.mcp.call_tool("get_market_data", {
+            "symbols": symbols, "response_format": "compact", "limit": 100, "offset": 100
+        })
+        invalid = await main.mcp.call_tool("build_portfolio", {
+            "client_name": "Compact Client", "response_format": "xml"
+        })
+        return results, _unpack(paged)[1], _unpack(invalid)[1]
+
+    try:
+        results, paged, invalid = asyncio.run(scenario())
+    finally:
+        config.data_providers["synthetic"].enabled = False
+        config.price_cache.enabled = cache_enabled
+
+    built = results["build_portfolio", "compact"][1]
+    assert "client_profile" not in built
+    assert built["symbols"] == symbols and abs(sum(built["weights"]) - 1) < 1e-3
+    for tool in ("build_portfolio", "get_market_data"):
+        assert len(results[tool, "json"][0]) > 1.8 * len(results[tool, "compact"][0]), tool
+
+    market = results["get_market_data", "compact"][1]
+    assert len(market["symbols"]) == len(market["current_price"]) == 300
+    assert paged["symbols"] == symbols[100:200] and paged["next_offset"] == 200
+    assert invalid["status"] == "error"
+    print("✅ Compact responses are smaller")
+
+
+if __name__ == "__main__":
+    test_columnar_helpers()
+    test_compact_tools_shrink_payloads()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for tool-result memoization
+"""
+
+import asyncio
+import time
+
+from config import config
+from metrics import registry
+from result_cache import ResultCache
+
+
+def _counter(series, **expected):
+    for name, labels, value in registry.snapshot()["counters"]:
+        if name == series and dict(labels) == expected:
+            return value
+    return 0.0
+
+
+def _hits():
+    return _counter("mcp_cache_requests_total", cache="results", result="hit")
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    """Test the least recently used entries are evicted past either bound"""
+    cache = ResultCache(max_entries=3, max_bytes=100)
+    for key in "abc":
+        cache.put(key, key.upper(), 10)
+    assert cache.get("a") == "A"  # "b" is now least recently used
+    cache.put("d", "D", 10)
+    assert cache.get("b") is None and len(cache) == 3
+
+    cache.put("e", "E", 81)
+    assert cache.get("a") is None and cache.get("c") is None
+    assert cache.size == 91 and cache.get("d") == "D" and cache.get("e") == "E"
+
+    cache.put("huge", "H", 101)
+    assert cache.get("huge") is None and len(cache) == 2
+    print("✅ LRU eviction respects entry and byte bounds")
+
+
+def test_repeated_calls_hit_until_inputs_or_data_change():
+    """Test repeats are served from the cache and new data or a changed profile invalidate them"""
+    import main
+    from market_data import active_provider
+
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+    main.mcp.results.clear()
+    portfolio = {"VTI": 0.5, "BND": 0.3, "VEA": 0.2}
+    backtest = {"portfolio": portfolio, "start_date": "2012-01-01", "end_date": "2020-01-01"}
+
+    async def scenario():
+        profile = {"name": "Memo Client", "age": 40, "risk_tolerance": "moderate",
+                   "investment_horizon": 10, "capital": 100000.0}
+        await main.mcp.call_tool("create_client_profile", profile)
+        hits = _hits()
+
+        first = await main.mcp.call_tool("backtest_portfolio", backtest)
+        calls = _counter("mcp_tool_calls_total", tool="backtest_portfolio")
+        tool_hits = _counter("mcp_tool_cache_hits_total", tool="backtest_portfolio")
+        started = time.perf_counter()
+        # Same arguments spelled differently: defaults filled in, keys reordered
+        repeat = await main.mcp.call_tool("backtest_portfolio", {
+            **backtest, "portfolio": dict(reversed(list(portfolio.items()))), "response_format": "json"
+        })
+        hit_seconds = time.perf_counter() - started
+        assert repeat is first and _hits() == hits + 1
+        # Hits still count as calls of the tool, so its call count and latency include them
+        assert _counter("mcp_tool_calls_total", tool="backtest_portfolio") == calls + 1
+        assert _counter("mcp_tool_cache_hits_total", tool="backtest_portfolio") == tool_hits + 1
+
+        built = await main.mcp.call_tool("build_portfolio", {"client_name": "Memo Client"})
+        assert await main.mcp.call_tool("build_portfolio", {"client_name": "Memo Client"}) is built
+        await main.mcp.call_tool("create_client_profile", {**profile, "risk_tolerance": "aggressive"})
+        rebuilt = await main.mcp.call_tool("build_portfolio", {"client_name": "Memo Client"})
+        assert rebuilt is not built
+        assert rebuilt[1]["result"]["client_profile"]["risk_tolerance"] == "aggressive"
+
+        # A new bar changes the data version
+        provider = active_provider()[1]
+        as_of = provider.as_of
+        provider.as_of = "2099-01-01"
+        try:
+            assert await main.mcp.call_tool("backtest_portfolio", backtest) is not first
+        finally:
+            provider.as_of = as_of
+
+        failed = await main.mcp.call_tool("backtest_portfolio", {"portfolio": {"VTI": 1.0}, "start_date": "bad"})
+        assert failed[1]["result"]["status"] == "error"
+        assert await main.mcp.call_tool("backtest_portfolio", {"portfolio": {"VTI": 1.0}, "start_date": "bad"}) is not failed
+        return hit_seconds
+
+    try:
+        hit_seconds = asyncio.run(scenario())
+    finally:
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+        main.mcp.results.clear()
+    assert hit_seconds < 0.005
+    print(f"✅ Repeated backtest served in {hit_seconds * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    test_lru_eviction_by_entries_and_bytes()
+    test_repeated_calls_hit_until_inputs_or_data_change()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the vectorized VaR and CVaR engine
+"""
+
+import asyncio
+
+import numpy as np
+
+import risk
+from config import config
+
+
+def test_batch_matches_per_portfolio_calculation():
+    """Test batched historical VaR equals sorting each portfolio's losses, and the methods agree on normal data"""
+    rng = np.random.default_rng(11)
+    covariance = np.array([[1.0, 0.3, 0.1], [0.3, 1.5, 0.2], [0.1, 0.2, 0.8]]) * 1e-4
+    returns = rng.multivariate_normal([0.0004, 0.0002, 0.0003], covariance, size=2000)
+    weights = rng.dirichlet(np.ones(3), size=50)
+    levels, horizons = [0.95, 0.99], [1, 5]
+
+    tables = risk.value_at_risk(returns, weights, levels, horizons, simulations=20000, seed=3)
+    var, cvar = tables["historical"]
+    assert var.shape == (2, 2, 50)
+    for p in (0, 17, 49):
+        daily = returns @ weights[p]
+        five_day = np.array([np.prod(1 + daily[t:t + 5]) - 1 for t in range(len(daily) - 4)])
+        for h, outcomes in enumerate((daily, five_day)):
+            losses = np.sort(-outcomes)[::-1]
+            for c, level in enumerate(levels):
+                tail = int(np.ceil((1 - level) * len(losses)))
+                assert np.isclose(var[h, c, p], losses[tail - 1])
+                assert np.isclose(cvar[h, c, p], losses[:tail].mean())
+
+    parametric_var, parametric_cvar = tables["parametric"]
+    simulated_var, simulated_cvar = tables["monte_carlo"]
+    assert np.all(parametric_cvar > parametric_var) and np.all(simulated_cvar > simulated_var)
+    assert np.allclose(simulated_var, parametric_var, rtol=0.1)
+    assert np.allclose(var[0], parametric_var[0], rtol=0.15)
+    print(f"✅ Batched VaR matched per-portfolio sorting for {weights.shape[0]} portfolios")
+
+
+def test_simulation_chunks_do_not_change_results():
+    """Test Monte Carlo VaR is the same whether paths are drawn at once or a few simulations at a time"""
+    rng = np.random.default_rng(5)
+    mean = np.full(4, 0.0003)
+    covariance = np.diag([1.0, 2.0, 1.5, 0.5]) * 1e-4
+    weights = rng.dirichlet(np.ones(4), size=6)
+    arguments = (mean, covariance, weights, [0.95, 0.99], [1, 10], 3000)
+
+    whole = risk.monte_carlo(*arguments, seed=9, max_chunk_values=10 ** 9)
+    chunked = risk.monte_carlo(*arguments, seed=9, max_chunk_values=7 * 10 * 4)
+    assert all(np.allclose(a, b) for a, b in zip(whole, chunked))
+    assert whole[0].shape == (2, 2, 6)
+    print("✅ Chunked simulation matched a single draw")
+
+
+def test_book_var_includes_firm_wide_risk():
+    """Test calculate_var over the book returns every client and the capital-weighted firm VaR"""
+    import main
+
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+
+    async def scenario():
+        for name, risk_tolerance, capital in (("VaR Saver", "conservative", 200000.0), ("VaR Grower", "aggressive", 800000.0)):
+            await main.mcp.call_tool("create_client_profile", {
+                "name": name, "age": 45, "risk_tolerance": risk_tolerance,
+                "investment_horizon": 15, "capital": capital
+            })
+        _, book = await main.mcp.call_tool("calculate_var", {"book": True, "methods": ["historical"], "horizons": [1]})
+        _, single = await main.mcp.call_tool("calculate_var", {"portfolio": {"VTI": 1.0}, "methods": ["nope"]})
+        return book["result"], single["result"]
+
+    try:
+        book, single = asyncio.run(scenario())
+    finally:
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+
+    assert book["status"] == "success" and {"VaR Saver", "VaR Grower"} <= set(book["portfolios"])
+    firm = book["firm"]
+    assert firm["market_value"] >= 1000000.0 and len(firm["risk"]) == len(config.risk.confidence_levels)
+    saver = book["portfolios"]["VaR Saver"][0]["var"]
+    grower = book["portfolios"]["VaR Grower"][0]["var"]
+    assert saver > 0 and grower > 0 and np.isclose(firm["risk"][0]["var_amount"], firm["risk"][0]["var"] * firm["market_value"])
+    assert single["status"] == "error" and "Unknown VaR methods" in single["message"]
+    print(f"✅ Firm 1-day VaR {firm['risk'][0]['var_amount']:,.0f} on {firm['market_value']:,.0f}")
+
+
+if __name__ == "__main__":
+    test_batch_matches_per_portfolio_calculation()
+    test_simulation_chunks_do_not_change_results()
+    test_book_var_includes_firm_wide_risk()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the factor-shock scenario engine
+"""
+
+import asyncio
+
+import numpy as np
+
+from config import config
+from scenarios import estimate_betas, scenario_returns, shock_matrix
+
+
+def test_betas_and_batched_scenarios():
+    """Test planted betas are recovered, shocks convert units, and the batch equals a per-portfolio loop"""
+    rng = np.random.default_rng(2)
+    factors = rng.normal(0, 0.01, size=(500, 2))
+    true_betas = np.array([[1.2, 0.0], [0.3, -6.0], [0.9, 1.5]])
+    returns = factors @ true_betas.T + rng.normal(0, 0.001, size=(500, 3))
+    returns[:100, 2] = np.nan  # listed later than the others
+    betas = estimate_betas(returns, factors)
+    assert np.allclose(betas, true_betas, atol=0.05)
+    assert np.isnan(estimate_betas(returns[:, [2]][90:140], factors[90:140])).all()
+
+    shocks = shock_matrix({"rates_up": {"rates": 200}, "crash": {"equities": -0.2, "rates": -50}},
+                          ["equities", "rates"], [1.0, -0.00075])
+    assert np.allclose(shocks, [[0.0, -0.15], [-0.2, 0.0375]])
+    try:
+        shock_matrix({"bad": {"gold": 0.1}}, ["equities", "rates"], [1.0, -0.00075])
+        assert False, "unknown factor should be rejected"
+    except ValueError as e:
+        assert "gold" in str(e)
+
+    weights = rng.dirichlet(np.ones(3), size=1000)
+    batched = scenario_returns(weights, betas, shocks)
+    looped = np.array([[w @ (betas @ shock) for shock in shocks] for w in weights])
+    assert batched.shape == (1000, 2) and np.allclose(batched, looped)
+    print(f"✅ Recovered betas within 0.05; {batched.size} portfolio scenarios in one product")
+
+
+def test_book_stress_test_uses_precomputed_betas():
+    """Test run_stress_test on the book runs the library from warm-up betas and adds firm-wide impact"""
+    import main
+    from warmup import warmer
+
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+
+    async def scenario():
+        for name, capital in (("Stress One", 300000.0), ("Stress Two", 700000.0)):
+            await main.mcp.call_tool("create_client_profile", {
+                "name": name, "age": 55, "risk_tolerance": "moderate",
+                "investment_horizon": 8, "capital": capital
+            })
+        main._beta_cache().clear()
+        assert await warmer.run_once() and warmer.summary["betas"] > 0
+        fetched = []
+        adj_close = main.adj_close
+        main.adj_close = lambda *args, **kwargs: fetched.append(args) or adj_close(*args, **kwargs)
+        try:
+            _, book = await main.mcp.call_tool("run_stress_test", {"book": True})
+        finally:
+            main.adj_close = adj_close
+        _, unknown = await main.mcp.call_tool("run_stress_test", {"portfolio": {"VTI": 1.0}, "scenarios": ["alien_invasion"]})
+        _, custom = await main.mcp.call_tool("run_stress_test", {
+            "portfolio": {"SPY": 1.0}, "custom_scenarios": {"crash": {"equities": -0.2}}
+        })
+        capital = {profile.name: profile.capital for profile in main.client_profiles.values()}
+        return book["result"], unknown["result"], custom["result"], fetched, capital
+
+    try:
+        book, unknown, custom, fetched, capital = asyncio.run(scenario())
+    finally:
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+        warmer.store_estimates(None, {})
+
+    assert book["status"] == "success" and fetched == []
+    assert set(book["scenarios"]) == set(config.scenarios.library)
+    one = book["results"]["Stress One"]["equities_down_20"]
+    firm = book["firm"]["impacts"]["equities_down_20"]
+    assert one == book["results"]["Stress Two"]["equities_down_20"] and one < 0
+    expected = sum(capital[name] * results["equities_down_20"] for name, results in book["results"].items())
+    assert np.isclose(firm["amount"], expected) and np.isclose(firm["return"], expected / book["firm"]["market_value"])
+    assert unknown["status"] == "error" and "alien_invasion" in unknown["message"]
+    assert np.isclose(custom["results"]["portfolio"]["crash"], -0.2)  # the proxy has a beta of one to itself
+    print(f"✅ Equities -20% costs the firm {-firm['amount']:,.0f}")
+
+
+if __name__ == "__main__":
+    test_betas_and_batched_scenarios()
+    test_book_stress_test_uses_precomputed_betas()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests that the server starts without loading the scientific stack
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from startup import HEAVY_PACKAGES, measure_import_costs
+
+_CHECK = """
+import asyncio, sys
+import main
+
+async def scenario():
+    await main.mcp.list_tools()
+    await main.mcp.call_tool("create_client_profile", {
+        "name": "Cold Start", "age": 40, "risk_tolerance": "moderate",
+        "investment_horizon": 10, "capital": 50000.0
+    })
+
+asyncio.run(scenario())
+print(",".join(m for m in %r if m in sys.modules))
+""" % (HEAVY_PACKAGES,)
+
+
+def test_import_report():
+    """Test the import cost report for main"""
+    report = measure_import_costs("main")
+    assert report["total_ms"] > 0
+    assert report["heavy_packages_loaded"] == []
+    print(f"✅ main imports in {report['total_ms']:.0f} ms without heavy packages")
+
+
+def test_tools_respond_before_pandas_loads():
+    """Test tool listing and profile creation leave the heavy stack unloaded"""
+    with tempfile.TemporaryDirectory() as tmp:
+        script = "from config import config\n"
+        script += f"config.storage.client_db_path = {os.path.join(tmp, 'clients.db')!r}\n"
+        result = subprocess.run(
+            [sys.executable, "-c", script + _CHECK],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "", f"loaded: {result.stdout.strip()}"
+    print("✅ Tools respond before pandas is loaded")
+
+
+if __name__ == "__main__":
+    test_import_report()
+    test_tools_respond_before_pandas_loads()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent client profile store
+"""
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from main import ClientProfile
+from store import ClientStore
+
+
+def _profile(i):
+    return ClientProfile(
+        name=f"Client {i:04d}",
+        age=30 + i % 40,
+        risk_tolerance=["conservative", "moderate", "aggressive"][i % 3],
+        investment_horizon=1 + i % 30,
+        capital=10000.0 * (i + 1)
+    )
+
+
+def test_mapping_interface():
+    """Test dict-style access and persistence across store instances"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clients.db")
+        store = ClientStore(path, ClientProfile)
+        store["Client 0000"] = _profile(0)
+        assert "Client 0000" in store
+        assert "Missing" not in store
+        assert store.get("Missing") is None
+        assert store["Client 0000"].capital == 10000.0
+
+        # A second store (e.g. another server process) sees the same book
+        other = ClientStore(path, ClientProfile)
+        assert len(other) == 1
+        del other["Client 0000"]
+        assert len(store) == 0
+        store.close()
+        other.close()
+    print("✅ Store mapping interface works")
+
+
+def test_batched_writes_and_queries():
+    """Test batched writes and indexed queries"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ClientStore(os.path.join(tmp, "clients.db"), ClientProfile)
+        assert store.put_many(_profile(i) for i in range(300)) == 300
+        assert len(store) == 300
+
+        conservative = store.query(risk_tolerance="conservative")
+        assert len(conservative) == 100
+        assert all(p.risk_tolerance == "conservative" for p in conservative)
+
+        long_horizon = store.query(min_horizon=25, max_horizon=30)
+        assert all(25 <= p.investment_horizon <= 30 for p in long_horizon)
+
+        prefixed = store.query(name_prefix="Client 01", limit=5)
+        assert [p.name for p in prefixed] == [f"Client {i:04d}" for i in range(100, 105)]
+        assert store.counts_by_risk() == {"aggressive": 100, "conservative": 100, "moderate": 100}
+        store.close()
+    print("✅ Batched writes and indexed queries work")
+
+
+def test_concurrent_readers():
+    """Test reads from many threads while a writer is active"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ClientStore(os.path.join(tmp, "clients.db"), ClientProfile)
+        store.put_many(_profile(i) for i in range(100))
+
+        def read(i):
+            return store[f"Client {i % 100:04d}"].age
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            writer = pool.submit(store.put_many, [_profile(i) for i in range(100, 200)])
+            ages = list(pool.map(read, range(400)))
+            writer.result()
+
+        assert len(ages) == 400
+        assert len(store) == 200
+    print("✅ Concurrent readers work")
+
+
+if __name__ == "__main__":
+    test_mapping_interface()
+    test_batched_writes_and_queries()
+    test_concurrent_readers()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the startup warm-up and precomputed universe estimates
+"""
+
+import asyncio
+
+from config import config
+from warmup import Warmer
+
+
+def test_ready_only_when_warm_and_retry_after_failure():
+    """Test readiness waits for the first successful warm-up, and failures are retried on schedule"""
+    saved = config.warmup.model_copy()
+    config.warmup.ready_when_warm = True
+    config.warmup.retry_seconds = 0.01
+    warmer = Warmer()
+    attempts = []
+
+    @warmer.job
+    async def flaky():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            raise ConnectionError("market data unavailable")
+        return {"symbols": 3}
+
+    async def scenario():
+        assert not warmer.ready
+        warmer.start()
+        warm = await warmer.wait_warm(1.0)
+        warmer._task.cancel()
+        return warm
+
+    try:
+        assert asyncio.run(scenario())
+    finally:
+        config.warmup = saved
+    status = warmer.status()
+    assert len(attempts) == 2 and status["warm"] and status["symbols"] == 3 and status["last_error"] is None
+    print(f"✅ Warm after {status['runs']} runs")
+
+
+def test_build_uses_precomputed_estimates():
+    """Test build_portfolio skips fetching with warm estimates and gives the same portfolio as a cold build"""
+    import main
+    from warmup import warmer
+
+    synthetic_enabled = config.data_providers["synthetic"].enabled
+    config.data_providers["synthetic"].enabled = True
+
+    async def build():
+        main.mcp.results.clear()
+        _, structured = await main.mcp.call_tool("build_portfolio", {"client_name": "Warm Client"})
+        return structured["result"]
+
+    async def scenario():
+        await main.mcp.call_tool("create_client_profile", {
+            "name": "Warm Client", "age": 35, "risk_tolerance": "aggressive",
+            "investment_horizon": 20, "capital": 500000.0
+        })
+        cold = await build()
+        assert await warmer.run_once()
+        assert warmer.estimates_for(main._default_universe("aggressive")) is not None
+        fetched = []
+        adj_close = main.adj_close
+        main.adj_close = lambda *args, **kwargs: fetched.append(args) or adj_close(*args, **kwargs)
+        try:
+            warm = await build()
+        finally:
+            main.adj_close = adj_close
+        return cold, warm, fetched
+
+    try:
+        cold, warm, fetched = asyncio.run(scenario())
+    finally:
+        config.data_providers["synthetic"].enabled = synthetic_enabled
+        warmer.store_estimates(None, {})
+    assert fetched == []
+    for key, value in cold["portfolio"].items():
+        expected = value if key == "assets" else round(value, 10)
+        actual = warm["portfolio"][key] if key == "assets" else round(warm["portfolio"][key], 10)
+        assert actual == expected, key
+    print(f"✅ Warm build matched cold build: {warm['portfolio']['expected_return']:.4f} expected return")
+
+
+def test_new_market_data_makes_estimates_stale():
+    """Test estimates computed at an older data version are not used"""
+    import market_data
+
+    universe = ("AAA", "BBB")
+    data_version = market_data.data_version
+    warmer = Warmer()
+    market_data.data_version = lambda: "synthetic:1"
+    try:
+        warmer.store_estimates("synthetic:1", {universe: "estimates"})
+        assert warmer.estimates_for(universe) == "estimates"
+        market_data.data_version = lambda: "synthetic:2"  # new bars ingested
+        assert warmer.estimates_for(universe) is None
+    finally:
+        market_data.data_version = data_version
+    print("✅ Estimates go stale when the data version changes")
+
+
+if __name__ == "__main__":
+    test_ready_only_when_warm_and_retry_after_failure()
+    test_build_uses_precomputed_estimates()
+    test_new_market_data_makes_estimates_stale()
@@ -0,0 +1,150 @@
+"""
+Startup warm-up and scheduled prefetch for Financial Advisor AI Copilot
+
+``config.asset_universes`` lists exactly the symbols the first
+``build_portfolio`` calls will need. Without a warm-up, the first call of
+the day pays the full cold-fetch cost. The warm-up job, registered with
+``@warmer.job``, runs in the background when the server starts and then
+every ``config.warmup.interval_seconds``. It prefetches the universes and
+the backtest benchmark into the price cache and precomputes each
+universe's return and covariance estimates. ``build_portfolio`` uses
+those estimates directly while they are younger than
+``estimates_max_age_seconds`` and the market data has not changed since:
+each set of estimates carries the ``data_version()`` it was computed at.
+
+The server reports ready through ``/ready`` and through ``ready``. With
+``ready_when_warm``, it reports ready only after the first successful
+warm-up, and server startup waits up to ``startup_timeout_seconds`` for it.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class Warmer:
+    """Runs the warm-up job in the background and holds its precomputed estimates"""
+
+    def __init__(self):
+        self._job: Optional[Job] = None
+        self._task: Optional[asyncio.Task] = None
+        self._warmed: Optional[asyncio.Event] = None
+        self.warm = False
+        self.running = False
+        self.runs = 0
+        self.last_finished: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.summary: Dict[str, Any] = {}
+        self._estimates: Dict[Tuple[str, ...], Any] = {}
+        self._estimates_version: Optional[str] = None
+        self._estimated_at = 0.0
+
+    def job(self, fn: Job) -> Job:
+        """Register the warm-up coroutine; it returns a JSON-friendly summary"""
+        self._job = fn
+        return fn
+
+    @property
+    def ready(self) -> bool:
+        return self.warm or not (config.warmup.enabled and config.warmup.ready_when_warm)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "warming",
+            "warm": self.warm,
+            "running": self.running,
+            "runs": self.runs,
+            "last_finished": self.last_finished,
+            "last_duration_seconds": self.last_duration,
+            "last_error": self.last_error,
+            **self.summary
+        }
+
+    def store_estimates(self, version: Optional[str], estimates: Dict[Tuple[str, ...], Any]) -> None:
+        """Replace the precomputed estimates, keyed by universe, as computed at market data ``version``"""
+        self._estimates = estimates
+        self._estimates_version = version
+        self._estimated_at = time.time()
+
+    def estimates_for(self, universe: Sequence[str]) -> Optional[Any]:
+        """Precomputed estimates for exactly ``universe``, if still fresh and computed from the current market data"""
+        estimates = self._estimates.get(tuple(universe))
+        if estimates is None or time.time() - self._estimated_at > config.warmup.estimates_max_age_seconds:
+            return None
+        from market_data import data_version
+
+        return estimates if data_version() == self._estimates_version else None
+
+    async def run_once(self) -> bool:
+        """Run the job once; return whether it succeeded"""
+        if self._job is None:
+            return False
+        self.running = True
+        started = time.perf_counter()
+        try:
+            self.summary = await self._job()
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.warning("Warm-up failed: %s", self.last_error)
+            return False
+        finally:
+            self.running = False
+            self.runs += 1
+            self.last_duration = time.perf_counter() - started
+        self.last_error = None
+        self.last_finished = time.time()
+        self.warm = True
+        if self._warmed is not None:
+            self._warmed.set()
+        return True
+
+    async def _loop(self) -> None:
+        settings = config.warmup
+        while True:
+            succeeded = await self.run_once()
+            if settings.interval_seconds is None and succeeded:
+                return
+            await asyncio.sleep(settings.retry_seconds if not succeeded else settings.interval_seconds)
+
+    def start(self) -> None:
+        """Start the background warm-up on the running loop, once"""
+        if not config.warmup.enabled or self._job is None:
+            return
+        if self._task is not None and not self._task.done() and self._task.get_loop() is asyncio.get_running_loop():
+            return
+        self._warmed = asyncio.Event()
+        if self.warm:
+            self._warmed.set()
+        self._task = asyncio.create_task(self._loop(), name="warmup")
+
+    async def wait_warm(self, timeout: Optional[float]) -> bool:
+        """Wait until the first warm-up succeeds; return whether it did within ``timeout``"""
+        if self.warm or self._warmed is None:
+            return self.warm
+        try:
+            await asyncio.wait_for(self._warmed.wait(), timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    @asynccontextmanager
+    async def serving(self, *_: Any) -> AsyncIterator[Dict[str, Any]]:
+        """Server lifespan: start warming, and with ``ready_when_warm`` hold startup until warm"""
+        self.start()
+        if config.warmup.enabled and config.warmup.ready_when_warm:
+            if not await self.wait_warm(config.warmup.startup_timeout_seconds):
+                logger.warning("Serving before warm-up finished: not warm after %s s",
+                               config.warmup.startup_timeout_seconds)
+        yield {}
+
+
+warmer = Warmer()